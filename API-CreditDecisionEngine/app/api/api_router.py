@@ -9,6 +9,10 @@ from fastapi import APIRouter
 # Import our credit decision engine router Path: app/api/routes/credit_decision.py
 from app.api.routes import credit_decision
 from app.api.routes import visualizes_decision
+from app.api.routes import monitoring
+from app.api.routes import models
+from app.api.routes import whatif
+from app.api.routes import global_explain
 
 api_router = APIRouter()
 
@@ -18,6 +22,18 @@ api_router.include_router(credit_decision.credit_decision_router)
 # Include Visualize Decision router to the API router
 api_router.include_router(visualizes_decision.router)
 
+# Include Monitoring router to the API router
+api_router.include_router(monitoring.monitoring_router)
+
+# Include Models router (model versions + hot reload) to the API router
+api_router.include_router(models.models_router)
+
+# Include What-If router (sensitivity sweeps) to the API router
+api_router.include_router(whatif.whatif_router)
+
+# Include Global Explanation router (portfolio-level SHAP index) to the API router
+api_router.include_router(global_explain.global_explain_router)
+
 # WorkFlow :
         # 1. Client Request : POST Request
         #       |
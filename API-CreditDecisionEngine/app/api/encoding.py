@@ -0,0 +1,83 @@
+#In this file we define the response encoding of the decision routes (content negotiation on Accept)
+#   application/json (default)                    -> pydantic-core JSON encoder (Rust), one pass over the objects
+#                                                    factor lists as "Monthly Income Level (+0.002)" strings
+#   application/msgpack or application/x-msgpack  -> MessagePack, factor lists as [name, value] pairs
+#The engine builds every CreditDecisionResponse once without validation (trusted output),
+#the routes return these bytes as a Response, so FastAPI does not validate + serialize them again
+#Optional decision sections (OPTIONAL_SECTIONS) are left out when None : the payload of the default configuration
+#has the baseline keys only
+#MessagePack needs msgpack (optional dependency, imported on first use) -> 406 when it is missing
+from typing import List
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from app.schemas.credit import CreditDecisionResponse, OPTIONAL_SECTIONS
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+JSON_TYPES = (JSON, "application/*", "*/*")
+
+# OpenAPI : extra media type of the decision routes (responses= of the route decorator)
+MSGPACK_RESPONSE = {200: {"content": {MSGPACK: {}}}}
+
+_decision_list = TypeAdapter(List[CreditDecisionResponse])
+
+
+def require_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(status_code=406, detail="MessagePack responses need msgpack : pip install -r requirements-msgpack.txt")
+    return msgpack
+
+
+#Media type of the response from the Accept header : JSON or MessagePack
+#Highest q value wins, the first listed type wins a tie, no Accept / nothing known -> JSON
+def negotiate(accept: str) -> str:
+    best, best_q = JSON, -1.0
+    for part in accept.split(","):
+        media, _, params = part.partition(";")
+        media = media.strip().lower()
+        if media in MSGPACK_TYPES:
+            kind = MSGPACK
+        elif media in JSON_TYPES:
+            kind = JSON
+        else:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        # q = 0 : "not acceptable"
+        if q > 0 and q > best_q:
+            best, best_q = kind, q
+    return best
+
+
+#Unset optional sections of one response (None : not a decision, nothing to leave out)
+def _unset_sections(content):
+    if not isinstance(content, CreditDecisionResponse):
+        return None
+    return {name for name in OPTIONAL_SECTIONS if getattr(content, name) is None}
+
+
+#Encode one response model (many = False : CreditDecisionResponse, WhatIfResponse) or a list of decisions (many = True)
+def decision_response(request: Request, content, many: bool = False) -> Response:
+    headers = {"Vary": "Accept"}
+    if many:
+        exclude = {i: _unset_sections(r) for i, r in enumerate(content)}
+    else:
+        exclude = _unset_sections(content)
+    if negotiate(request.headers.get("accept", "")) == MSGPACK:
+        msgpack = require_msgpack()
+        data = _decision_list.dump_python(content, exclude=exclude) if many else content.model_dump(exclude=exclude)
+        return Response(content=msgpack.packb(data), media_type=MSGPACK, headers=headers)
+    body = _decision_list.dump_json(content, exclude=exclude) if many else content.model_dump_json(exclude=exclude)
+    return Response(content=body, media_type=JSON, headers=headers)
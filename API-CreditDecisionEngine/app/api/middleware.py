@@ -0,0 +1,53 @@
+#In this file we define the metrics middleware (pure ASGI, wraps every HTTP request)
+#1. Collects the stage timings (app/core/metrics.py) of the request in a context variable
+#2. Adds a Server-Timing header to /api/credit/decision* and /api/explain/* responses
+#3. Records request latency, request count by status code and 5xx errors per endpoint
+#   (endpoint = route function name, so path parameters never create new series)
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import SERVER_TIMING_ENABLED
+from app.core.metrics import metrics, collect_timings, server_timing_header
+
+# Responses that get a Server-Timing header
+SERVER_TIMING_PREFIXES = ("/api/credit/decision", "/api/credit/whatif", "/api/explain/")
+
+
+class MetricsMiddleware:
+
+    def __init__(self, app, server_timing=SERVER_TIMING_ENABLED, prefixes=SERVER_TIMING_PREFIXES):
+        self.app = app
+        self.server_timing = server_timing
+        self.prefixes = prefixes
+
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timed = self.server_timing and scope["path"].startswith(self.prefixes)
+        status = [500]
+
+        with collect_timings() as timings:
+
+            # Header is added when the response starts (before the body is sent)
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    status[0] = message["status"]
+                    if timed:
+                        headers = MutableHeaders(scope=message)
+                        headers.append("Server-Timing", server_timing_header(timings, time.perf_counter() - start))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                # The router writes the matched route function into the scope
+                endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+                metrics.observe("credit_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+                metrics.inc("credit_requests_total", endpoint=endpoint, status=str(status[0]))
+                if status[0] >= 500:
+                    metrics.inc("credit_request_errors_total", endpoint=endpoint)
@@ -1,25 +1,138 @@
 #In this file we define the credit decision router
 #This router has a POST endpoint /credit/decision
-from fastapi import APIRouter
-from app.schemas.credit import CreditRequest, CreditDecisionResponse
+#And a POST endpoint /credit/decision/batch for N applicants at once
+#And a GET endpoint /credit/decision/{decision_id}/explanations for deferred explanations
+#And a POST endpoint /credit/decision/bulk for a whole portfolio file (CSV / Parquet upload)
+#Single and batch decisions are JSON, or MessagePack with "Accept: application/msgpack" (app/api/encoding.py)
+import os
+from typing import List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.schemas.credit import CreditRequest, CreditDecisionResponse, DecisionExplanationsResponse
 #Input Request Schema is CreditRequest => CreditRequest is a Pydantic model class
 #Output Response Schema is CreditDecisionResponse => CreditDecisionResponse is a Pydantic model class
 
 #Service Layer : In this Router Layer we will call the service layer to get the credit decision
-from app.services.decision_service import generate_decision
+from app.services.decision_service import (
+    generate_decision_async,
+    generate_decision_batch,
+    get_decision_explanations,
+)
+from app.services.micro_batcher import BatcherOverloaded
+from app.services.bulk_scoring import (
+    MEDIA_TYPES, BulkJobsBusy, bulk_pool, check_columns, require_pyarrow, spool_upload, stream_scores,
+)
+from app.core.config import BULK_CHUNK_SIZE, DECISION_PIPELINE, MAX_BATCH_ROWS
+#Response encoding : built once by the engine, serialized once here (JSON / MessagePack)
+from app.api.encoding import decision_response, MSGPACK_RESPONSE
 
 
 credit_decision_router = APIRouter()
 
 
 #Define POST endpoint for credit decision
+#Query Parameter explain :
+#   full     -> scores + explanations (default)
+#   deferred -> scores + decision_id, fetch explanations later from /credit/decision/{decision_id}/explanations
+#   none     -> scores only
+#Concurrent requests are micro-batched into one engine call (503 when the queue is full)
 @credit_decision_router.post(
     "/credit/decision",
-    response_model=CreditDecisionResponse
+    response_model=CreditDecisionResponse,
+    responses=MSGPACK_RESPONSE
 )
-def credit_decision(
-    req: CreditRequest
+async def credit_decision(
+    req: CreditRequest,
+    request: Request,
+    explain: Literal["full", "deferred", "none"] = Query("full")
 ):
     # Convert pydantic model to Standard Python Dictionary
-    result = generate_decision(req.dict()) 
-    return result
\ No newline at end of file
+    try:
+        result = await generate_decision_async(req.model_dump(), explain=explain)
+    except BatcherOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return decision_response(request, result)
+
+
+#Define POST endpoint for batch credit decision
+#Input  : JSON list of CreditRequest
+#Output : JSON list of CreditDecisionResponse (same order as input)
+#At most MAX_BATCH_ROWS applicants (413 above : whole portfolio files go to /credit/decision/bulk)
+#Query Parameter pipeline :
+#   full   -> every layer + every explainer
+#   tiered -> PD + Anomaly first, policies may stop a row with REJECT / REVIEW (see the "Tier" section)
+#   (default : DECISION_PIPELINE)
+@credit_decision_router.post(
+    "/credit/decision/batch",
+    response_model=List[CreditDecisionResponse],
+    responses=MSGPACK_RESPONSE
+)
+def credit_decision_batch(
+    reqs: List[CreditRequest],
+    request: Request,
+    pipeline: Optional[Literal["full", "tiered"]] = Query(None)
+):
+    if len(reqs) > MAX_BATCH_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{len(reqs)} applicants, at most {MAX_BATCH_ROWS} per batch (use /credit/decision/bulk for files)",
+        )
+    # Convert every pydantic model to Standard Python Dictionary
+    results = generate_decision_batch([req.model_dump() for req in reqs], pipeline=pipeline)
+    return decision_response(request, results, many=True)
+
+
+#Define GET endpoint for deferred explanations
+#404 if the decision ID is unknown or already evicted (TTL / store size)
+@credit_decision_router.get(
+    "/credit/decision/{decision_id}/explanations",
+    response_model=DecisionExplanationsResponse
+)
+def credit_decision_explanations(decision_id: str):
+    result = get_decision_explanations(decision_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Decision not found or expired")
+    return result
+
+
+#Define POST endpoint for bulk scoring of a portfolio file
+#Input  : raw request body = CSV or Parquet file with the 7 feature columns (same as features_only.csv)
+#Output : streamed rows in input order (NDJSON / CSV / Parquet), one per input row
+#         invalid rows come back with status "error" and the validation message
+#         pipeline=tiered adds the Tier / Outcome / Policy columns
+#The file is scored chunk by chunk across the bulk process pool (app/services/bulk_scoring.py)
+#One pool per API process (BULK_API_WORKERS), at most BULK_API_MAX_JOBS files at once : 429 above that
+@credit_decision_router.post("/credit/decision/bulk")
+async def credit_decision_bulk(
+    request: Request,
+    input_format: Literal["csv", "parquet"] = Query("csv"),
+    output_format: Literal["ndjson", "csv", "parquet"] = Query("ndjson"),
+    explain: bool = Query(False),
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=100000),
+    pipeline: Literal["full", "tiered"] = Query(DECISION_PIPELINE),
+):
+    # Job slot first : a busy API never spools the upload
+    try:
+        release = bulk_pool.acquire()
+    except BulkJobsBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    try:
+        path = await spool_upload(request.stream(), input_format)
+    except BaseException:
+        release()
+        raise
+    try:
+        check_columns(path, input_format)
+        if output_format == "parquet":
+            require_pyarrow()
+    except (ValueError, ImportError) as e:
+        os.remove(path)
+        release()
+        raise HTTPException(status_code=400, detail=str(e))
+    # The slot is freed when the stream ends, and by the background task when the client disconnects first
+    return StreamingResponse(
+        stream_scores(path, input_format, output_format, explain, chunk_size, pipeline=pipeline, release=release),
+        media_type=MEDIA_TYPES[output_format],
+        background=BackgroundTask(release),
+    )
@@ -0,0 +1,91 @@
+#In this file we define the global explanation router (portfolio views, app/services/explanation_index.py)
+#This router has a GET endpoint /explain/global (index of the serving model version + build status)
+#And a GET endpoint /explain/global/{layer} : global feature importance of one layer over every background row,
+#filtered by risk label / recommendation / anomaly flag, optionally one segment per label value
+#And a POST endpoint /explain/global/build to build the index of the serving model version in the background
+#Answers come from the precomputed SHAP index (no explainer runs) : JSON, or MessagePack (app/api/encoding.py)
+from typing import List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+
+from app.core.config import EXPLAIN_INDEX_BUILD_ENABLED
+from app.schemas.credit import GlobalImportanceResponse
+from app.services.explanation_index import (
+    explanation_index,
+    global_importance,
+    IndexNotReady,
+    IndexBuildInProgress,
+    BUILDING,
+)
+from app.api.encoding import decision_response, MSGPACK_RESPONSE
+
+
+global_explain_router = APIRouter(prefix="/explain/global")
+
+Layer = Literal["PD", "Anomaly", "RiskLabel", "HybridScore", "RL_Recommendation"]
+
+
+#Define GET endpoint for the index status
+#Output : model_version, index (rows, created_at, build_seconds, features of every layer ; None : not built),
+#         build (status IDLE / BUILDING / DONE / FAILED, rows_done / rows, error)
+@global_explain_router.get("")
+def global_explain_status():
+    return explanation_index.status()
+
+
+#Define POST endpoint for an index build of the serving model version
+#Query Parameter force : rebuild an existing index
+#202 : build started, or this version's index is already being built (here or in another process),
+#200 : the index exists (force=false), 403 : builds disabled (EXPLAIN_INDEX_BUILD_ENABLED = False, the default),
+#409 : the index of another model version is being built in this process
+@global_explain_router.post("/build")
+def global_explain_build(force: bool = Query(False)):
+    if not EXPLAIN_INDEX_BUILD_ENABLED:
+        raise HTTPException(status_code=403, detail="Index builds are disabled (EXPLAIN_INDEX_BUILD_ENABLED = False)")
+    try:
+        status = explanation_index.build(force=force)
+    except IndexBuildInProgress as e:
+        status = explanation_index.status()
+        if status["build"]["status"] != BUILDING:
+            raise HTTPException(status_code=409, detail=str(e))
+    code = 202 if status["build"]["status"] == BUILDING else 200
+    return JSONResponse(status_code=code, content=status)
+
+
+#Define GET endpoint for the global importance of one layer
+#Path Parameter layer            : PD, Anomaly, RiskLabel, HybridScore, RL_Recommendation
+#Query Parameter risk_label      : keep these risk labels only (repeatable : ?risk_label=MEDIUM&risk_label=HIGH)
+#Query Parameter recommendation  : keep these recommendations only (repeatable)
+#Query Parameter anomaly_flag    : keep flagged (1) / normal (0) rows only
+#Query Parameter segment_by      : one segment per risk_label / recommendation / anomaly_flag value
+#Query Parameter top_k           : rank used by top_k_share (3 : the top factors of a decision)
+#Query Parameter distribution    : add the SHAP quantiles of every feature
+#Example : mean |SHAP| of the Risk layer per risk label, rejected applicants only
+#   GET /api/explain/global/RiskLabel?recommendation=REJECT&segment_by=risk_label
+#503 while the index of the serving model version is not built (Retry-After while it is being built)
+@global_explain_router.get(
+    "/{layer}",
+    response_model=GlobalImportanceResponse,
+    responses=MSGPACK_RESPONSE
+)
+def global_explain_layer(
+    layer: Layer,
+    request: Request,
+    risk_label: Optional[List[Literal["LOW", "MEDIUM", "HIGH"]]] = Query(None),
+    recommendation: Optional[List[Literal["REJECT", "APPROVE_LOW", "APPROVE_MEDIUM", "APPROVE_HIGH"]]] = Query(None),
+    anomaly_flag: Optional[int] = Query(None, ge=0, le=1),
+    segment_by: Optional[Literal["risk_label", "recommendation", "anomaly_flag"]] = Query(None),
+    top_k: int = Query(3, ge=1, le=10),
+    distribution: bool = Query(False),
+):
+    filters = {
+        "risk_label": risk_label,
+        "recommendation": recommendation,
+        "anomaly_flag": [anomaly_flag] if anomaly_flag is not None else None,
+    }
+    try:
+        result = global_importance(layer, filters, segment_by, top_k, distribution)
+    except IndexNotReady as e:
+        headers = {"Retry-After": "30"} if e.building else None
+        raise HTTPException(status_code=503, detail=str(e), headers=headers)
+    return decision_response(request, result)
@@ -0,0 +1,23 @@
+#In this file we define the health router (mounted at the root, not under /api)
+#GET /health : liveness  -> the process answers
+#GET /ready  : readiness -> 200 only after the warm-up went through every layer, 503 before
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.startup_service import is_ready, get_readiness
+
+
+health_router = APIRouter()
+
+
+#Define GET endpoint for liveness
+@health_router.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+#Define GET endpoint for readiness
+#Output : status (STARTING / READY / FAILED), error, model_version
+@health_router.get("/ready")
+def ready():
+    return JSONResponse(status_code=200 if is_ready() else 503, content=get_readiness())
@@ -0,0 +1,16 @@
+#In this file we define the metrics router (mounted at the root, not under /api)
+#GET /metrics : stage + request histograms and counters in Prometheus text format
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import metrics
+
+
+metrics_router = APIRouter()
+
+
+#Define GET endpoint for Prometheus scraping
+#Output : text/plain exposition format (credit_stage_seconds, credit_request_seconds, counters)
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,45 @@
+#In this file we define the models router
+#This router has a GET endpoint /models (active model version, available bundles, last reload)
+#And a POST endpoint /models/reload for a zero-downtime hot reload of a model bundle
+#The new version is loaded, explained and warmed up in the background, then swapped in
+#(requests in flight finish on the old version, see app/services/model_manager.py)
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from app.core.config import MODEL_RELOAD_ENABLED
+from app.core.model_bundle import BundleError
+from app.services.model_manager import model_manager, ReloadInProgress, DONE, FAILED
+
+
+models_router = APIRouter()
+
+
+#Define GET endpoint for the model versions
+#Output : active (version, fingerprint, created_at, loaded_at), current (bundles/CURRENT),
+#         available (bundle versions on disk), reload (status of the last reload)
+@models_router.get("/models")
+def models_status():
+    return model_manager.status()
+
+
+#Define POST endpoint for a hot reload
+#Query Parameter version : bundle version to serve (default : re-read bundles/CURRENT)
+#Query Parameter wait    : answer only when the new version serves (or failed)
+#202 : reload started, 200 : new version serves (wait=true), 400 : unknown / invalid bundle,
+#403 : reload disabled (MODEL_RELOAD_ENABLED = False, the default), 409 : a reload is already running, 500 : the reload failed (wait=true)
+@models_router.post("/models/reload")
+def models_reload(
+    version: Optional[str] = Query(None),
+    wait: bool = Query(False),
+):
+    if not MODEL_RELOAD_ENABLED:
+        raise HTTPException(status_code=403, detail="Model reload is disabled (MODEL_RELOAD_ENABLED = False)")
+    try:
+        status = model_manager.reload(version, wait=wait)
+    except BundleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    code = {DONE: 200, FAILED: 500}.get(status["status"], 202)
+    return JSONResponse(status_code=code, content=status)
@@ -0,0 +1,50 @@
+#In this file we define the monitoring router
+#This router has GET endpoints /cache/stats (decision cache counters)
+#, /cache/plots/stats (rendered PNG cache counters)
+#, /startup/report (startup timing report)
+#, /batching/stats (micro-batching batch size + queue wait)
+#and /bulk/stats (bulk scoring pool + jobs running)
+from fastapi import APIRouter
+
+from app.services.decision_service import get_cache_stats, decision_batcher
+from app.services.plot_renderer import plot_renderer
+from app.services.bulk_scoring import bulk_pool
+from app.services.startup_service import get_startup_report
+
+
+monitoring_router = APIRouter()
+
+
+#Define GET endpoint for decision cache statistics
+#Output : size, hits, misses, evictions, expirations, hit_ratio, model_version
+@monitoring_router.get("/cache/stats")
+def cache_stats():
+    return get_cache_stats()
+
+
+#Define GET endpoint for rendered plot cache statistics
+#Output : same counters as /cache/stats + render workers + renders in progress
+@monitoring_router.get("/cache/plots/stats")
+def plot_cache_stats():
+    return plot_renderer.stats()
+
+
+#Define GET endpoint for the startup timing report
+#Output : seconds per artifact (registry), per explainer and for the warm-up
+@monitoring_router.get("/startup/report")
+def startup_report():
+    return get_startup_report()
+
+
+#Define GET endpoint for micro-batching statistics of POST /credit/decision
+#Output : batches, rows, rejected, batch size mean / max, queue wait p50 / p99 (ms)
+@monitoring_router.get("/batching/stats")
+def batching_stats():
+    return decision_batcher.stats()
+
+
+#Define GET endpoint for the bulk scoring pool of this API process (POST /credit/decision/bulk)
+#Output : workers, max_jobs, jobs running, started (pool processes exist)
+@monitoring_router.get("/bulk/stats")
+def bulk_stats():
+    return bulk_pool.stats()
@@ -1,161 +1,48 @@
 from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
-from io import BytesIO
-import matplotlib
-matplotlib.use("Agg")
-# In Matplotlib, AGG refers to the Anti-Grain Geometry (AGG) library,
-# which is used to create pixel images of plots.
-import matplotlib.pyplot as plt
-import shap
-import pandas as pd
+from fastapi.responses import Response
 
 from app.schemas.credit import CreditRequest
-from app.core.model_registry import registry
-from app.engines.credit_decision_engine import engine, BUSINESS_MAPPING
+# PNGs are rendered off the event loop in a process pool and cached
+# (SHAP values come from the shared decision cache, same entry as /credit/decision)
+from app.services.plot_renderer import plot_renderer
+
+# PNG responses carry the model version in a header (JSON responses have a model_version field)
+MODEL_VERSION_HEADER = "X-Model-Version"
 
 router = APIRouter(prefix="/explain")
 
+
 # Visualize Probability of Default
+# Waterfall plot : shows the impact of each feature on the prediction
 @router.post("/pd")
-def explain_pd(req: CreditRequest):
-    # Step 1: Convert to DataFrame
-    df_input = pd.DataFrame([req.dict()])
-
-    # Step 2: Feature Selection + Scaling
-    X_pd = registry.pd_scaler.transform(df_input[registry.pd_features])
-
-    # Step 3: Explain
-    pd_exp = engine.pd_explainer(X_pd)
-
-    # Step 4: Rename Features for Business
-    pd_exp.feature_names = [
-        BUSINESS_MAPPING.get(f, f)
-        for f in registry.pd_features
-    ]
-
-    # Step 5: Create plot
-    plt.figure(figsize=(10, 4)) 
-    
-    # Waterfall plot : shows the impact of each feature on the prediction    
-    shap.plots.waterfall(pd_exp[0], show=False)
-
-    # Step 6: Save to buffer
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png", bbox_inches="tight")
-    plt.close()
-    buffer.seek(0)
-
-    # Step 7: Return Streaming Response
-    return StreamingResponse(buffer, media_type="image/png")
+async def explain_pd(req: CreditRequest):
+    png, model_version = await plot_renderer.render(req.model_dump(), "pd")
+    return Response(content=png, media_type="image/png", headers={MODEL_VERSION_HEADER: model_version})
 
 
 
 # Visualize Anomaly Score and Anomaly Flag
+# Force plot : shows the impact of each feature on the prediction
 @router.post("/anomaly")
-def explain_anomaly(req: CreditRequest):
-    df_input = pd.DataFrame([req.dict()])
-
-    X_if = registry.if_scaler.transform(df_input[registry.if_features])
-    if_exp = engine.if_explainer(X_if)
-
-    if_exp.feature_names = [
-        BUSINESS_MAPPING.get(f, f)
-        for f in registry.if_features
-    ]
-
-    plt.figure(figsize=(10, 4))
-    
-    # Force plot : shows the impact of each feature on the prediction    
-    shap.plots.force(if_exp[0], matplotlib=True, show=False)
-
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png", bbox_inches="tight")
-    plt.close()
-    buffer.seek(0)
-
-    return StreamingResponse(buffer, media_type="image/png")
+async def explain_anomaly(req: CreditRequest):
+    png, model_version = await plot_renderer.render(req.model_dump(), "anomaly")
+    return Response(content=png, media_type="image/png", headers={MODEL_VERSION_HEADER: model_version})
 
 
 
 # Visualize Hybrid Credit Score
+# Bar plot : shows the impact of each feature on the prediction
 @router.post("/hybrid")
-def explain_hybrid(req: CreditRequest):
-    df_input = pd.DataFrame([req.dict()])
-
-    X_hyb = df_input[registry.hybrid_features]
-    hyb_exp = engine.hybrid_explainer(X_hyb)
-
-    hyb_exp.feature_names = [
-        BUSINESS_MAPPING.get(f, f)
-        for f in registry.hybrid_features
-    ]
-
-    plt.figure(figsize=(10, 4))
-
-    # Bar plot : shows the impact of each feature on the prediction    
-    shap.plots.bar(hyb_exp[0], show=False)
-
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png", bbox_inches="tight")
-    plt.close()
-    buffer.seek(0)
-
-    return StreamingResponse(buffer, media_type="image/png")
-
+async def explain_hybrid(req: CreditRequest):
+    png, model_version = await plot_renderer.render(req.model_dump(), "hybrid")
+    return Response(content=png, media_type="image/png", headers={MODEL_VERSION_HEADER: model_version})
 
 
 
 # Visualize Risk Label
+# Waterfall plot of the predicted class
+# PD and Anomaly Flag are already part of the cached risk input (no recompute)
 @router.post("/risk")
-def explain_risk(req: CreditRequest):
-    # Step 1 : Convert to DataFrame
-    df_input = pd.DataFrame([req.dict()])
-
-    # Recompute PD and Anomaly Flag
-    X_pd = registry.pd_scaler.transform(df_input[registry.pd_features])
-    pd_val = registry.pd_model.predict_proba(X_pd)[0, 1]
-
-    X_if = registry.if_scaler.transform(df_input[registry.if_features])
-    if_score = registry.iso_model.decision_function(X_if)[0]
-    anomaly_flag = 1 if if_score < -0.05 else 0
-
-    # Step 2 : Create Copy of Input Dataframe And Add PD and Anomaly Flag
-    df_risk = df_input.copy()
-    df_risk["PD"] = pd_val
-    df_risk["anomalyFlag"] = anomaly_flag
-
-    X_risk = df_risk[registry.risk_features]
-    risk_idx = int(registry.risk_model.predict(X_risk)[0])
-
-    # Step 3 : Explaination : TreeExplainer
-    risk_exp = engine.risk_explainer(X_risk)
-
-    # Step 4 : Convert 3D array to 1D array
-    shap_values = risk_exp.values[0, :, risk_idx]
-    
-    # Step 5 : Create Explanation Object
-    explanation = shap.Explanation(
-        values=shap_values,
-        base_values=risk_exp.base_values[0][risk_idx],
-        data=X_risk.values[0],
-        feature_names=registry.risk_features
-    )
-    
-    # Step 6 : Rename Features for Business
-    explanation.feature_names = [
-        BUSINESS_MAPPING.get(f, f)
-        for f in registry.risk_features
-    ]
-
-    # Step 7 : Create Waterfall Plot
-    plt.figure(figsize=(10, 4))
-    shap.plots.waterfall(explanation, show=False)
-
-    # Step 8 : Save to Buffer
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png", bbox_inches="tight")
-    plt.close()
-    buffer.seek(0)
-
-    # Step 9 : Return Streaming Response
-    return StreamingResponse(buffer, media_type="image/png")
\ No newline at end of file
+async def explain_risk(req: CreditRequest):
+    png, model_version = await plot_renderer.render(req.model_dump(), "risk")
+    return Response(content=png, media_type="image/png", headers={MODEL_VERSION_HEADER: model_version})
@@ -0,0 +1,31 @@
+#In this file we define the what-if router
+#This router has a POST endpoint /credit/whatif : sensitivity sweep of one applicant
+#1 or 2 features are varied over a grid (step lists or ranges), every layer scores the whole grid
+#in one vectorized pass (no explanations), the answer is every output over the grid + the decision boundaries
+#JSON, or MessagePack with "Accept: application/msgpack" (app/api/encoding.py)
+from fastapi import APIRouter, Request
+
+from app.schemas.credit import WhatIfRequest, WhatIfResponse
+from app.services.decision_service import generate_whatif
+from app.api.encoding import decision_response, MSGPACK_RESPONSE
+
+
+whatif_router = APIRouter()
+
+
+#Define POST endpoint for a what-if sweep
+#Input  : WhatIfRequest -> base applicant, axes (feature + values, or start / stop / steps), boundaries
+#Output : WhatIfResponse -> surface of every output (rows = first axis) + crossings of the boundary outputs
+#Example : which income / EMI ratio moves this applicant from APPROVE_LOW to APPROVE_MEDIUM ?
+#   {"base": {...}, "axes": [{"feature": "avgMonthlyIncome", "start": 10000, "stop": 200000, "steps": 100},
+#                            {"feature": "emiRatio", "start": 0, "stop": 1, "steps": 100}]}
+#422 when a grid point is out of the CreditRequest bounds or the grid is above WHATIF_MAX_CELLS
+@whatif_router.post(
+    "/credit/whatif",
+    response_model=WhatIfResponse,
+    responses=MSGPACK_RESPONSE
+)
+def credit_whatif(req: WhatIfRequest, request: Request):
+    axes = [(axis.feature, axis.grid()) for axis in req.axes]
+    result = generate_whatif(req.base.model_dump(), axes, req.boundaries)
+    return decision_response(request, result)
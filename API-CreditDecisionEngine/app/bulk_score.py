@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+from app.core.config import BULK_CHUNK_SIZE, BULK_WORKERS, DECISION_PIPELINE
+from app.services.model_manager import model_manager
+from app.services.bulk_scoring import (
+    FORMATS, INPUT_FORMATS, check_columns, encode_rows, input_format,
+    parquet_schema, parquet_table, read_chunks, score_chunks, require_pyarrow,
+)
+
+# Bulk Scoring CLI :
+# Scores a portfolio file (CSV / Parquet, same columns as features_only.csv) chunk by chunk
+# across a process pool, and writes the results in input order (NDJSON / CSV / Parquet).
+#
+# Resume : after every written chunk, "<output>.checkpoint.json" records the chunks done
+# and the output size. Running the same command again after an interruption
+# truncates the output to the last completed chunk and continues from there
+# (same input file, same model version : otherwise the job starts over).
+# (--restart ignores the checkpoint.) The checkpoint is removed when the job completes.
+#
+# Parquet output is written as one part file per chunk in "<output>.parts/"
+# and merged into <output> at the end (a Parquet file cannot be appended to).
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m app.bulk_score portfolio.csv scores.ndjson
+#   python -m app.bulk_score portfolio.parquet scores.parquet --explain --workers 8 --chunk-size 5000
+#   python -m app.bulk_score portfolio.csv prescreen.csv --pipeline tiered
+
+
+def _checkpoint_path(output):
+    return f"{output}.checkpoint.json"
+
+
+def _parts_dir(output):
+    return f"{output}.parts"
+
+
+# Job parameters that must match for a checkpoint to be resumed
+# The model version (+ bundle fingerprint) and the input mtime are part of it : a resume after
+# bundles/CURRENT changed, or after the input was edited, starts over instead of mixing rows
+def _job(args):
+    deployment = model_manager.current()
+    return {
+        "input": os.path.abspath(args.input),
+        "input_size": os.path.getsize(args.input),
+        "input_mtime": os.path.getmtime(args.input),
+        "model_version": deployment.model_version,
+        "fingerprint": deployment.fingerprint,
+        "chunk_size": args.chunk_size,
+        "explain": args.explain,
+        "format": args.format,
+        "pipeline": args.pipeline,
+    }
+
+
+def _load_checkpoint(output, job):
+    try:
+        with open(_checkpoint_path(output)) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return checkpoint if checkpoint.get("job") == job else None
+
+
+def _save_checkpoint(output, job, chunks_done, rows_done, errors, output_bytes):
+    path = _checkpoint_path(output)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"job": job, "chunks_done": chunks_done, "rows_done": rows_done,
+                   "errors": errors, "output_bytes": output_bytes}, f)
+    os.replace(path + ".tmp", path)
+
+
+def run(args):
+    in_fmt = args.input_format or input_format(args.input)
+    check_columns(args.input, in_fmt)
+    job = _job(args)
+
+    # Step 1 : Resume from the last completed chunk (or start fresh)
+    checkpoint = None if args.restart else _load_checkpoint(args.output, job)
+    if checkpoint and args.format != "parquet" and not os.path.exists(args.output):
+        checkpoint = None
+    chunks_done = checkpoint["chunks_done"] if checkpoint else 0
+    rows_done = checkpoint["rows_done"] if checkpoint else 0
+    errors = checkpoint["errors"] if checkpoint else 0
+    if checkpoint:
+        print(f"Resuming after chunk {chunks_done} ({rows_done} rows done)", file=sys.stderr)
+    elif args.format == "parquet":
+        shutil.rmtree(_parts_dir(args.output), ignore_errors=True)
+
+    # Step 2 : Open the output (text formats : cut back to the size of the last completed chunk)
+    out = None
+    if args.format == "parquet":
+        require_pyarrow()
+        os.makedirs(_parts_dir(args.output), exist_ok=True)
+    else:
+        out = open(args.output, "r+" if checkpoint else "w", encoding="utf-8", newline="")
+        if checkpoint:
+            out.truncate(checkpoint["output_bytes"])
+            out.seek(checkpoint["output_bytes"])
+
+    # Step 3 : Score the remaining chunks, write them in order, checkpoint after each
+    start = time.perf_counter()
+    chunks = read_chunks(args.input, args.chunk_size, in_fmt, skip_rows=chunks_done * args.chunk_size)
+    try:
+        for idx, rows in score_chunks(chunks, args.chunk_size, args.explain, args.workers,
+                                      first_chunk=chunks_done, pipeline=args.pipeline):
+            if args.format == "parquet":
+                part = os.path.join(_parts_dir(args.output), f"part-{idx:06d}.parquet")
+                require_pyarrow().parquet.write_table(parquet_table(rows, args.explain, args.pipeline), part)
+                output_bytes = 0
+            else:
+                out.write(encode_rows(rows, args.format, args.explain, header=(idx == 0), pipeline=args.pipeline))
+                out.flush()
+                os.fsync(out.fileno())
+                output_bytes = out.tell()
+
+            chunks_done, rows_done = idx + 1, rows_done + len(rows)
+            errors += sum(row["status"] == "error" for row in rows)
+            _save_checkpoint(args.output, job, chunks_done, rows_done, errors, output_bytes)
+            elapsed = time.perf_counter() - start
+            print(f"chunk {idx} : {rows_done} rows, {errors} errors, {elapsed:.1f}s", file=sys.stderr)
+    finally:
+        if out is not None:
+            out.close()
+
+    # Step 4 : Parquet : merge the parts in order (one part in memory at a time)
+    if args.format == "parquet":
+        pq = require_pyarrow().parquet
+        parts = sorted(os.listdir(_parts_dir(args.output)))
+        with pq.ParquetWriter(args.output, parquet_schema(args.explain, args.pipeline)) as writer:
+            for part in parts:
+                writer.write_table(pq.read_table(os.path.join(_parts_dir(args.output), part)))
+        shutil.rmtree(_parts_dir(args.output))
+
+    os.remove(_checkpoint_path(args.output))
+    print(f"Done : {rows_done} rows, {errors} errors -> {args.output}", file=sys.stderr)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinSight-AA bulk scoring : portfolio file -> decisions")
+    parser.add_argument("input", help="CSV or Parquet file with the 7 feature columns")
+    parser.add_argument("output", help="output file (.ndjson / .csv / .parquet)")
+    parser.add_argument("--format", choices=FORMATS, help="output format (default : from the output file name)")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, help="input format (default : from the input file name)")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS)
+    parser.add_argument("--explain", action="store_true", help="add the SHAP top factors of every layer")
+    parser.add_argument("--pipeline", choices=["full", "tiered"], default=DECISION_PIPELINE,
+                        help="tiered : stop near-certain rows after PD + Anomaly (adds Tier / Outcome / Policy)")
+    parser.add_argument("--restart", action="store_true", help="ignore a checkpoint of an interrupted run")
+    args = parser.parse_args()
+    if args.format is None:
+        ext = os.path.splitext(args.output)[1].lower().lstrip(".")
+        args.format = {"jsonl": "ndjson", "pq": "parquet"}.get(ext, ext if ext in FORMATS else "ndjson")
+
+    try:
+        run(args)
+    except (ValueError, ImportError) as e:
+        sys.exit(f"Error : {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import json
+import sys
+
+from app.core.model_bundle import (
+    BundleError, ModelBundle, ARTIFACTS, build_bundle, current_version, list_versions,
+    set_current_version, LEGACY_VERSION,
+)
+
+# Model Bundle CLI :
+# Packs the trained artifacts of MODEL_PATHS ("ml/2*. Models/*/artifacts" + features_only.csv)
+# into a versioned bundle with a manifest of checksums and feature lists (app/core/model_bundle.py).
+#
+# Ship a retrained model without a restart :
+#   1. retrain in ml/ (new joblib artifacts)
+#   2. python -m app.bundle build v2 --activate        -> bundles/v2/ + bundles/CURRENT = v2
+#   3. curl -X POST localhost:8000/api/models/reload   (or kill -HUP <server pid>)
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m app.bundle build v2 [--activate]
+#   python -m app.bundle list
+#   python -m app.bundle verify v2
+#   python -m app.bundle activate v1                   (served from the next reload / restart)
+#   python -m app.bundle compile v2                    (ONNX scoring graph, SCORING_BACKEND = "onnx")
+
+
+def build(args):
+    bundle = build_bundle(args.version)
+    print(f"Built model version {bundle.version} (fingerprint {bundle.fingerprint}) in {bundle.root}")
+    if args.compile:
+        compile_graph(args)
+    if args.activate:
+        activate(args)
+
+
+# ONNX scoring graph of a version (app/core/onnx_graph.py), written next to its startup snapshot
+# Loads the registry of the version : the graph is built from its flat tree arrays + feature plan
+def compile_graph(args):
+    from app.core.model_registry import ModelRegistry
+    from app.core.onnx_graph import compile_scoring_graph
+    registry = ModelRegistry(ModelBundle.read(args.version))
+    path, data = compile_scoring_graph(registry)
+    print(f"Compiled the scoring graph of model version {args.version} : {path} ({len(data) / 2**20:.1f} MB)")
+
+
+def activate(args):
+    set_current_version(args.version)
+    print(f"bundles/CURRENT -> {args.version}")
+
+
+def verify(args):
+    bundle = ModelBundle.read(args.version)
+    for name in ARTIFACTS:
+        bundle.verify(name)
+    print(f"Model version {bundle.version} : {len(ARTIFACTS)} artifacts match their checksums")
+
+
+def list_bundles(args):
+    current = current_version() or LEGACY_VERSION
+    rows = [ModelBundle.read(v).summary() for v in list_versions()]
+    for row in rows:
+        row["current"] = row["version"] == current
+    print(json.dumps({"current": current, "versions": rows}, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinSight-AA model bundles : build, verify, activate")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("build", help="copy the MODEL_PATHS artifacts into a new bundle")
+    p.add_argument("version")
+    p.add_argument("--activate", action="store_true", help="also point bundles/CURRENT at it")
+    p.add_argument("--compile", action="store_true", help="also compile its ONNX scoring graph")
+    p.set_defaults(run=build)
+
+    p = commands.add_parser("activate", help=f"point bundles/CURRENT at a version ({LEGACY_VERSION} : MODEL_PATHS)")
+    p.add_argument("version")
+    p.set_defaults(run=activate)
+
+    p = commands.add_parser("verify", help="check every artifact against the manifest checksums")
+    p.add_argument("version")
+    p.set_defaults(run=verify)
+
+    p = commands.add_parser("compile", help="build the ONNX scoring graph of a version (SCORING_BACKEND = 'onnx')")
+    p.add_argument("version")
+    p.set_defaults(run=compile_graph)
+
+    p = commands.add_parser("list", help="bundles on disk + the current one")
+    p.set_defaults(run=list_bundles)
+
+    args = parser.parse_args()
+    try:
+        args.run(args)
+    except BundleError as e:
+        sys.exit(f"Error : {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.utils import shuffle
+
+# SHAP Background Summarization :
+# Interventional SHAP values are an average over background rows,
+# so explainer build time and memory grow with the background size.
+# A summary keeps a few rows + a weight per row (weights sum to 1)
+# so that the weighted summary stands in for the whole background.
+#
+# Strategies :
+#   "full"       -> every row, equal weights (reference, slow to build)
+#   "random"     -> uniform sample (sklearn shuffle, same rows shap.maskers.Independent keeps)
+#   "stratified" -> sample per risk label, weighted back to the label distribution
+#   "kmeans"     -> k-means centroids, weighted by cluster size
+#   "kmedoids"   -> real row nearest to every k-means centroid, weighted by cluster size
+#                   (approximate k-medoids : no O(n^2) PAM swap phase over 30k rows)
+# Clustering runs on standardized columns so income does not dominate the distance.
+
+STRATEGIES = ("full", "random", "stratified", "kmeans", "kmedoids")
+
+
+# X        : (rows, features) background matrix
+# labels   : (rows,) class of every row, only for "stratified"
+# Output   : (summary rows, weights)
+def summarize_background(X, strategy="random", size=100, labels=None, seed=0):
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown background strategy : {strategy}")
+
+    if strategy == "full" or n <= size:
+        return X, np.full(n, 1.0 / n)
+
+    if strategy == "random":
+        return shuffle(X, n_samples=size, random_state=seed), np.full(size, 1.0 / size)
+
+    if strategy == "stratified":
+        if labels is None:
+            raise ValueError("Stratified background needs one label per row")
+        return _stratified(X, np.asarray(labels), size, seed)
+
+    return _clustered(X, size, seed, medoids=(strategy == "kmedoids"))
+
+
+# Stratified Sample : rows per label proportional to the label share (at least 1 each)
+# Weight of a row = label share / rows kept for that label
+def _stratified(X, labels, size, seed):
+    classes, counts = np.unique(labels, return_counts=True)
+    share = counts / counts.sum()
+
+    # Largest remainder allocation of "size" rows over the labels
+    alloc = np.maximum(1, np.floor(share * size).astype(int))
+    while alloc.sum() < size:
+        alloc[np.argmax(share * size - alloc)] += 1
+    while alloc.sum() > size:
+        alloc[np.argmax(np.where(alloc > 1, alloc - share * size, -np.inf))] -= 1
+    alloc = np.minimum(alloc, counts)
+
+    rows, weights = [], []
+    for c, k, p in zip(classes, alloc, share):
+        rows.append(shuffle(X[labels == c], n_samples=k, random_state=seed))
+        weights.append(np.full(k, p / k))
+    return np.concatenate(rows), np.concatenate(weights)
+
+
+# Clustered Summary : k-means on standardized columns
+def _clustered(X, size, seed, medoids=False):
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    std[std == 0] = 1.0
+    Z = (X - mean) / std
+
+    km = KMeans(n_clusters=size, n_init=1, random_state=seed).fit(Z)
+    weights = np.bincount(km.labels_, minlength=size) / len(X)
+
+    if not medoids:
+        return km.cluster_centers_ * std + mean, weights
+
+    # Nearest real row of every cluster to its centroid
+    dist = ((Z - km.cluster_centers_[km.labels_]) ** 2).sum(axis=1)
+    rows = np.empty((size, X.shape[1]))
+    for k in range(size):
+        members = np.flatnonzero(km.labels_ == k)
+        rows[k] = X[members[np.argmin(dist[members])]]
+    return rows, weights
@@ -1,13 +1,14 @@
 """
 Configuration settings for the FastAPI application.
 """
+import os
 from pathlib import Path
 
 # Base directory: API-CreditDecisionEngine/
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 # ML directory: sibling of API-CreditDecisionEngine/
-ML_DIR = BASE_DIR.parent / "ML"
+ML_DIR = BASE_DIR.parent / "ml"
 
 # Model artifact paths
 MODEL_PATHS = {
@@ -37,4 +38,208 @@ MODEL_PATHS = {
     "bg_data": ML_DIR / "3. Data/1. Raw_Features/features_only.csv",
 }
 
+# Isolation Forest input features (the anomaly notebook does not save them as an artifact)
+IF_FEATURES = ['avgMonthlyIncome', 'incomeCV', 'expenseRatio',
+               'emiRatio', 'avgMonthlyBalance', 'bounceCount']
 
+
+# RL Explainer
+# "exact"  : closed-form Shapley values over the Q-table (deterministic, microseconds)
+# "kernel" : shap.KernelExplainer over the Q policy function (old behaviour, fallback)
+RL_EXPLAINER = "exact"
+
+# Precompute the exact Shapley values for every discrete Q-learning state at startup
+# (Only used when RL_EXPLAINER = "exact")
+RL_EXPLAINER_PRECOMPUTE = True
+
+# SHAP background sample
+# shap.maskers.Independent keeps at most 100 background rows
+# (sklearn.utils.shuffle with random_state=0), native explainers use the same sample
+SHAP_BACKGROUND_SIZE = 100
+SHAP_BACKGROUND_SEED = 0
+
+# SHAP background summarization per layer (app/core/background.py)
+# strategy : "random"     -> uniform sample (same rows as shap.maskers.Independent)
+#            "stratified" -> sample per risk label, weighted back to the label distribution
+#            "kmeans"     -> weighted k-means centroids
+#            "kmedoids"   -> weighted real rows nearest to the k-means centroids
+#            "full"       -> every background row (reference)
+# size     : rows kept (ignored for "full")
+# Compare settings with : python -m scripts.background_report
+SHAP_BACKGROUNDS = {
+    "PD":          {"strategy": "random", "size": SHAP_BACKGROUND_SIZE},
+    "HybridScore": {"strategy": "random", "size": SHAP_BACKGROUND_SIZE},
+}
+
+# PD Explainer
+# "native" : closed-form linear SHAP coef * (x_scaled - mean(background)) with NumPy
+# "shap"   : shap.LinearExplainer (old behaviour, fallback)
+PD_EXPLAINER = "native"
+
+# Tree Explainers : Isolation Forest, Random Forest, Gradient Boosting
+# "native" : in-project TreeSHAP over the flattened tree arrays of the registry
+# "shap"   : shap.TreeExplainer / shap.Explainer (old behaviour, fallback)
+TREE_EXPLAINER = "native"
+
+# Native TreeSHAP batching : rows per chunk and parallel chunks for large batches
+# TREE_SHAP_BACKEND : "thread" or "process"
+TREE_SHAP_CHUNK_SIZE = 128
+TREE_SHAP_N_JOBS = 1
+TREE_SHAP_BACKEND = "thread"
+
+# Deferred Explanations : POST /credit/decision?explain=deferred
+# EXPLAIN_WORKERS           : background threads computing SHAP explanations
+# EXPLAIN_MAX_PENDING       : max queued jobs, above this decisions are stored as NOT_QUEUED (no explanations)
+# EXPLAIN_STORE_MAX_ITEMS   : max decisions kept in memory (oldest evicted first)
+# EXPLAIN_STORE_TTL_SECONDS : decisions older than this are evicted
+EXPLAIN_WORKERS = 2
+EXPLAIN_MAX_PENDING = 256
+EXPLAIN_STORE_MAX_ITEMS = 10000
+EXPLAIN_STORE_TTL_SECONDS = 900
+
+# Decision Cache : same validated feature vector + same model version -> same decision
+# Shared by /credit/decision and the /explain/* routes (LRU + TTL eviction)
+DECISION_CACHE_MAX_ITEMS = 10000
+DECISION_CACHE_TTL_SECONDS = 3600
+
+# SHAP Plot Rendering : /explain/* routes
+# PLOT_WORKERS         : render worker processes (bounded pool, off the event loop)
+# PLOT_CACHE_MAX_ITEMS : rendered PNGs kept in memory, keyed by (input hash, plot type)
+# PLOT_CACHE_TTL_SECONDS : PNGs older than this are rendered again
+PLOT_WORKERS = 2
+PLOT_CACHE_MAX_ITEMS = 2000
+PLOT_CACHE_TTL_SECONDS = 3600
+
+# Startup
+# STARTUP_SNAPSHOT      : save / reuse the prepared background + flat tree arrays + dense Q-table
+#                         (one file per model version, rebuilt when an artifact changes)
+# STARTUP_SNAPSHOT_DIR  : where snapshots are written
+# STARTUP_SNAPSHOT_MMAP : open the snapshot arrays as read-only memory maps
+#                         (API worker processes share the same physical pages)
+# LAZY_EXPLAINERS       : build each SHAP explainer on first use instead of at import
+# WARMUP_ON_STARTUP     : run one synthetic request through every layer before /ready
+STARTUP_SNAPSHOT = True
+STARTUP_SNAPSHOT_DIR = BASE_DIR / "snapshots"
+STARTUP_SNAPSHOT_MMAP = True
+LAZY_EXPLAINERS = True
+WARMUP_ON_STARTUP = True
+
+# Batch Decisions : POST /credit/decision/batch and the gRPC DecideBatch call
+# MAX_BATCH_ROWS : most applicants in one batch (one synchronous engine call, SHAP for every row),
+#                  larger batches are rejected (413 / INVALID_ARGUMENT) : whole files go to the bulk endpoint
+MAX_BATCH_ROWS = 1000
+
+# Micro-Batching : POST /credit/decision
+# Concurrent requests are coalesced into one vectorized engine call
+# MICROBATCH_MAX_BATCH   : max rows per engine call
+# MICROBATCH_MAX_WAIT_MS : max time the first request of a batch waits for others
+# MICROBATCH_MAX_QUEUE   : queued requests above this are rejected with 503 (backpressure)
+# MICROBATCH_WORKERS     : batches running at the same time (inference threads)
+MICROBATCH_ENABLED = True
+MICROBATCH_MAX_BATCH = 32
+MICROBATCH_MAX_WAIT_MS = 5
+MICROBATCH_MAX_QUEUE = 1024
+MICROBATCH_WORKERS = 1
+
+# Instrumentation : per-stage timing spans (models, scalers, explainers, cache, queue, rendering)
+# METRICS_ENABLED        : histograms + counters, exposed in Prometheus text format at GET /metrics
+# SERVER_TIMING_ENABLED  : Server-Timing header on /api/credit/decision, /api/credit/whatif and /api/explain/* responses
+# METRICS_BUCKETS_SECONDS: upper bounds of the latency histogram buckets
+METRICS_ENABLED = True
+SERVER_TIMING_ENABLED = True
+METRICS_BUCKETS_SECONDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Bulk Scoring : python -m app.bulk_score and POST /api/credit/decision/bulk
+# BULK_CHUNK_SIZE          : rows read, scored and written at a time (bounds memory)
+# BULK_WORKERS             : scoring processes (1 -> chunks are scored in the calling process)
+# BULK_INFLIGHT_PER_WORKER : chunks queued per worker ahead of the writer
+# BULK_WORKERS is the per-job pool of the CLI only. The API shares one bounded pool per process :
+# BULK_API_WORKERS         : scoring processes of that pool (started on the first upload, reused by every job)
+# BULK_API_MAX_JOBS        : uploads scored at once per API process, more are rejected with 429
+BULK_CHUNK_SIZE = 2000
+BULK_WORKERS = os.cpu_count() or 1
+BULK_INFLIGHT_PER_WORKER = 2
+BULK_API_WORKERS = 2
+BULK_API_MAX_JOBS = 1
+
+# Rule-Based Credit Score (app/engines/rule_engine.py) : 300 - 900 score next to HybridScore
+# RULE_SCORE_ENABLED : add the optional "RuleScore" section (score + points per sector) to every decision
+#                      and the Rule_Score bulk column (off : responses keep their previous payload)
+# RULE_SCORE_TABLE   : "training"   -> points of the notebook that produced feature_with_rule_score.csv
+#                      "documented" -> points of RULE_ENGINE.md
+RULE_SCORE_ENABLED = False
+RULE_SCORE_TABLE = "training"
+
+# Decision Pipeline (app/engines/tier_policy.py)
+# DECISION_PIPELINE : "full"   -> every layer + every explainer for every applicant (default)
+#                     "tiered" -> PD + Anomaly first, then the policies of TIER_POLICY_TABLE may stop
+#                                 a row with REJECT / REVIEW or skip explainers (high-volume pre-screening)
+#                     /credit/decision/batch, /credit/decision/bulk and app.bulk_score also take it per call
+# TIER_POLICY_TABLE : policy table of the tiered pipeline ("prescreen")
+# Compare both with : python -m scripts.benchmark
+DECISION_PIPELINE = "full"
+TIER_POLICY_TABLE = "prescreen"
+
+# Model Bundles (app/core/model_bundle.py) : versioned copies of MODEL_PATHS + one manifest.json
+# (sha256 of every artifact + the feature list of every layer)
+# MODEL_BUNDLE_DIR      : one sub-directory per version, "CURRENT" file = version served at startup
+#                         no bundle / no CURRENT file -> the artifacts of MODEL_PATHS are served as version "dev"
+# MODEL_RELOAD_ENABLED  : POST /api/models/reload builds + warms the new version in the background,
+#                         then swaps it in (in-flight requests finish on the old version)
+#                         The route has no authentication : off by default, turn it on only behind
+#                         a network that lets admins alone reach it (SIGHUP works either way)
+# MODEL_RELOAD_SIGNAL   : the same reload on SIGHUP (app/serve.py : rolling restart of the workers)
+MODEL_BUNDLE_DIR = BASE_DIR / "bundles"
+MODEL_RELOAD_ENABLED = False
+MODEL_RELOAD_SIGNAL = True
+
+# gRPC Transport (app/rpc/) : the decision service over protobuf, next to the HTTP / JSON routes
+# (same engine, decision cache, micro-batcher and metrics, needs grpcio + protobuf)
+# RPC_ENABLED       : start the gRPC server with the FastAPI app (python -m app.serve --rpc-port also enables it)
+# RPC_HOST / RPC_PORT : TCP address (RPC_PORT = None -> no TCP listener)
+#                     with app/serve.py every worker serves this port (SO_REUSEPORT)
+# RPC_UNIX_SOCKET   : Unix-domain socket path for a co-located caller (None -> no socket)
+#                     single-process servers only (uvicorn app.main:app), app/serve.py workers skip it
+# RPC_STREAM_WINDOW : DecideStream decisions in flight per stream (read ahead of the answers)
+# Compare with the HTTP route : python -m scripts.rpc_benchmark
+RPC_ENABLED = False
+RPC_HOST = "127.0.0.1"
+RPC_PORT = 50051
+RPC_UNIX_SOCKET = "/tmp/finsight-credit.sock"
+RPC_STREAM_WINDOW = 64
+
+# What-If Sweep : POST /credit/whatif (app/engines/whatif.py)
+# WHATIF_MAX_CELLS : largest grid (product of the axis lengths) scored in one call
+#                    (every layer, no explanations : 100 x 100 points ~ 0.1 s on 1 CPU)
+WHATIF_MAX_CELLS = 40000
+
+# Scoring Backend (app/core/onnx_graph.py) : how the 5 layers are scored (explanations never change)
+# SCORING_BACKEND       : "sklearn" -> one sklearn / NumPy call per layer (default)
+#                         "onnx"    -> the whole chain as ONE ONNX graph run by onnxruntime on CPU
+#                                      (needs onnx + onnxruntime, same outputs : python -m scripts.onnx_parity)
+#                         compile the graph at bundle build time : python -m app.bundle compile <version>
+# ONNX_INTRA_OP_THREADS : threads of one graph run. 1 per API worker process : the micro-batches are
+#                         small and the workers already use every core (benchmark : --onnx-threads)
+# ONNX_ALLOW_SPINNING   : let idle intra-op threads spin-wait between runs (only with threads > 1)
+# ONNX_MAX_ROWS         : larger matrices (bulk chunks, what-if grids) use the sklearn path : its per-tree
+#                         loops win on big batches (1 CPU : 1 row 14 ms -> 0.06 ms, 32 rows 14.7 -> 1.0 ms,
+#                         even around 1800 rows)
+SCORING_BACKEND = "sklearn"
+ONNX_INTRA_OP_THREADS = 1
+ONNX_ALLOW_SPINNING = False
+ONNX_MAX_ROWS = 1024
+
+# Explanation Index (app/services/explanation_index.py) : SHAP values of every background row
+# (features_only.csv) through every explainer, one file per model version -> GET /api/explain/global/{layer}
+# EXPLAIN_INDEX_DIR        : where the index files are written (one per bundle fingerprint)
+# EXPLAIN_INDEX_WORKERS    : processes of a build (1 -> chunks are explained in the calling process)
+# EXPLAIN_INDEX_CHUNK_SIZE : background rows per engine call of a build
+# EXPLAIN_INDEX_AUTO_BUILD : build the index of the serving version in the background when it is missing
+#                            (startup + after a hot reload), else : python -m app.explain_index build
+# EXPLAIN_INDEX_BUILD_ENABLED : POST /api/explain/global/build (a multi-core build of about 45 s, no authentication :
+#                               off by default, same as MODEL_RELOAD_ENABLED)
+EXPLAIN_INDEX_DIR = STARTUP_SNAPSHOT_DIR
+EXPLAIN_INDEX_WORKERS = os.cpu_count() or 1
+EXPLAIN_INDEX_CHUNK_SIZE = 2000
+EXPLAIN_INDEX_AUTO_BUILD = False
+EXPLAIN_INDEX_BUILD_ENABLED = False
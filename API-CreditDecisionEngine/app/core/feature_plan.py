@@ -0,0 +1,84 @@
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+# Feature Plan :
+# Compiled once by the registry, used by engine.score_batch instead of a pandas DataFrame.
+#
+#   input rows (dicts) --> ONE float64 matrix : [7 input features | PD | anomalyFlag]
+#                          every layer reads its columns through a fixed index array
+#
+#   pd_features     -> X[:, index["pd"]]     then MinMaxScaler as NumPy   (X * scale_ + min_)
+#   if_features     -> X[:, index["if"]]     then StandardScaler as NumPy ((X - mean_) / scale_)
+#   risk_features   -> X[:, index["risk"]]   (PD + anomalyFlag slots filled after their layers)
+#   hybrid_features -> X[:, index["hybrid"]]
+#
+# The scalers run the same in-place NumPy operations, in the same order, as sklearn's transform,
+# and the models receive the same float64 values as from the DataFrame, so every output is
+# bit-for-bit identical. Any other scaler type falls back to scaler.transform on the array.
+
+# Columns computed by the engine (not part of the request)
+DERIVED_FEATURES = ("PD", "anomalyFlag")
+
+
+class FeaturePlan:
+
+    # layers  : {layer: feature names in the order the model was trained on}
+    # scalers : {layer: fitted sklearn scaler of that layer}
+    def __init__(self, layers, scalers=None, derived=DERIVED_FEATURES):
+        # Step 1 : Request features (first appearance order) + derived slots
+        self.inputs = []
+        for names in layers.values():
+            for name in names:
+                if name not in derived and name not in self.inputs:
+                    self.inputs.append(name)
+        self.columns = self.inputs + list(derived)
+        self.slot = {name: i for i, name in enumerate(self.columns)}
+
+        # Step 2 : Column index array of every layer
+        self.index = {
+            layer: np.array([self.slot[name] for name in names], dtype=np.intp)
+            for layer, names in layers.items()
+        }
+
+        # Step 3 : Scaler constants of every scaled layer
+        self.scalers = {layer: _compile_scaler(scaler) for layer, scaler in (scalers or {}).items()}
+
+
+    # Input rows (dicts) -> (rows, columns) float64 matrix, derived slots set to 0
+    def matrix(self, rows):
+        X = np.zeros((len(rows), len(self.columns)))
+        X[:, :len(self.inputs)] = [[row[name] for name in self.inputs] for row in rows]
+        return X
+
+
+    # Model input of one layer : (rows, layer features), a copy
+    def take(self, X, layer):
+        return X[:, self.index[layer]]
+
+
+    # Scaled model input of one layer
+    def scaled(self, X, layer):
+        X_layer = X[:, self.index[layer]]
+        kind, a, b = self.scalers[layer]
+        if kind == "standard":
+            if a is not None:
+                X_layer -= a
+            if b is not None:
+                X_layer /= b
+        elif kind == "minmax":
+            X_layer *= a
+            X_layer += b
+        else:
+            X_layer = a.transform(X_layer)
+        return X_layer
+
+
+# Scaler -> (kind, constant a, constant b)
+def _compile_scaler(scaler):
+    if type(scaler) is StandardScaler:
+        mean = scaler.mean_ if scaler.with_mean else None
+        scale = scaler.scale_ if scaler.with_std else None
+        return ("standard", mean, scale)
+    if type(scaler) is MinMaxScaler and not scaler.clip:
+        return ("minmax", scaler.scale_, scaler.min_)
+    return ("sklearn", scaler, None)
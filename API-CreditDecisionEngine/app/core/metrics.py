@@ -0,0 +1,176 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from app.core.config import METRICS_ENABLED, METRICS_BUCKETS_SECONDS
+
+# Instrumentation :
+# span("stage") times one stage of the hot path (scaler, model, explainer, cache, queue, render)
+#   1. the duration goes into a latency histogram per stage (GET /metrics, Prometheus text format)
+#   2. the duration is added to the timings of the current request (Server-Timing header)
+#
+#   with span("pd_model"):
+#       scores["pd"] = registry.pd_model.predict_proba(...)
+#
+# Request timings live in a context variable, so they follow the request through
+# "await" and run_in_threadpool. Threads that serve many requests at once (micro-batcher)
+# collect the timings of their batch and hand them back to every request of the batch.
+#
+# METRICS_ENABLED = False -> span() returns one shared no-op context manager (no clock read, no lock)
+# Metrics are per process : with app/serve.py every worker exposes its own /metrics.
+
+# Metric name -> (type, help)
+METRIC_HELP = {
+    "credit_stage_seconds":        ("histogram", "Duration of one hot path stage (model, scaler, explainer, cache, queue, render)"),
+    "credit_stage_errors_total":   ("counter",   "Stages that raised an exception"),
+    "credit_request_seconds":      ("histogram", "Duration of one HTTP request, by endpoint"),
+    "credit_requests_total":       ("counter",   "HTTP requests, by endpoint and status code"),
+    "credit_request_errors_total": ("counter",   "HTTP requests answered with a 5xx status code, by endpoint"),
+    "credit_model_reloads_total":  ("counter",   "Model hot reloads, by status (ok / failed)"),
+    "credit_tier_exits_total":     ("counter",   "Rows scored by the tiered pipeline, by tier they stopped at and outcome"),
+}
+
+# Timings of the request being served : {stage: seconds} (None outside a request)
+_request_timings = ContextVar("request_timings", default=None)
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        # counts[i] : observations <= buckets[i] (and above the previous bound), last = +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+
+    def __init__(self, enabled=METRICS_ENABLED, buckets=METRICS_BUCKETS_SECONDS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (metric name, ((label, value), ...)) -> Histogram / counter value
+        self._histograms = {}
+        self._counters = {}
+
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+
+    # Prometheus text exposition format (version 0.0.4)
+    def render(self) -> str:
+        with self._lock:
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        for name, (kind, text) in METRIC_HELP.items():
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {value}")
+                continue
+            for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, n in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {total}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+# Global metrics instance
+metrics = Metrics()
+
+
+# Duration of one stage -> stage histogram + timings of the current request
+def record(stage, seconds):
+    metrics.observe("credit_stage_seconds", seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+class _Span:
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            metrics.inc("credit_stage_errors_total", stage=self.stage)
+        return False
+
+
+_NO_SPAN = nullcontext()
+
+
+# Timing span of one stage (no-op when metrics are disabled)
+def span(stage):
+    if not metrics.enabled:
+        return _NO_SPAN
+    return _Span(stage)
+
+
+# Collect the stage timings of everything run inside the block : {stage: seconds}
+@contextmanager
+def collect_timings():
+    timings = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+# Add timings collected elsewhere (another thread) to the current request
+def add_timings(timings):
+    current = _request_timings.get()
+    if current is not None:
+        for stage, seconds in timings.items():
+            current[stage] = current.get(stage, 0.0) + seconds
+
+
+# Server-Timing header value : "pd_model;dur=0.210, shap_pd;dur=0.015, total;dur=3.402" (milliseconds)
+def server_timing_header(timings, total):
+    parts = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+import joblib
+
+from app.core.config import MODEL_PATHS, MODEL_BUNDLE_DIR, IF_FEATURES
+
+# Model Bundle :
+# One directory per model version, everything the registry needs to serve it :
+#
+#   bundles/
+#     CURRENT                      <- version served at startup ("v2")
+#     v2/
+#       manifest.json              <- format, version, created_at, sha256 of every artifact, feature lists
+#       pd_model.joblib  pd_scaler.joblib  isolation_forest.joblib  ...  features_only.csv
+#
+# The feature lists of every layer live in the manifest (not in joblib files),
+# so the Isolation Forest features are no longer hard-coded in the registry.
+# Every artifact is checked against its sha256 before it is loaded.
+#
+# Without any bundle the registry serves the artifacts of MODEL_PATHS directly (version "dev").
+#
+# Build / activate (from API-CreditDecisionEngine/) :
+#   python -m app.bundle build v2 --activate
+
+# Bump when the manifest layout changes
+BUNDLE_FORMAT = 1
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+
+# Version name of the unbundled MODEL_PATHS artifacts
+LEGACY_VERSION = "dev"
+
+# Version names are plain directory names : v2, 2026-10-18, pd-retrain.3
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+# Artifacts copied into a bundle (feature lists go to the manifest instead)
+ARTIFACTS = ["pd_model", "pd_scaler", "iso_model", "if_scaler", "risk_model",
+             "hybrid_model", "q_table", "q_bins", "bg_data"]
+
+# Manifest feature list -> MODEL_PATHS feature artifact (None : IF_FEATURES)
+FEATURE_ARTIFACTS = {
+    "pd":     "pd_features",
+    "if":     None,
+    "risk":   "risk_features",
+    "hybrid": "hybrid_features",
+    "rl":     "q_features",
+}
+
+
+class BundleError(ValueError):
+    pass
+
+
+class ModelBundle:
+
+    # root      : bundle directory (None for the unbundled MODEL_PATHS artifacts)
+    # artifacts : {name: {"path": Path, "sha256": hex}}
+    # features  : {layer: [feature names]}
+    def __init__(self, version, artifacts, features, root=None, created_at=None):
+        self.version = version
+        self.artifacts = artifacts
+        self.features = features
+        self.root = root
+        self.created_at = created_at
+        # Fingerprint : sha256 over every artifact checksum + the feature lists (first 16 hex chars)
+        # Same artifacts -> same fingerprint, whatever the version name (feeds snapshot names + cache keys)
+        digest = hashlib.sha256()
+        for name in sorted(artifacts):
+            digest.update(f"{name}:{artifacts[name]['sha256']};".encode())
+        digest.update(json.dumps(features, sort_keys=True).encode())
+        self.fingerprint = digest.hexdigest()[:16]
+
+
+    # Read bundles/<version>/manifest.json (artifacts are checked later, by verify)
+    @classmethod
+    def read(cls, version, bundle_dir=MODEL_BUNDLE_DIR):
+        root = Path(bundle_dir) / check_version(version)
+        try:
+            with open(root / MANIFEST) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            raise BundleError(f"Unknown model version : {version}")
+        except ValueError as e:
+            raise BundleError(f"Bad manifest of model version {version} ({e})")
+        if manifest.get("format") != BUNDLE_FORMAT:
+            raise BundleError(f"Model version {version} has manifest format {manifest.get('format')}, expected {BUNDLE_FORMAT}")
+        if manifest.get("version") != version:
+            raise BundleError(f"Manifest of {root.name} names version {manifest.get('version')}")
+        missing = [name for name in ARTIFACTS if name not in manifest["artifacts"]]
+        missing += [layer for layer in FEATURE_ARTIFACTS if layer not in manifest["features"]]
+        if missing:
+            raise BundleError(f"Manifest of model version {version} misses : {', '.join(missing)}")
+        artifacts = {
+            name: {"path": root / item["file"], "sha256": item["sha256"]}
+            for name, item in manifest["artifacts"].items()
+        }
+        return cls(manifest["version"], artifacts, manifest["features"], root=root,
+                   created_at=manifest.get("created_at"))
+
+
+    # Unbundled artifacts of MODEL_PATHS (checksums computed from the files)
+    @classmethod
+    def from_paths(cls, paths=MODEL_PATHS, version=LEGACY_VERSION):
+        artifacts = {name: {"path": Path(paths[name]), "sha256": file_sha256(paths[name])} for name in ARTIFACTS}
+        return cls(version, artifacts, read_features(paths))
+
+
+    def path(self, name):
+        return self.artifacts[name]["path"]
+
+
+    # Load one artifact after checking its sha256 (a half-copied or edited file never gets served)
+    def load(self, name):
+        self.verify(name)
+        return joblib.load(self.path(name))
+
+
+    def verify(self, name):
+        if self.root is None:
+            return
+        actual = file_sha256(self.path(name))
+        if actual != self.artifacts[name]["sha256"]:
+            raise BundleError(f"Checksum mismatch of {name} in model version {self.version}")
+
+
+    def summary(self):
+        return {"version": self.version, "fingerprint": self.fingerprint, "created_at": self.created_at}
+
+
+# sha256 of one file (hex), read in 1 MB blocks
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Feature list of every layer from the MODEL_PATHS feature artifacts
+def read_features(paths=MODEL_PATHS):
+    return {
+        layer: list(joblib.load(paths[name])) if name else list(IF_FEATURES)
+        for layer, name in FEATURE_ARTIFACTS.items()
+    }
+
+
+def check_version(version):
+    if not isinstance(version, str) or not VERSION_PATTERN.match(version) or version == LEGACY_VERSION:
+        raise BundleError(f"Invalid model version name : {version!r}")
+    return version
+
+
+# Version named in bundles/CURRENT (None : no bundle activated -> "dev")
+def current_version(bundle_dir=MODEL_BUNDLE_DIR):
+    try:
+        version = (Path(bundle_dir) / CURRENT).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+# Point bundles/CURRENT at a version (atomic rename, the bundle must exist)
+# "dev" removes the pointer (back to the MODEL_PATHS artifacts)
+def set_current_version(version, bundle_dir=MODEL_BUNDLE_DIR):
+    path = Path(bundle_dir) / CURRENT
+    if version == LEGACY_VERSION:
+        path.unlink(missing_ok=True)
+        return
+    ModelBundle.read(version, bundle_dir)
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(version + "\n")
+    os.replace(tmp, path)
+
+
+# Bundle of a version (None : the CURRENT one, or "dev" when there is none)
+def open_bundle(version=None, bundle_dir=MODEL_BUNDLE_DIR):
+    version = version or current_version(bundle_dir)
+    if version is None or version == LEGACY_VERSION:
+        return ModelBundle.from_paths()
+    return ModelBundle.read(version, bundle_dir)
+
+
+# Versions found in the bundle directory (oldest first)
+def list_versions(bundle_dir=MODEL_BUNDLE_DIR):
+    root = Path(bundle_dir)
+    if not root.is_dir():
+        return []
+    versions = [p.name for p in root.iterdir() if (p / MANIFEST).is_file()]
+    return sorted(versions, key=lambda v: (root / v / MANIFEST).stat().st_mtime)
+
+
+# Build a new bundle from the artifacts of MODEL_PATHS (or any paths with the same names)
+# Written into a temporary directory first and renamed : a bundle directory is always complete
+def build_bundle(version, paths=MODEL_PATHS, bundle_dir=MODEL_BUNDLE_DIR):
+    root = Path(bundle_dir) / check_version(version)
+    if root.exists():
+        raise BundleError(f"Model version {version} already exists")
+    tmp = Path(bundle_dir) / f".tmp-{version}-{os.getpid()}"
+    tmp.mkdir(parents=True)
+    try:
+        artifacts = {}
+        for name in ARTIFACTS:
+            src = Path(paths[name])
+            shutil.copyfile(src, tmp / src.name)
+            artifacts[name] = {"file": src.name, "sha256": file_sha256(tmp / src.name)}
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "artifacts": artifacts,
+            "features": read_features(paths),
+        }
+        with open(tmp / MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(tmp, root)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return ModelBundle.read(version, bundle_dir)
@@ -1,76 +1,259 @@
+import os
+import time
 import joblib
 import pandas as pd
 import numpy as np
-from pathlib import Path
-from app.core.config import MODEL_PATHS
+from contextlib import contextmanager
+from app.core.config import (
+    SHAP_BACKGROUNDS, SHAP_BACKGROUND_SEED,
+    STARTUP_SNAPSHOT, STARTUP_SNAPSHOT_DIR, STARTUP_SNAPSHOT_MMAP, SCORING_BACKEND,
+)
+from app.core.tree_arrays import flatten_tree_ensemble
+from app.core.background import summarize_background
+from app.core.feature_plan import FeaturePlan
+from app.core.onnx_graph import open_scoring_graph
+from app.core.model_bundle import open_bundle
 
-# ModelRegistry : 
-# This is the singleton class that loads all the models once at the application startup
-# and keeps them in memory for fast access
+# Q values used for states that never appeared during Q-learning training
+Q_TABLE_DEFAULT = 0.0
+
+# Bump when the content of the startup snapshot changes (old snapshots are then ignored)
+SNAPSHOT_FORMAT = 2
 
-#Singleton Pattern : 
-# A class that can have only one instance at a time
-# It will Use for memory optimization and fast access
+# ModelRegistry : 
+# Loads every model of ONE model bundle (app/core/model_bundle.py) and keeps them in memory for fast access
+#
+# One registry per model version : a hot reload (app/services/model_manager.py) builds a new
+# registry next to the one serving traffic, then swaps them. Requests in flight keep using
+# the registry they started with, so a registry is never modified after __init__.
 
 class ModelRegistry:
     
-    
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ModelRegistry, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-    
-    def __init__(self):
-        if self._initialized:
-            return
-        
+    # bundle = None -> the bundle named in bundles/CURRENT (or the MODEL_PATHS artifacts as "dev")
+    def __init__(self, bundle=None):
+        # Startup timing report : seconds per artifact / step
+        self.startup_timings = {}
+
+        # Model version : bundle version (reported in every response)
+        # Fingerprint   : checksums of every artifact + feature lists (feeds snapshot names + cache keys)
+        with self._timed("manifest"):
+            self.bundle = bundle or open_bundle()
+        self.model_version = self.bundle.version
+        self.fingerprint = self.bundle.fingerprint
+        features = self.bundle.features
+
         # Load PD Model artifacts
-        self.pd_model = joblib.load(MODEL_PATHS["pd_model"])
-        self.pd_scaler = joblib.load(MODEL_PATHS["pd_scaler"])
-        self.pd_features = joblib.load(MODEL_PATHS["pd_features"])
+        self.pd_model = self._load("pd_model")
+        self.pd_scaler = self._load("pd_scaler")
+        self.pd_features = features["pd"]
         print("PD Model loaded")
         
         # Load Anomaly Model artifacts
-        self.iso_model = joblib.load(MODEL_PATHS["iso_model"])
-        self.if_scaler = joblib.load(MODEL_PATHS["if_scaler"])
-        self.if_features = ['avgMonthlyIncome', 'incomeCV', 'expenseRatio', 
-                           'emiRatio', 'avgMonthlyBalance', 'bounceCount']
+        self.iso_model = self._load("iso_model")
+        self.if_scaler = self._load("if_scaler")
+        self.if_features = features["if"]
         print("Isolation Forest loaded")
         
         # Load Risk Label Model artifacts
-        self.risk_model = joblib.load(MODEL_PATHS["risk_model"])
-        self.risk_features = joblib.load(MODEL_PATHS["risk_features"])
+        self.risk_model = self._load("risk_model")
+        self.risk_features = features["risk"]
         print("Risk Model loaded")
         
         # Load Hybrid Credit Score Model artifacts
-        self.hybrid_model = joblib.load(MODEL_PATHS["hybrid_model"])
-        self.hybrid_features = joblib.load(MODEL_PATHS["hybrid_features"])
+        self.hybrid_model = self._load("hybrid_model")
+        self.hybrid_features = features["hybrid"]
         print("Hybrid Credit Score Model loaded")
         
         # Load Q-Learning RL Model artifacts
-        self.q_table = joblib.load(MODEL_PATHS["q_table"])
-        self.q_bins = joblib.load(MODEL_PATHS["q_bins"])
-        self.q_features = joblib.load(MODEL_PATHS["q_features"])
+        self.q_table = self._load("q_table")
+        self.q_bins = self._load("q_bins")
+        self.q_features = features["rl"]
         print("Q-Learning Model loaded")
+
+        # Feature Plan : column index arrays of every layer over one float matrix
+        # + scaler constants, so scoring never builds a pandas DataFrame (app/core/feature_plan.py)
+        self.feature_plan = FeaturePlan(
+            {"pd": self.pd_features, "if": self.if_features,
+             "risk": self.risk_features, "hybrid": self.hybrid_features},
+            scalers={"pd": self.pd_scaler, "if": self.if_scaler},
+        )
         
-        # Load background data for SHAP explainers
-        self.bg_data = pd.read_csv(MODEL_PATHS["bg_data"])
+        # Prepared state : background data with PD and anomaly flags + flat tree arrays + dense Q-table
+        # Reused from the snapshot of a previous boot when the artifacts did not change
+        # With STARTUP_SNAPSHOT_MMAP its arrays are read-only memory maps of the snapshot file,
+        # so every API worker process shares the same physical pages
+        with self._timed("snapshot_load"):
+            state = self._load_snapshot()
+        if state is None:
+            state = self._prepare_state()
+            with self._timed("snapshot_save"):
+                if self._save_snapshot(state):
+                    # Re-open the fresh snapshot so this process uses the memory maps too
+                    state = self._load_snapshot() or state
+
+        self.bg_data      = state["bg_data"]
+        # Compile the dict Q-table into a dense array for vectorized lookup
+        self.q_values     = state["q_values"]
+        # Flatten every tree ensemble into contiguous node arrays (for native TreeSHAP)
+        self.iso_trees    = state["iso_trees"]
+        self.risk_trees   = state["risk_trees"]
+        self.hybrid_trees = state["hybrid_trees"]
         
+        # Risk label of every background row : only when a layer uses the "stratified" background,
+        # computed here so the registry is never modified after __init__ (None otherwise)
+        self.bg_risk_labels = None
+        if any(setting["strategy"] == "stratified" for setting in SHAP_BACKGROUNDS.values()):
+            self.bg_risk_labels = self.predict_bg_risk_labels()
+
+        # Linear SHAP vectors for the PD layer (computed once)
+        # Coefficients of the logistic regression : (features,)
+        self.pd_coef = self.pd_model.coef_[0].copy()
+        self.pd_intercept = float(self.pd_model.intercept_[0])
+        # Summarized SHAP backgrounds per layer : (rows, weights), see SHAP_BACKGROUNDS
+        with self._timed("background_PD"):
+            X_pd_all = self.pd_scaler.transform(self.bg_data[self.pd_features])
+            self.pd_background = self.layer_background("PD", X_pd_all)
+        with self._timed("background_HybridScore"):
+            self.hybrid_background = self.layer_background(
+                "HybridScore", self.bg_data[self.hybrid_features].values
+            )
+        # Weighted mean of the scaled PD background : (features,)
+        self.pd_bg_mean = np.average(self.pd_background[0], axis=0, weights=self.pd_background[1])
+
+        # Scoring Graph : every layer as one ONNX graph (SCORING_BACKEND = "onnx", app/core/onnx_graph.py)
+        # None -> the engine calls the sklearn models
+        self.scoring_graph = None
+        if SCORING_BACKEND == "onnx":
+            with self._timed("scoring_graph"):
+                self.scoring_graph = open_scoring_graph(self)
+
+        print(f"Background data prepared for SHAP (model version {self.model_version})")
+
+
+    # Prepared State : everything derived from the artifacts that is slow to rebuild
+    # (PD + anomaly flag over the whole background, Isolation Forest path lengths, ...)
+    def _prepare_state(self):
+        # Load background data for SHAP explainers
+        with self._timed("bg_data"):
+            self.bundle.verify("bg_data")
+            bg_data = pd.read_csv(self.bundle.path("bg_data"))
+
         # Prepare background data with PD and anomaly flags
-        X_pd_all = self.pd_scaler.transform(self.bg_data[self.pd_features])
-        self.bg_data['PD'] = self.pd_model.predict_proba(X_pd_all)[:, 1]
-        
-        X_if_all = self.if_scaler.transform(self.bg_data[self.if_features])
-        if_scores = self.iso_model.decision_function(X_if_all)
-        self.bg_data['anomalyFlag'] = (if_scores < -0.05).astype(int)
-        
-        print("Background data prepared for SHAP")
-        
-        self._initialized = True
+        with self._timed("bg_data_pd"):
+            X_pd_all = self.pd_scaler.transform(bg_data[self.pd_features])
+            bg_data['PD'] = self.pd_model.predict_proba(X_pd_all)[:, 1]
+
+        with self._timed("bg_data_anomaly"):
+            X_if_all = self.if_scaler.transform(bg_data[self.if_features])
+            if_scores = self.iso_model.decision_function(X_if_all)
+            bg_data['anomalyFlag'] = (if_scores < -0.05).astype(int)
+
+        state = {"bg_data": bg_data}
+        with self._timed("q_values"):
+            state["q_values"] = self._compile_q_table(self.q_table, self.q_bins)
+        for name, model in [("iso_trees", self.iso_model),
+                            ("risk_trees", self.risk_model),
+                            ("hybrid_trees", self.hybrid_model)]:
+            with self._timed(name):
+                state[name] = flatten_tree_ensemble(model)
+        return state
+
+    # Startup Snapshot : one file per bundle fingerprint
+    # A retrained model or new background data -> new file name -> rebuilt once
+    def _snapshot_path(self):
+        return STARTUP_SNAPSHOT_DIR / f"registry_v{SNAPSHOT_FORMAT}_{self.fingerprint}.joblib"
+
+    def _load_snapshot(self):
+        path = self._snapshot_path()
+        if not STARTUP_SNAPSHOT or not path.exists():
+            return None
+        try:
+            state = joblib.load(path, mmap_mode="r" if STARTUP_SNAPSHOT_MMAP else None)
+            print(f"Startup snapshot loaded : {path.name}")
+            return state
+        except Exception as e:
+            print(f"Startup snapshot ignored ({e})")
+            return None
+
+    # Written to a temporary file first, so a crash never leaves a half-written snapshot
+    # A read-only disk only costs the rebuild on the next boot
+    # Output : True if the snapshot was written
+    def _save_snapshot(self, state):
+        if not STARTUP_SNAPSHOT:
+            return False
+        path = self._snapshot_path()
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Uncompressed : joblib can only memory-map uncompressed arrays
+            joblib.dump(state, tmp, compress=0)
+            os.replace(tmp, path)
+            return True
+        except OSError as e:
+            print(f"Startup snapshot not saved ({e})")
+            tmp.unlink(missing_ok=True)
+            return False
+
+    # Load one joblib artifact of the bundle (checksum checked, timed)
+    def _load(self, name):
+        with self._timed(name):
+            return self.bundle.load(name)
+
+    # Record the seconds spent in a startup step
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[name] = round(time.perf_counter() - start, 4)
+
+    # SHAP Background Summary of one layer : (rows, weights)
+    # strategy / size default to SHAP_BACKGROUNDS[layer] (app/core/background.py)
+    # "random" keeps the same rows shap.maskers.Independent keeps from a large background
+    def layer_background(self, layer, X, strategy=None, size=None):
+        setting = SHAP_BACKGROUNDS[layer]
+        strategy = strategy or setting["strategy"]
+        size = size or setting["size"]
+        labels = None
+        if strategy == "stratified":
+            # Not precomputed (no configured layer is stratified) : predicted for this call, never stored
+            labels = self.bg_risk_labels if self.bg_risk_labels is not None else self.predict_bg_risk_labels()
+        return summarize_background(X, strategy, size, labels=labels, seed=SHAP_BACKGROUND_SEED)
+
+    # Risk label of every background row (only needed by the "stratified" strategy)
+    def predict_bg_risk_labels(self):
+        return self.risk_model.predict(self.bg_data[self.risk_features])
+
+    # Dense Q-Table :
+    # The trained Q-table is a dict keyed by (pd_bin, anom_bin, cs_bin) tuples
+    # np.digitize returns 0..len(bins) -> len(bins) + 1 states per feature
+    # Dense shape : (n_pd_bins + 1, n_anom_bins + 1, n_cs_bins + 1, 4 actions)
+    # States never visited during training keep Q_TABLE_DEFAULT (same as q_table.get(s, np.zeros(4)))
+    @staticmethod
+    def _compile_q_table(q_table, q_bins):
+        shape = (len(q_bins['pd']) + 1, len(q_bins['anom']) + 1, len(q_bins['cs']) + 1)
+        n_actions = len(next(iter(q_table.values())))
+        q_values = np.full(shape + (n_actions,), Q_TABLE_DEFAULT, dtype=float)
+        for s, q_vals in q_table.items():
+            s = tuple(int(i) for i in s)
+            if any(i < 0 or i >= n for i, n in zip(s, shape)):
+                raise ValueError(f"Q-table state {s} is outside the q_bins grid {shape}")
+            q_values[s] = q_vals
+        return q_values
 
+    # Q-Learning States : discretize rows of [PD, anomaly, HybridCreditScore]
+    # Input  : (samples, 3) array
+    # Output : (samples, 3) int array of (pd_bin, anom_bin, cs_bin)
+    def q_states(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        return np.column_stack([
+            np.digitize(X[:, 0], self.q_bins['pd']),
+            np.digitize(X[:, 1], self.q_bins['anom']),
+            np.digitize(X[:, 2], self.q_bins['cs']),
+        ])
 
-# Global registry instance
-registry = ModelRegistry()
+    # Q Values of discrete states (any leading shape, last axis = 3)
+    # Output : (..., 4) Q values, one per action
+    def q_lookup(self, states):
+        return self.q_values[states[..., 0], states[..., 1], states[..., 2]]
@@ -0,0 +1,304 @@
+import os
+
+import numpy as np
+from sklearn.ensemble._iforest import _average_path_length
+
+from app.core.config import STARTUP_SNAPSHOT_DIR, ONNX_INTRA_OP_THREADS, ONNX_ALLOW_SPINNING
+
+# Scoring Graph (SCORING_BACKEND = "onnx") :
+# The whole prediction chain of one model version as ONE ONNX graph, run by onnxruntime on CPU.
+#
+#   X (rows, FeaturePlan columns) float64
+#     --> PD      : MinMax scaling -> MatMul + Sigmoid                      -> pd
+#     --> Anomaly : Standard scaling -> TreeEnsemble (mean path length)
+#                   -> -2^(-depth / c(max_samples)) - offset                -> if_score, anomaly_flag
+#     --> Risk    : [inputs | PD | anomalyFlag] -> TreeEnsemble (class means) -> ArgMax   -> risk_idx
+#     --> Hybrid  : TreeEnsemble (sum) + init constant                      -> hybrid_score
+#     --> RL      : clip(1 - (if_score + 0.5)) -> digitize (count of bins <= x)
+#                   -> flat state -> Gather over the dense Q-table -> ArgMax -> action_idx
+#
+# One session.run per engine call instead of 5 sklearn calls : a single row skips the
+# per-call validation + joblib dispatch overhead of every sklearn model.
+#
+# The tree ensembles are built from the flat tree arrays of the registry (app/core/tree_arrays.py)
+# with the ai.onnx.ml opset 5 TreeEnsemble operator : float64 splits and leaf sums, so they add up
+# like sklearn does (no float32 leaf accumulation as with skl2onnx / TreeEnsembleRegressor).
+# Inputs of the ensembles that sklearn casts to float32 are cast the same way before the splits.
+# Every output matches the sklearn path (labels exactly, scores to ~1e-12) : scripts/onnx_parity.py
+#
+# The graph is derived from the artifacts like the startup snapshot, so it is stored next to it,
+# one file per bundle fingerprint : snapshots/scoring_v<GRAPH_FORMAT>_<fingerprint>.onnx
+# Built ahead by "python -m app.bundle compile <version>", else at the first registry load.
+#
+# Needs onnx (graph building) + onnxruntime (inference) : optional dependencies, imported on first use
+
+# Bump when the graph layout changes (old graph files are then ignored)
+GRAPH_FORMAT = 1
+
+# Graph outputs, in order (same keys as the engine scores)
+OUTPUTS = ["pd", "if_score", "anomaly_flag", "risk_idx", "hybrid_score", "action_idx"]
+
+# Operator sets of the graph : TreeEnsemble needs ai.onnx.ml 5 (IR version 10)
+OPSET = 17
+ML_OPSET = 5
+IR_VERSION = 10
+
+# TreeEnsemble : nodes_modes BRANCH_LEQ (go to the "true" child when x <= split), aggregate SUM
+BRANCH_LEQ = 0
+AGGREGATE_SUM = 1
+
+# Anomaly flag : if_score below this value (same threshold as the engine)
+ANOMALY_THRESHOLD = -0.05
+
+
+def require_onnx():
+    try:
+        import onnx
+    except ImportError:
+        raise ImportError("Building the ONNX scoring graph needs onnx : pip install -r requirements-onnx.txt")
+    return onnx
+
+
+def require_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError:
+        raise ImportError("SCORING_BACKEND = 'onnx' needs onnxruntime : pip install -r requirements-onnx.txt")
+    return onnxruntime
+
+
+# Graph Builder : nodes + constants, every node output gets a fresh name
+class _GraphBuilder:
+
+    def __init__(self, onnx):
+        self.onnx = onnx
+        self.nodes = []
+        self.initializers = []
+        self._count = 0
+
+    def _name(self, prefix):
+        self._count += 1
+        return f"{prefix}_{self._count}"
+
+    def const(self, value, dtype=np.float64):
+        name = self._name("const")
+        self.initializers.append(self.onnx.numpy_helper.from_array(np.asarray(value, dtype=dtype), name))
+        return name
+
+    # output : name of the (single) output, None -> fresh name
+    def node(self, op, inputs, output=None, domain="", **attrs):
+        output = output or self._name(op.lower())
+        self.nodes.append(self.onnx.helper.make_node(op, inputs, [output], domain=domain, **attrs))
+        return output
+
+    def columns(self, X, index):
+        return self.node("Gather", [X, self.const(index, np.int64)], axis=1)
+
+
+# Scaler of the feature plan -> same NumPy operations, same order (bit-identical to FeaturePlan.scaled)
+def _scaled(g, x, scaler):
+    kind, a, b = scaler
+    if kind == "standard":
+        if a is not None:
+            x = g.node("Sub", [x, g.const(a)])
+        if b is not None:
+            x = g.node("Div", [x, g.const(b)])
+        return x
+    if kind == "minmax":
+        return g.node("Add", [g.node("Mul", [x, g.const(a)]), g.const(b)])
+    raise ValueError(f"Scaler {type(a).__name__} has no ONNX form (StandardScaler / MinMaxScaler only)")
+
+
+# Tree ensemble (flat tree arrays) -> TreeEnsemble node, output (rows, targets) float64 + base_offset
+# One leaf feeds one target : a multi-output ensemble (Random Forest class probabilities)
+# repeats every tree once per target, each copy with the leaf values of its target
+def _tree_ensemble(g, x, flat):
+    nh = g.onnx.numpy_helper
+    if flat.input_dtype == np.float32:
+        # sklearn casts to float32 before comparing with the float64 thresholds
+        x = g.node("Cast", [g.node("Cast", [x], to=g.onnx.TensorProto.FLOAT)], to=g.onnx.TensorProto.DOUBLE)
+
+    is_leaf = flat.features < 0
+    internal, leaves = np.flatnonzero(~is_leaf), np.flatnonzero(is_leaf)
+    n_nodes, n_leaves, n_targets = len(internal), len(leaves), flat.n_outputs
+
+    # Global node index -> index among the branch nodes / among the leaves
+    node_id = np.full(len(is_leaf), -1, dtype=np.int64)
+    node_id[internal] = np.arange(n_nodes)
+    leaf_id = np.full(len(is_leaf), -1, dtype=np.int64)
+    leaf_id[leaves] = np.arange(n_leaves)
+
+    left, right = flat.children_left[internal], flat.children_right[internal]
+    true_leaf, false_leaf = is_leaf[left], is_leaf[right]
+    true_id = np.where(true_leaf, leaf_id[left], node_id[left])
+    false_id = np.where(false_leaf, leaf_id[right], node_id[right])
+
+    # Copy t of the trees : branch ids shifted by t * n_nodes, leaf ids by t * n_leaves
+    copies = np.arange(n_targets)[:, None]
+    true_ids = true_id + np.where(true_leaf, copies * n_leaves, copies * n_nodes)
+    false_ids = false_id + np.where(false_leaf, copies * n_leaves, copies * n_nodes)
+    roots = node_id[np.asarray(flat.roots)] + copies * n_nodes
+
+    y = g.node(
+        "TreeEnsemble", [x], domain="ai.onnx.ml",
+        n_targets=n_targets,
+        aggregate_function=AGGREGATE_SUM,
+        post_transform=0,
+        tree_roots=roots.ravel().tolist(),
+        nodes_featureids=np.tile(flat.features[internal], n_targets).tolist(),
+        nodes_splits=nh.from_array(np.tile(np.asarray(flat.thresholds[internal], dtype=np.float64), n_targets)),
+        nodes_modes=nh.from_array(np.full(n_nodes * n_targets, BRANCH_LEQ, dtype=np.uint8)),
+        nodes_truenodeids=true_ids.ravel().tolist(),
+        nodes_trueleafs=np.tile(true_leaf, n_targets).astype(np.int64).tolist(),
+        nodes_falsenodeids=false_ids.ravel().tolist(),
+        nodes_falseleafs=np.tile(false_leaf, n_targets).astype(np.int64).tolist(),
+        leaf_targetids=np.repeat(np.arange(n_targets), n_leaves).tolist(),
+        leaf_weights=nh.from_array(np.asarray(flat.values, dtype=np.float64)[leaves].T.ravel()),
+    )
+    if flat.base_offset:
+        y = g.node("Add", [y, g.const(flat.base_offset)])
+    return y
+
+
+# (rows, 1) column -> (rows,)
+def _squeeze(g, x, output):
+    return g.node("Squeeze", [x, g.const([1], np.int64)], output=output)
+
+
+# np.digitize(x, bins) for increasing bins : number of bins <= x, (rows, 1) -> (rows,) int64
+def _digitize(g, x, bins):
+    above = g.node("Cast", [g.node("GreaterOrEqual", [x, g.const([bins])])], to=g.onnx.TensorProto.INT64)
+    return g.node("ReduceSum", [above, g.const([1], np.int64)], keepdims=0)
+
+
+# Scoring Graph of one registry (ONNX ModelProto)
+def build_scoring_graph(registry):
+    onnx = require_onnx()
+    g = _GraphBuilder(onnx)
+    plan = registry.feature_plan
+    X = "X"
+
+    # 1. PD Layer : Logistic Regression = sigmoid(x_scaled . coef + intercept)
+    x_pd = _scaled(g, g.columns(X, plan.index["pd"]), plan.scalers["pd"])
+    logit = g.node("Add", [g.node("MatMul", [x_pd, g.const(registry.pd_coef[:, None])]), g.const(registry.pd_intercept)])
+    pd_ = g.node("Sigmoid", [logit])
+
+    # 2. Anomaly Layer : Isolation Forest decision_function
+    #    mean path length over the trees -> score_samples = -2^(-depth / c(max_samples)) -> minus offset_
+    iso = registry.iso_model
+    x_if = _scaled(g, g.columns(X, plan.index["if"]), plan.scalers["if"])
+    depth = _tree_ensemble(g, x_if, registry.iso_trees)
+    c = float(_average_path_length([iso.max_samples_])[0])
+    score = g.node("Neg", [g.node("Pow", [g.const(2.0), g.node("Div", [g.node("Neg", [depth]), g.const(c)])])])
+    if_score = g.node("Sub", [score, g.const(float(iso.offset_))])
+    flag = g.node("Less", [if_score, g.const(ANOMALY_THRESHOLD)])
+
+    # 3. Risk Layer : Random Forest over the plan columns with the PD + anomalyFlag slots filled
+    derived = {"PD": pd_, "anomalyFlag": g.node("Cast", [flag], to=onnx.TensorProto.DOUBLE)}
+    n_inputs = len(plan.inputs)
+    inputs = g.node("Slice", [X, g.const([0], np.int64), g.const([n_inputs], np.int64), g.const([1], np.int64)])
+    Z = g.node("Concat", [inputs] + [derived[name] for name in plan.columns[n_inputs:]], axis=1)
+    proba = _tree_ensemble(g, g.columns(Z, plan.index["risk"]), registry.risk_trees)
+    g.node("ArgMax", [proba], output="risk_idx", axis=1, keepdims=0)
+
+    # 4. Hybrid Score Layer : Gradient Boosting
+    hybrid = _tree_ensemble(g, g.columns(X, plan.index["hybrid"]), registry.hybrid_trees)
+
+    # 5. RL Action Layer : dense Q-table lookup of the discretized [PD, anomaly, HybridCreditScore]
+    anom_norm = g.node("Clip", [g.node("Sub", [g.const(1.0), g.node("Add", [if_score, g.const(0.5)])]),
+                                g.const(0.0), g.const(1.0)])
+    q_values = np.asarray(registry.q_values, dtype=np.float64)
+    shape = q_values.shape[:3]
+    state = None
+    for x, key, stride in [(pd_, "pd", shape[1] * shape[2]), (anom_norm, "anom", shape[2]), (hybrid, "cs", 1)]:
+        part = g.node("Mul", [_digitize(g, x, registry.q_bins[key]), g.const(stride, np.int64)])
+        state = part if state is None else g.node("Add", [state, part])
+    q = g.node("Gather", [g.const(q_values.reshape(-1, q_values.shape[3])), state], axis=0)
+    g.node("ArgMax", [q], output="action_idx", axis=1, keepdims=0)
+
+    # Outputs : (rows,) each
+    _squeeze(g, pd_, "pd")
+    _squeeze(g, if_score, "if_score")
+    g.node("Cast", [_squeeze(g, flag, None)], output="anomaly_flag", to=onnx.TensorProto.INT64)
+    _squeeze(g, hybrid, "hybrid_score")
+
+    h, T = onnx.helper, onnx.TensorProto
+    types = {"anomaly_flag": T.INT64, "risk_idx": T.INT64, "action_idx": T.INT64}
+    graph = h.make_graph(
+        g.nodes, "finsight_credit_scoring",
+        [h.make_tensor_value_info(X, T.DOUBLE, [None, len(plan.columns)])],
+        [h.make_tensor_value_info(name, types.get(name, T.DOUBLE), [None]) for name in OUTPUTS],
+        initializer=g.initializers,
+    )
+    model = h.make_model(
+        graph,
+        opset_imports=[h.make_opsetid("", OPSET), h.make_opsetid("ai.onnx.ml", ML_OPSET)],
+        ir_version=IR_VERSION,
+        producer_name="finsight-credit",
+        doc_string=f"model version {registry.model_version}, fingerprint {registry.fingerprint}",
+    )
+    onnx.checker.check_model(model)
+    return model
+
+
+# Graph file of one bundle fingerprint
+def graph_path(registry):
+    return STARTUP_SNAPSHOT_DIR / f"scoring_v{GRAPH_FORMAT}_{registry.fingerprint}.onnx"
+
+
+# Build + write the graph of a registry (temporary file first, like the startup snapshot)
+# Output : (path, serialized graph)
+def compile_scoring_graph(registry, path=None):
+    path = path or graph_path(registry)
+    data = build_scoring_graph(registry).SerializeToString()
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path, data
+
+
+class ScoringGraph:
+
+    # model : path or serialized graph
+    # threads : intra-op threads of the session (ONNX_INTRA_OP_THREADS)
+    def __init__(self, model, threads=ONNX_INTRA_OP_THREADS):
+        ort = require_onnxruntime()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # One graph, one chain of nodes : no inter-op parallelism
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        options.intra_op_num_threads = threads
+        # Idle intra-op threads spin-wait between runs by default (CPU taken from the event loop / explainers)
+        options.add_session_config_entry("session.intra_op.allow_spinning", "1" if ONNX_ALLOW_SPINNING else "0")
+        self.threads = threads
+        self.session = ort.InferenceSession(
+            str(model) if not isinstance(model, bytes) else model, options, providers=["CPUExecutionProvider"]
+        )
+
+
+    # X : (rows, FeaturePlan columns) float64 matrix (the derived slots are not read)
+    # Output : {output name: (rows,) array}
+    def run(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        return dict(zip(OUTPUTS, self.session.run(OUTPUTS, {"X": X})))
+
+
+# Scoring graph of a registry : the compiled file when present, else built now (and written when possible)
+def open_scoring_graph(registry, threads=ONNX_INTRA_OP_THREADS):
+    path = graph_path(registry)
+    if path.exists():
+        print(f"Scoring graph loaded : {path.name}")
+        return ScoringGraph(path, threads)
+    try:
+        path, _ = compile_scoring_graph(registry, path)
+        print(f"Scoring graph compiled : {path.name}")
+        return ScoringGraph(path, threads)
+    except OSError as e:
+        # Read-only disk : serve the graph from memory, rebuilt on every boot
+        print(f"Scoring graph not saved ({e})")
+        return ScoringGraph(build_scoring_graph(registry).SerializeToString(), threads)
@@ -0,0 +1,131 @@
+import numpy as np
+from sklearn.ensemble._iforest import _average_path_length
+
+# Flat Tree Arrays :
+# Every fitted sklearn tree ensemble is flattened ONCE at registry load
+# into contiguous node arrays (all trees concatenated one after the other).
+# The native tree explainer (app/engines/tree_explainer.py) only reads these arrays,
+# it never touches the sklearn objects again.
+#
+# Node arrays (one entry per node of every tree) :
+#   features        -> split feature (global column index), -2 for leaves
+#   thresholds      -> split threshold (go left when x <= threshold)
+#   children_left   -> global index of the left child,  -1 for leaves
+#   children_right  -> global index of the right child, -1 for leaves
+#   cover           -> training samples (weighted) that reached the node
+#   values          -> (nodes, outputs) node value, already scaled like shap does
+#
+# Ensemble info :
+#   roots       -> global index of the root node of every tree
+#   base_offset -> constant added to the sum of the trees (e.g. GradientBoosting init)
+#   input_dtype -> dtype the model casts its input to before comparing thresholds
+
+class FlatTreeEnsemble:
+
+    def __init__(self, features, thresholds, children_left, children_right,
+                 cover, values, roots, n_features, base_offset=0.0, input_dtype=np.float64):
+        self.features = features
+        self.thresholds = thresholds
+        self.children_left = children_left
+        self.children_right = children_right
+        self.cover = cover
+        self.values = values
+        self.roots = roots
+        self.n_features = n_features
+        self.n_outputs = values.shape[1]
+        self.base_offset = base_offset
+        self.input_dtype = input_dtype
+
+
+# 1. Isolation Forest Node Values
+# sklearn stores no useful value in Isolation Forest leaves,
+# so (like shap) every leaf gets its path length : depth + c(n_node_samples)
+# and every internal node the sample-weighted mean of its children
+def _iso_tree_values(tree):
+    values = np.zeros(tree.node_count)
+
+    def _recalculate(i, depth):
+        if tree.children_left[i] == -1:
+            values[i] = depth + _average_path_length(np.array([tree.n_node_samples[i]]))[0]
+            return values[i] * tree.n_node_samples[i]
+        total = (_recalculate(tree.children_left[i], depth + 1)
+                 + _recalculate(tree.children_right[i], depth + 1))
+        values[i] = total / tree.n_node_samples[i]
+        return total
+
+    _recalculate(0, 0)
+    return values[:, None]
+
+
+# 2. Flatten Tree Ensemble
+# Supported : IsolationForest, RandomForestClassifier, GradientBoostingRegressor
+# Node values follow the shap TreeExplainer conventions of each model
+# so native SHAP values are directly comparable with shap outputs
+def flatten_tree_ensemble(model):
+    name = type(model).__name__
+    trees, features_maps, tree_values = [], [], []
+    base_offset = 0.0
+
+    if name == "IsolationForest":
+        # Output : average path length over all trees
+        scaling = 1.0 / len(model.estimators_)
+        for est, feats in zip(model.estimators_, model.estimators_features_):
+            trees.append(est.tree_)
+            features_maps.append(np.asarray(feats))
+            tree_values.append(_iso_tree_values(est.tree_) * scaling)
+        n_features = model.n_features_in_
+        input_dtype = np.float64
+
+    elif name == "RandomForestClassifier":
+        # Output : average class probability over all trees
+        scaling = 1.0 / len(model.estimators_)
+        for est in model.estimators_:
+            value = est.tree_.value[:, 0, :]
+            trees.append(est.tree_)
+            features_maps.append(None)
+            tree_values.append(value / value.sum(axis=1, keepdims=True) * scaling)
+        n_features = model.n_features_in_
+        input_dtype = np.float32
+
+    elif name == "GradientBoostingRegressor":
+        # Output : init constant + learning_rate * sum of the trees
+        for est in model.estimators_[:, 0]:
+            trees.append(est.tree_)
+            features_maps.append(None)
+            tree_values.append(est.tree_.value[:, 0, :] * model.learning_rate)
+        base_offset = float(np.ravel(model.init_.constant_)[0])
+        n_features = model.n_features_in_
+        input_dtype = np.float32
+
+    else:
+        raise ValueError(f"Unsupported tree ensemble : {name}")
+
+    # Concatenate every tree into one set of contiguous arrays
+    features, thresholds, left, right, cover, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    for tree, feats, value in zip(trees, features_maps, tree_values):
+        is_leaf = tree.children_left == -1
+        f = tree.feature.astype(np.int32)
+        if feats is not None:
+            f = np.where(is_leaf, f, feats[np.maximum(f, 0)])
+        features.append(np.where(is_leaf, -2, f).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        left.append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+        cover.append(tree.weighted_n_node_samples.astype(np.float64))
+        values.append(np.asarray(value, dtype=np.float64))
+        roots.append(offset)
+        offset += tree.node_count
+
+    return FlatTreeEnsemble(
+        features=np.concatenate(features),
+        thresholds=np.concatenate(thresholds),
+        children_left=np.concatenate(left),
+        children_right=np.concatenate(right),
+        cover=np.concatenate(cover),
+        values=np.concatenate(values),
+        roots=np.array(roots, dtype=np.int64),
+        n_features=n_features,
+        base_offset=base_offset,
+        input_dtype=input_dtype,
+    )
@@ -1,8 +1,21 @@
+import threading
+import time
 import pandas as pd
 import numpy as np
 import shap
 import warnings
-from app.core.model_registry import registry
+from app.core.metrics import span, metrics
+from app.core.config import (
+    RL_EXPLAINER, RL_EXPLAINER_PRECOMPUTE, PD_EXPLAINER,
+    TREE_EXPLAINER, TREE_SHAP_CHUNK_SIZE, TREE_SHAP_N_JOBS, TREE_SHAP_BACKEND,
+    LAZY_EXPLAINERS, RULE_SCORE_ENABLED, RULE_SCORE_TABLE,
+    DECISION_PIPELINE, TIER_POLICY_TABLE, ONNX_MAX_ROWS,
+)
+from app.engines.explainers import QPolicyExactExplainer, PDLinearExplainer
+from app.engines.tree_explainer import NativeTreeExplainer
+from app.engines.rule_engine import RuleScoreEngine, RULE_TABLES
+from app.engines.tier_policy import TierPolicy, TIER_POLICIES, LAYERS, SCREEN_LAYERS, SCREEN_SIGNALS
+from app.engines.whatif import grid_matrix, crossings
 from app.schemas.credit import (
     CreditDecisionResponse,
     PDResponse,
@@ -10,6 +23,11 @@ from app.schemas.credit import (
     RiskLabelResponse,
     HybridScoreResponse,
     RLRecommendationResponse,
+    RuleScoreResponse,
+    TierResponse,
+    WhatIfResponse,
+    WhatIfAxisValues,
+    WhatIfCrossing,
 )
 
 warnings.filterwarnings('ignore')
@@ -29,6 +47,15 @@ BUSINESS_MAPPING = {
     "HybridCreditScore": "Consolidated Credit Score"
 }
 
+# Risk Label classes of the Random Forest (index = predicted class)
+RISK_LABELS = ["LOW", "MEDIUM", "HIGH"]
+
+# Q-Learning actions (index = argmax of Q values)
+ACTIONS = ["REJECT", "APPROVE_LOW", "APPROVE_MEDIUM", "APPROVE_HIGH"]
+
+# Per-row outputs of the layers (carried to the full tier of the tiered pipeline)
+ROW_OUTPUTS = ("pd", "if_score", "anomaly_flag", "risk_idx", "hybrid_score", "action_idx")
+
 # { 
 #   "PD": {"Probability_of_Default": 0.0090, "top_factors": ["Monthly Income Level (+0.002)", "Income Volatility (-0.001)", "Monthly Expense Burden (+0.001)"]},
 #   "Anomaly": {"Anomaly_Score": 0.0955, "Anomaly_Flag": 0, "top_factors": ["Unusual Transaction Behavior (+0.002)", "Anomaly Signal Intensity (-0.001)", "Consolidated Credit Score (+0.001)"]},
@@ -53,211 +80,544 @@ class CreditDecisionEngine:
     # 1. This is the constructor of the class
     # It initializes the explainers
 
-    # 1. PD Score ->LinearExplainer  -> logistic regression
-    # 2. Anomaly Score -> TreeExplainer    -> optimised for tree ensembles
-    # 3. Risk Label -> TreeExplainer    -> optimised for tree ensembles
-    # 4. Hybrid Score -> Auto-backend detection for the gradient-boosting hybrid model
-    # 5. RL Recommendation -> KernelExplainer
+    # 1. PD Score -> Closed-form linear SHAP (LinearExplainer as fallback) -> logistic regression
+    # 2. Anomaly Score -> Native TreeSHAP (path-dependent)  -> optimised for tree ensembles
+    # 3. Risk Label -> Native TreeSHAP (path-dependent)     -> optimised for tree ensembles
+    # 4. Hybrid Score -> Native TreeSHAP (interventional, background sample) -> gradient boosting
+    #    (TREE_EXPLAINER = "shap" -> TreeExplainer / auto-backend shap.Explainer as fallback)
+    # 5. RL Recommendation -> Exact Shapley over the Q-table (KernelExplainer as fallback)
     
-    def __init__(self):
-        # Background matrices used by explainers
-        X_pd_bg     = registry.pd_scaler.transform(registry.bg_data[registry.pd_features])
-        X_hybrid_bg = registry.bg_data[registry.hybrid_features]
-
-        
-        self.pd_explainer     = shap.LinearExplainer(registry.pd_model, X_pd_bg)
-        self.if_explainer     = shap.TreeExplainer(registry.iso_model)
-        self.risk_explainer   = shap.TreeExplainer(registry.risk_model)
-        self.hybrid_explainer = shap.Explainer(registry.hybrid_model, X_hybrid_bg)
-
-        # KernelExplainer only needs a prototype
+    # registry : ModelRegistry of ONE model version (the engine never changes it)
+    # lazy = True -> each explainer is built on its first use (fast import),
+    #                engine.warm_up() then builds all of them before readiness
+    def __init__(self, registry, lazy=LAZY_EXPLAINERS):
+        self.registry = registry
+        # Startup timing report : seconds to build each explainer
+        self.startup_timings = {}
+        self._build_lock = threading.Lock()
+
+        # 6. Rule-Based Credit Score -> table-driven sectors, vectorized (None when disabled)
+        self.rule_engine = RuleScoreEngine(RULE_TABLES[RULE_SCORE_TABLE]) if RULE_SCORE_ENABLED else None
+
+        # Tiered pipeline -> declarative policies after the PD + Anomaly layers
+        # (pipeline = "full" by default, see DECISION_PIPELINE)
+        self.pipeline = DECISION_PIPELINE
+        self.tier_policy = TierPolicy(TIER_POLICIES[TIER_POLICY_TABLE])
+        plan_slots = registry.feature_plan.slot
+        unknown = [s for s in self.tier_policy.signals if s not in SCREEN_SIGNALS and s not in plan_slots]
+        if unknown:
+            raise ValueError(f"Tier policy table {TIER_POLICY_TABLE} reads unknown signals : {', '.join(unknown)}")
+
+        # Explainer name -> builder
+        self._builders = {
+            "pd_explainer":     self._build_pd_explainer,
+            "if_explainer":     self._build_if_explainer,
+            "risk_explainer":   self._build_risk_explainer,
+            "hybrid_explainer": self._build_hybrid_explainer,
+            "rl_explainer":     self._build_rl_explainer,
+        }
+        if not lazy:
+            for name in self._builders:
+                getattr(self, name)
+
+
+    # Called only when an attribute is missing : builds the explainer once and keeps it
+    def __getattr__(self, name):
+        builders = self.__dict__.get("_builders", {})
+        if name not in builders:
+            raise AttributeError(name)
+        with self._build_lock:
+            if name not in self.__dict__:
+                start = time.perf_counter()
+                self.__dict__[name] = builders[name]()
+                self.startup_timings[name] = round(time.perf_counter() - start, 4)
+        return self.__dict__[name]
+
+
+    def _build_pd_explainer(self):
+        if PD_EXPLAINER == "shap":
+            # Interventional linear SHAP only needs the (weighted) mean + covariance of the background
+            rows, weights = self.registry.pd_background
+            cov = np.cov(rows, rowvar=False, aweights=weights) if len(rows) > 1 else np.zeros((rows.shape[1],) * 2)
+            return shap.LinearExplainer(self.registry.pd_model, (self.registry.pd_bg_mean, cov))
+        # Native : coef * (x_scaled - mean(background)) with NumPy
+        return PDLinearExplainer(self.registry.pd_coef, self.registry.pd_bg_mean, self.registry.pd_intercept)
+
+
+    # Native : TreeSHAP over the flat tree arrays of the registry
+    def _tree_options(self):
+        return dict(
+            chunk_size=TREE_SHAP_CHUNK_SIZE,
+            n_jobs=TREE_SHAP_N_JOBS,
+            backend=TREE_SHAP_BACKEND,
+        )
+
+    def _build_if_explainer(self):
+        if TREE_EXPLAINER == "shap":
+            return shap.TreeExplainer(self.registry.iso_model)
+        return NativeTreeExplainer(self.registry.iso_trees, **self._tree_options())
+
+    def _build_risk_explainer(self):
+        if TREE_EXPLAINER == "shap":
+            return shap.TreeExplainer(self.registry.risk_model)
+        return NativeTreeExplainer(self.registry.risk_trees, **self._tree_options())
+
+    def _build_hybrid_explainer(self):
+        # Summarized background of the registry (SHAP_BACKGROUNDS["HybridScore"])
+        rows, weights = self.registry.hybrid_background
+        if TREE_EXPLAINER == "shap":
+            # shap.maskers.Independent has no row weights : summary rows only
+            X_hybrid_bg = pd.DataFrame(rows, columns=self.registry.hybrid_features)
+            return shap.Explainer(self.registry.hybrid_model, X_hybrid_bg)
+        return NativeTreeExplainer(
+            self.registry.hybrid_trees,
+            background=rows,
+            background_weights=weights,
+            **self._tree_options(),
+        )
+
+    def _build_rl_explainer(self):
+        # RL explainer only needs a prototype
         # So we can send Demo 3 Rows only
         rl_bg = np.array([[0.1, 0.1, 600], [0.5, 0.5, 400], [0.1, 0.8, 400]])
-        self.rl_explainer = shap.KernelExplainer(self._q_policy_func, rl_bg)
+        if RL_EXPLAINER == "kernel":
+            return shap.KernelExplainer(self._q_policy_func, rl_bg)
+        # Exact : 2^3 coalitions against the 3 background rows (deterministic)
+        return QPolicyExactExplainer(
+            self.registry.q_values, self.registry.q_states, rl_bg,
+            precompute=RL_EXPLAINER_PRECOMPUTE,
+        )
     
     
-    # 2. Q Policy Function : Use Q Table to get the best action
+    # 2. Q Policy Function : Use Q Table to get the best action value
+    # Vectorized : one np.digitize per feature + dense Q-table indexing for all rows
     def _q_policy_func(self, X):
-        results = []
-        for row in X:
-            s = (np.digitize(row[0], registry.q_bins['pd']),
-                 np.digitize(row[1], registry.q_bins['anom']),
-                 np.digitize(row[2], registry.q_bins['cs']))
-            q_vals = registry.q_table.get(s, np.zeros(4))
-            results.append(np.max(q_vals))
-        return np.array(results)
+        return self.registry.q_lookup(self.registry.q_states(X)).max(axis=1)
     
+    # PD SHAP values : (samples, features)
+    # Both the native explainer and shap.LinearExplainer support shap_values()
+    def _pd_shap_values(self, X_pd):
+        return np.asarray(self.pd_explainer.shap_values(X_pd))
+
+    # Risk SHAP values of the predicted class of every row : (samples, features)
+    # Multiple classes SHAP returns 3D array : (samples, features, classes)
+    def _risk_shap_values(self, X_risk, risk_idx):
+        risk_shap = np.asarray(self.risk_explainer.shap_values(X_risk))
+        return risk_shap[np.arange(len(X_risk)), :, risk_idx]
+
+    # SHAP values of one layer, only for the rows whose explainer runs (tiered pipeline)
+    # explained = None -> every row ; skipped rows are NaN
+    # fn(rows) : SHAP values of the rows (rows = slice(None) or a boolean mask)
+    def _layer_shap(self, explained, layer, X, fn):
+        if explained is None:
+            return np.asarray(fn(slice(None)))
+        rows = explained[:, LAYERS.index(layer)]
+        if rows.all():
+            return np.asarray(fn(slice(None)))
+        values = np.full(X.shape, np.nan)
+        if rows.any():
+            values[rows] = fn(rows)
+        return values
+
     # 3. Top SHAP Features : Get the top k features with highest absolute SHAP values
     # It take Input as SHAP values, Feature Names
-    # It return Top k features with highest absolute SHAP values 
-    # Example : {
-    #               "Monthly Income Level (+0.002)", 
-    #               "Income Volatility (-0.001)", 
-    #               "Monthly Expense Burden (+0.001)"
-    #           }
+    # It return Top k (business name, SHAP value) pairs with highest absolute SHAP values
+    # Example : [
+    #               ("Monthly Income Level", 0.0021),
+    #               ("Income Volatility", -0.0012),
+    #               ("Monthly Expense Burden", 0.0009)
+    #           ]
+    # JSON responses render them as "Monthly Income Level (+0.002)" (app/schemas/credit.py)
 
     def _top_shap_features(self, values, names, k=3):
         idx = np.argsort(np.abs(values))[::-1][:k]
-        return [f"{BUSINESS_MAPPING.get(names[i], names[i])} ({values[i]:+.3f})" for i in idx]
+        return [(BUSINESS_MAPPING.get(names[i], names[i]), float(values[i])) for i in idx]
     
 
-    # 4. Get Decision call by Service Layer
-    def get_decision(self, input_row):
-        # Input Row : Python Dictionary
-        # Convert input row to DataFrame 
-        # (DataFrame : Row + Column + Values)
-        df_input = pd.DataFrame([input_row])
-        response = {}
-
+    # 4. Score Layers : run the 5 models (NO explanations) over N rows at once
+    # Input  : List of Python Dictionaries (one per applicant)
+    # Output : "scores" Dictionary with the model inputs and raw predictions of every layer
+    #          (explain_batch and build_responses only need this dictionary)
+    # No pandas : the registry feature plan maps every layer to fixed columns of one float matrix
+    # pipeline : "full" / "tiered" (None -> DECISION_PIPELINE)
+    #   "tiered" adds "tier_exit" (policy index, -1 : full tier) and "explained" (rows, layers) to the scores,
+    #   rows stopped at the screen tier get NaN / -1 in the arrays of the Risk, Hybrid and RL layers
+    def score_batch(self, input_rows, pipeline=None):
+        # Convert input rows to ONE float matrix : N Rows + 7 Columns + PD + anomalyFlag slots
+        return self.score_matrix(self.registry.feature_plan.matrix(input_rows), pipeline)
+
+
+    # Same over a feature matrix built by the caller (FeaturePlan columns, derived slots are overwritten)
+    def score_matrix(self, X, pipeline=None):
+        plan = self.registry.feature_plan
+        scores = {}
+
+        # ONNX backend : every layer runs in ONE graph call (app/core/onnx_graph.py, SCORING_BACKEND),
+        # the sections below then only build the model inputs the explainers need
+        graph = self.registry.scoring_graph
+        if graph is not None and len(X) <= ONNX_MAX_ROWS:
+            with span("onnx_graph"):
+                scores.update(graph.run(X))
+        scored = "action_idx" in scores
 
 
         # 1. PD Layer : Logistic Regression
 
+        # Step 1 : Feature Selection + Scaling with the constants of "/ML/2* Models/2. PD_Model/artifacts/pd_scaler.joblib"
+        with span("pd_scaler"):
+            scores["X_pd"] = plan.scaled(X, "pd")
 
-        # Step 1 : Feature Selection + Scaling By Calling "/ML/2* Models/2. PD_Model/artifacts/pd_scaler.joblib"
-        X_pd = registry.pd_scaler.transform(df_input[registry.pd_features])
-        
         # Step 2 : Call Logistic Regression Model Method predict_proba 
         # To Predict Probability of Default By Calling "/ML/2* Models/2. PD_Model/artifacts/pd_model.joblib"
-        pd_val = registry.pd_model.predict_proba(X_pd)[0, 1]
-        # Store Probability of Default to "response" Dictionary
-        response["PD"] = {"Probability_of_Default": round(float(pd_val), 4)}
-        
-        # Step 3 : SHAP Explanation : Top Factors
-        # Call SHAP LinearExplainer Method explainer() to get SHAP values
-        pd_exp = self.pd_explainer(X_pd)
-        # Get SHAP values and flatten them : (samples, features) 
-        # For Example pd_exp.values[0(Sample Index)][1(Feature Index)] = 0.2
-        pd_shap_vals = pd_exp.values.flatten()
-        # Get Top Factors
-        response["PD"]["top_factors"] = self._top_shap_features(pd_shap_vals, registry.pd_features)
+        if not scored:
+            with span("pd_model"):
+                scores["pd"] = self.registry.pd_model.predict_proba(scores["X_pd"])[:, 1]
 
 
-    
         # 2. Anomaly Layer : Isolation Forest
 
-
-        # Step 1 : Feature Selection + Scaling using "/ML/2* Models/3. Anomaly_Model/artifacts/if_scaler.joblib"
-        X_if = registry.if_scaler.transform(df_input[registry.if_features])
+        # Step 1 : Feature Selection + Scaling with the constants of "/ML/2* Models/3. Anomaly_Model/artifacts/if_scaler.joblib"
+        with span("if_scaler"):
+            scores["X_if"] = plan.scaled(X, "if")
 
         # Step 2 : Call Isolation Forest Model Method decision_function 
         # To Predict Anomaly Score By Calling "/ML/2* Models/3. Anomaly_Model/artifacts/iso_model.joblib"
-        if_score = registry.iso_model.decision_function(X_if)[0]
-        # anomalyFlag: 1 = anomaly, 0 = normal
-        anomaly_flag = 1 if if_score < -0.05 else 0
-        # Store Anomaly Score and Anomaly Flag to "response" Dictionary
-        response["Anomaly"] = {
-            "Anomaly_Score": round(float(if_score), 4),
-            "Anomaly_Flag":  anomaly_flag,
+        if not scored:
+            with span("if_model"):
+                scores["if_score"] = self.registry.iso_model.decision_function(scores["X_if"])
+            # anomalyFlag: 1 = anomaly, 0 = normal
+            scores["anomaly_flag"] = (scores["if_score"] < -0.05).astype(int)
+
+        # Layers 3 - 5 : every row (full pipeline) or the rows no policy stopped (tiered pipeline)
+        if (pipeline or self.pipeline) == "tiered":
+            self._score_tiers(X, scores)
+        else:
+            self._score_full_tier(X, scores)
+
+
+        # 6. Rule-Based Credit Score : table-driven sectors over the input columns (no model)
+        if self.rule_engine is not None:
+            with span("rule_score"):
+                rules = self.rule_engine.evaluate({f: X[:, plan.slot[f]] for f in self.rule_engine.features})
+            scores["rule_score"] = rules["score"]
+            scores["rule_points"] = rules["points"]
+
+        return scores
+
+
+    # Tiered pipeline : policies over the screen tier (PD + Anomaly), full tier for the other rows
+    def _score_tiers(self, X, scores):
+        plan = self.registry.feature_plan
+        n = len(X)
+        with span("tier_policy"):
+            screen = {"PD": scores["pd"], "anomalyScore": scores["if_score"], "anomalyFlag": scores["anomaly_flag"]}
+            signals = {s: screen[s] if s in screen else X[:, plan.slot[s]] for s in self.tier_policy.signals}
+            tier = self.tier_policy.evaluate(signals, n)
+        scores["tier_exit"] = tier["exit"]
+        scores["explained"] = tier["explained"]
+        go = tier["exit"] < 0
+
+        # Counters : rows stopped per policy outcome + rows sent to the full tier
+        stopped = np.bincount(tier["exit"][~go], minlength=len(self.tier_policy.names))
+        for j, count in enumerate(stopped):
+            if count:
+                metrics.inc("credit_tier_exits_total", int(count), tier="screen",
+                            outcome=self.tier_policy.actions[j], policy=self.tier_policy.names[j])
+        if go.any():
+            metrics.inc("credit_tier_exits_total", int(go.sum()), tier="full", outcome="SCORED")
+
+        if go.all():
+            self._score_full_tier(X, scores)
+            return
+
+        # Full tier over the remaining rows only, scattered back into N-row arrays
+        later = {
+            "X_risk":       np.full((n, len(self.registry.risk_features)), np.nan),
+            "risk_idx":     np.full(n, -1, dtype=np.int64),
+            "X_hyb":        np.full((n, len(self.registry.hybrid_features)), np.nan),
+            "hybrid_score": np.full(n, np.nan),
+            "X_rl":         np.full((n, 3), np.nan),
+            "action_idx":   np.full(n, -1, dtype=np.int64),
         }
+        if go.any():
+            rest = {k: scores[k][go] for k in ROW_OUTPUTS if k in scores}
+            self._score_full_tier(X[go], rest)
+            for key, values in later.items():
+                values[go] = rest[key]
+        scores.update(later)
 
-        # Step 3 : SHAP Explanation : Top Factors
-        # Call SHAP TreeExplainer Method explainer() to get SHAP values
-        if_exp = self.if_explainer(X_if)
-        if_vals = if_exp.values.flatten()
-        response["Anomaly"]["top_factors"] = self._top_shap_features(if_vals, registry.if_features)
-        
 
-        # 3. Risk Layer : Random Forest
-        
+    # Layers 3 - 5 over the rows of X (scores holds the PD + Anomaly outputs of the same rows)
+    # Already scored by the ONNX graph -> only the model inputs of the explainers are built
+    def _score_full_tier(self, X, scores):
+        plan = self.registry.feature_plan
+        scored = "action_idx" in scores
 
-        # Step 1 : Copy Input Data
-        df_risk = df_input.copy()
+        # 3. Risk Layer : Random Forest
 
-        # Step 2 : Add PD and Anomaly Flag to DataFrame
-        df_risk['PD']          = pd_val
-        df_risk['anomalyFlag'] = anomaly_flag
+        # Step 1 : Fill the PD and Anomaly Flag slots
+        X[:, plan.slot["PD"]]          = scores["pd"]
+        X[:, plan.slot["anomalyFlag"]] = scores["anomaly_flag"]
 
-        # Step 3 : Feature Selection
-        X_risk     = df_risk[registry.risk_features]
+        # Step 2 : Feature Selection
+        scores["X_risk"] = plan.take(X, "risk")
 
-        #Step 4 : Call Random Forest Model Method predict 
+        # Step 3 : Call Random Forest Model Method predict 
         # To Predict Risk Label By Calling "/ML/2* Models/4. Risk_Model/artifacts/risk_model.joblib"
-        risk_idx   = int(registry.risk_model.predict(X_risk)[0])
-        risk_label = ["LOW", "MEDIUM", "HIGH"][risk_idx]
-        # Store Risk Label to "response" Dictionary
-        response["RiskLabel"] = {"Risk_Label": risk_label}
-        
-        # Step 5* : SHAP Explanation : Top Factors
-        # Call SHAP TreeExplainer Method explainer() to get SHAP values
-        risk_exp = self.risk_explainer(X_risk)
-        # Multiple classes SHAP returns 3D array : (samples, features, classes)
-        # risk_exp.values[0, :, risk_idx] : First sample, all features for risk_idx class
-        # First sample only because in treeexplainer we are only passing one sample
-        risk_vals = risk_exp.values[0, :, risk_idx]
-        #Get Top Factors
-        response["RiskLabel"]["Drivers"] = self._top_shap_features(risk_vals, registry.risk_features)
-        
+        if not scored:
+            with span("risk_model"):
+                scores["risk_idx"] = self.registry.risk_model.predict(scores["X_risk"]).astype(int)
 
 
         # 4. Hybrid Score Layer : Gradient Boosting
 
-        # Step 1 : Feature Selection + Scaling using "/ML/2* Models/5. Hybrid_Model/artifacts/hybrid_scaler.joblib"
-        X_hyb = df_input[registry.hybrid_features]
+        # Step 1 : Feature Selection
+        scores["X_hyb"] = plan.take(X, "hybrid")
         # Step 2 : Call Gradient Boosting Model Method predict 
         # To Predict Hybrid Score By Calling "/ML/2* Models/5. Hybrid_Model/artifacts/hybrid_model.joblib"
-        score_val = registry.hybrid_model.predict(X_hyb)[0]
-        # Step 3 : Store Hybrid Score to "response" Dictionary
-        response["HybridScore"] = {"Hybrid_Score": round(float(score_val), 1)}
-        
-        # Step 4 : SHAP Explanation : Top Factors
-        # Call SHAP Explanation Method explainer() to get SHAP values
-        hyb_exp = self.hybrid_explainer(X_hyb)
-        hyb_vals = hyb_exp.values.flatten()
-        # Get Top Factors
-        response["HybridScore"]["factors"] = self._top_shap_features(hyb_vals, registry.hybrid_features)
-        
+        if not scored:
+            with span("hybrid_model"):
+                scores["hybrid_score"] = self.registry.hybrid_model.predict(scores["X_hyb"])
 
 
         # 5. RL Action Layer : Q-Learning
 
         # Step 1 : Normalize Anomaly Score
-        anom_norm = np.clip(1.0 - (if_score + 0.5), 0, 1)
+        anom_norm = np.clip(1.0 - (scores["if_score"] + 0.5), 0, 1)
         # Step 2 : Create RL Input
-        X_rl = np.array([[pd_val, anom_norm, score_val]])
+        scores["X_rl"] = np.column_stack([scores["pd"], anom_norm, scores["hybrid_score"]])
         # Step 3 : Discretize Input
         # Q-Learning uses discrete states
-        # So you convert continuous values into bins
-        s = (np.digitize(X_rl[0][0], registry.q_bins['pd']),
-             np.digitize(X_rl[0][1], registry.q_bins['anom']),
-             np.digitize(X_rl[0][2], registry.q_bins['cs']))
-        
-        # Step 4 : Get Action
-        action_idx = int(np.argmax(registry.q_table.get(s, np.zeros(4))))
-        # Step 5 : Get Action
-        actions = ["REJECT", "APPROVE_LOW", "APPROVE_MEDIUM", "APPROVE_HIGH"]
-        response["RL_Recommendation"] = {"Recommendation": actions[action_idx]}
-        
-        # Step 6 : SHAP Explanation : Top Factors
-        rl_exp = self.rl_explainer.shap_values(X_rl, silent=True)
-        rl_vals = rl_exp.flatten()
-        # Get Top Factors
-        response["RL_Recommendation"]["Rationales"] = self._top_shap_features(rl_vals, registry.q_features)
-        
-        return CreditDecisionResponse(
-            PD=PDResponse(
-                Probability_of_Default=round(float(pd_val), 4),
-                top_factors=response["PD"]["top_factors"],
-            ),
-            Anomaly=AnomalyResponse(
-                Anomaly_Score=round(float(if_score), 4),
-                Anomaly_Flag=anomaly_flag,
-                top_factors=response["Anomaly"]["top_factors"],
-            ),
-            RiskLabel=RiskLabelResponse(
-                Risk_Label=risk_label,
-                Drivers=response["RiskLabel"]["Drivers"],
-            ),
-            HybridScore=HybridScoreResponse(
-                Hybrid_Score=round(float(score_val), 1),
-                factors=response["HybridScore"]["factors"],
-            ),
-            RL_Recommendation=RLRecommendationResponse(
-                Recommendation=actions[action_idx],
-                Rationales=response["RL_Recommendation"]["Rationales"],
-            ),
+        # So you convert continuous values into bins (one np.digitize call per column)
+        # Step 4 : Get Action from the dense Q-table (all rows at once)
+        if not scored:
+            with span("rl_policy"):
+                states = self.registry.q_states(scores["X_rl"])
+                scores["action_idx"] = np.argmax(self.registry.q_lookup(states), axis=1)
+
+
+    # 5. Explain Layers : one SHAP call per layer over the N scored rows
+    # Input  : "scores" Dictionary from score_batch
+    # Output : Dictionary of SHAP values per layer, each (samples, features)
+    #          Tiered pipeline : only the rows of scores["explained"] are explained (others NaN),
+    #          the mask is kept as shap_values["explained"]
+    def shap_batch(self, scores):
+        explained = scores.get("explained")
+        shap_values = {}
+
+        # 1. PD : (samples, features)
+        # For Example shap_values["PD"][0(Sample Index)][1(Feature Index)] = 0.2
+        X = scores["X_pd"]
+        with span("shap_pd"):
+            shap_values["PD"] = self._layer_shap(explained, "PD", X, lambda r: self._pd_shap_values(X[r]))
+
+        # 2. Anomaly
+        X = scores["X_if"]
+        with span("shap_anomaly"):
+            shap_values["Anomaly"] = self._layer_shap(explained, "Anomaly", X, lambda r: self.if_explainer.shap_values(X[r]))
+
+        # 3. Risk : SHAP values of the predicted class of every row : (samples, features)
+        X = scores["X_risk"]
+        with span("shap_risk"):
+            shap_values["RiskLabel"] = self._layer_shap(
+                explained, "RiskLabel", X, lambda r: self._risk_shap_values(X[r], scores["risk_idx"][r])
+            )
+
+        # 4. Hybrid Score
+        X = scores["X_hyb"]
+        with span("shap_hybrid"):
+            shap_values["HybridScore"] = self._layer_shap(explained, "HybridScore", X, lambda r: self.hybrid_explainer.shap_values(X[r]))
+
+        # 5. RL Recommendation
+        X = scores["X_rl"]
+        with span("shap_rl"):
+            shap_values["RL_Recommendation"] = self._layer_shap(
+                explained, "RL_Recommendation", X, lambda r: self.rl_explainer.shap_values(X[r], silent=True)
+            )
+
+        if explained is not None:
+            shap_values["explained"] = explained
+        return shap_values
+
+
+    # Top Factors of every layer from the SHAP values of shap_batch
+    # Output : List (one per row) of Dictionaries with the top factors of every layer
+    #          (None for the layers a tiered row did not explain)
+    def top_factors(self, shap_values):
+        names = self.layer_features()
+        n = len(shap_values["PD"])
+        explained = shap_values.get("explained")
+        with span("top_factors"):
+            if explained is None:
+                return [
+                    {layer: self._top_shap_features(shap_values[layer][i], names[layer]) for layer in names}
+                    for i in range(n)
+                ]
+            return [
+                {layer: self._top_shap_features(shap_values[layer][i], names[layer]) if explained[i, j] else None
+                 for j, layer in enumerate(LAYERS)}
+                for i in range(n)
+            ]
+
+
+    # Feature names of every layer, in the column order of its SHAP values
+    def layer_features(self):
+        return {
+            "PD":                self.registry.pd_features,
+            "Anomaly":           self.registry.if_features,
+            "RiskLabel":         self.registry.risk_features,
+            "HybridScore":       self.registry.hybrid_features,
+            "RL_Recommendation": self.registry.q_features,
+        }
+
+
+    # Explanations : SHAP values -> Top Factors (used by the deferred mode and get_decision_batch)
+    def explain_batch(self, scores):
+        return self.top_factors(self.shap_batch(scores))
+
+
+    # 6. Build Responses : one CreditDecisionResponse per row (same order as input)
+    # explanations = None -> factor lists are left empty (None)
+    # Tiered rows stopped at the screen tier have no RiskLabel / HybridScore / RL_Recommendation
+    # Built ONCE with model_construct : engine output is trusted (plain Python types), so pydantic
+    # validation is skipped ; the routes serialize these objects directly (app/api/encoding.py)
+    def build_responses(self, scores, explanations=None):
+        results = []
+        tiered = "tier_exit" in scores
+        # NumPy -> Python values once per column (not once per field of every row)
+        pd_, if_score, flag = scores["pd"].tolist(), scores["if_score"].tolist(), scores["anomaly_flag"].tolist()
+        risk_idx, hybrid, action_idx = scores["risk_idx"].tolist(), scores["hybrid_score"].tolist(), scores["action_idx"].tolist()
+        for i in range(len(pd_)):
+            exp = explanations[i] if explanations is not None else {}
+            stopped = tiered and scores["tier_exit"][i] >= 0
+            results.append(CreditDecisionResponse.model_construct(
+                PD=PDResponse.model_construct(
+                    Probability_of_Default=round(pd_[i], 4),
+                    top_factors=exp.get("PD"),
+                ),
+                Anomaly=AnomalyResponse.model_construct(
+                    Anomaly_Score=round(if_score[i], 4),
+                    Anomaly_Flag=flag[i],
+                    top_factors=exp.get("Anomaly"),
+                ),
+                RiskLabel=RiskLabelResponse.model_construct(
+                    Risk_Label=RISK_LABELS[risk_idx[i]],
+                    Drivers=exp.get("RiskLabel"),
+                ) if not stopped else None,
+                HybridScore=HybridScoreResponse.model_construct(
+                    Hybrid_Score=round(hybrid[i], 1),
+                    factors=exp.get("HybridScore"),
+                ) if not stopped else None,
+                RL_Recommendation=RLRecommendationResponse.model_construct(
+                    Recommendation=ACTIONS[action_idx[i]],
+                    Rationales=exp.get("RL_Recommendation"),
+                ) if not stopped else None,
+                RuleScore=RuleScoreResponse.model_construct(
+                    Rule_Score=int(scores["rule_score"][i]),
+                    breakdown=self.rule_engine.breakdown(scores["rule_points"][i]),
+                ) if "rule_score" in scores else None,
+                Tier=self._tier_response(scores, i) if tiered else None,
+                # Every field is given in schema order : model_construct keeps it for the JSON keys
+                decision_id=None,
+                model_version=self.registry.model_version,
+            ))
+        return results
+
+
+    # Tier section of one tiered row : tier it stopped at, outcome + policy, explainers not run
+    def _tier_response(self, scores, i):
+        tier, outcome, policy = self.tier_policy.describe(scores["tier_exit"][i])
+        ran = SCREEN_LAYERS if outcome is not None else LAYERS
+        return TierResponse.model_construct(
+            Tier=tier,
+            Outcome=outcome,
+            Policy=policy,
+            Skipped_Explainers=[layer for j, layer in enumerate(LAYERS) if layer in ran and not scores["explained"][i, j]],
+        )
+
+
+    # 7. Get Decision call by Service Layer
+    # Input Row : Python Dictionary
+    # explain = False -> only scores, no SHAP explanations
+    def get_decision(self, input_row, explain=True, pipeline=None):
+        return self.get_decision_batch([input_row], explain=explain, pipeline=pipeline)[0]
+
+
+    # 8. Get Decision Batch call by Service Layer
+    # Every model and every explainer is called ONCE over an N-row matrix
+    # Input  : List of Python Dictionaries (one per applicant)
+    # Output : List of CreditDecisionResponse (same order as input)
+    # pipeline : "full" / "tiered" (None -> DECISION_PIPELINE)
+    def get_decision_batch(self, input_rows, explain=True, pipeline=None):
+        if len(input_rows) == 0:
+            return []
+        scores = self.score_batch(input_rows, pipeline)
+        explanations = self.explain_batch(scores) if explain else None
+        return self.build_responses(scores, explanations)
+
+
+    # 9. What-If Sweep : one applicant, 1 or 2 features varied over a grid (app/engines/whatif.py)
+    # Input  : base row (Python Dictionary), axes [(feature, values), ...], boundaries (label outputs)
+    # Output : WhatIfResponse -> every output over the grid + the points where a boundary output changes
+    # Every layer runs ONCE over the whole grid (full pipeline, no explanations)
+    def what_if(self, base_row, axes, boundaries=("Recommendation", "Risk_Label")):
+        plan = self.registry.feature_plan
+        with span("whatif_grid"):
+            X, shape = grid_matrix(plan.matrix([base_row]), [(plan.slot[feature], values) for feature, values in axes])
+        scores = self.score_matrix(X, "full")
+
+        # Label outputs : integer codes + names (boundaries are found on the codes)
+        labels = {
+            "Recommendation": (scores["action_idx"], ACTIONS),
+            "Risk_Label":     (scores["risk_idx"], RISK_LABELS),
+            "Anomaly_Flag":   (scores["anomaly_flag"], ["NORMAL", "ANOMALY"]),
+        }
+        outputs = {
+            "PD":            np.round(scores["pd"], 4),
+            "Anomaly_Score": np.round(scores["if_score"], 4),
+            "Anomaly_Flag":  scores["anomaly_flag"],
+            "Risk_Label":    np.asarray(RISK_LABELS)[scores["risk_idx"]],
+            "Hybrid_Score":  np.round(scores["hybrid_score"], 1),
+            "Recommendation": np.asarray(ACTIONS)[scores["action_idx"]],
+        }
+        if "rule_score" in scores:
+            outputs["Rule_Score"] = scores["rule_score"]
+
+        # Last row = base applicant, the others = grid in C order
+        base = {name: values[-1].item() for name, values in outputs.items()}
+        surface = {name: values[:-1].reshape(shape).tolist() for name, values in outputs.items()}
+
+        found = []
+        with span("whatif_boundaries"):
+            for output in boundaries:
+                codes, names = labels[output]
+                codes = codes[:-1]
+                for axis, lo, hi in crossings(codes, shape):
+                    feature, values = axes[axis]
+                    found.append(WhatIfCrossing.model_construct(
+                        output=output,
+                        feature=feature,
+                        between=(float(values[lo[axis]]), float(values[hi[axis]])),
+                        before=names[codes[np.ravel_multi_index(lo, shape)]],
+                        after=names[codes[np.ravel_multi_index(hi, shape)]],
+                        at={f: float(v[lo[j]]) for j, (f, v) in enumerate(axes) if j != axis},
+                    ))
+
+        return WhatIfResponse.model_construct(
+            axes=[WhatIfAxisValues.model_construct(feature=feature, values=[float(v) for v in values]) for feature, values in axes],
+            base=base,
+            surface=surface,
+            crossings=found,
+            model_version=self.registry.model_version,
         )
 
 
-# Global engine instance
-engine = CreditDecisionEngine()
\ No newline at end of file
+    # 10. Warm-up : one synthetic applicant (median of the background) through every layer
+    # Builds every lazy explainer and runs every model once before the API takes traffic
+    # Output : seconds spent
+    def warm_up(self):
+        start = time.perf_counter()
+        row = self.registry.bg_data[self.registry.hybrid_features].median().to_dict()
+        self.get_decision_batch([row])
+        self.startup_timings["warm_up"] = round(time.perf_counter() - start, 4)
+        return self.startup_timings["warm_up"]
@@ -0,0 +1,134 @@
+import itertools
+import math
+import numpy as np
+import shap
+
+# Native Explainers :
+# Small, NumPy-only explainers for layers where the model is simple enough
+# that SHAP values have a closed form.
+# They expose the same shap_values(X) call as the shap explainers they replace,
+# so CreditDecisionEngine can switch between them through config.
+
+
+# 1. Q-Policy Exact Explainer : RL Recommendation Layer
+#
+# The Q policy only has 3 inputs (PD, anomaly, HybridCreditScore)
+# and it is piecewise constant over the q_bins grid :
+#       f(x) = max(Q[ digitize(x) ])
+#
+# Exact Shapley value of feature i :
+#       phi_i = sum over S (without i) of  |S|! (M - |S| - 1)! / M!  * (v(S + i) - v(S))
+#       v(S)  = mean over background rows b of f(x_S , b_rest)
+#
+# With M = 3 features there are only 2^3 = 8 coalitions,
+# so we can evaluate every coalition exactly instead of sampling them (KernelExplainer).
+# Because f only depends on the discrete state, phi only depends on the state too
+# -> it can be precomputed ONCE for every state at startup and looked up afterwards.
+
+class QPolicyExactExplainer:
+
+    # q_values   : dense Q-table (pd states, anomaly states, score states, actions)
+    # q_states   : function that discretizes (samples, 3) rows into states
+    # background : (rows, 3) prototype rows
+    def __init__(self, q_values, q_states, background, precompute=True):
+        self.q_states = q_states
+        self.grid_shape = q_values.shape[:-1]
+        self.n_features = len(self.grid_shape)
+
+        # Step 1 : Policy value of every discrete state : max Q
+        self.state_values = q_values.max(axis=-1)
+
+        # Step 2 : Discretize the background once : (background rows, features)
+        self.bg_states = self.q_states(background)
+        self.expected_value = float(self._values(self.bg_states).mean())
+
+        # Step 3 : Coalition masks and Shapley weights
+        # masks[c, i] = True -> feature i takes the value of x in coalition c
+        M = self.n_features
+        self.masks = np.array(list(itertools.product([False, True], repeat=M)))
+        self.weights = np.array([
+            math.factorial(k) * math.factorial(M - k - 1) / math.factorial(M)
+            for k in range(M)
+        ])
+
+        # Step 4 (Optional) : Shapley values of every discrete state
+        # Table shape : (pd states, anomaly states, score states, features)
+        self.phi_table = None
+        if precompute:
+            all_states = np.array(list(np.ndindex(*self.grid_shape)))
+            self.phi_table = self._phi_from_states(all_states).reshape(
+                self.grid_shape + (M,)
+            )
+
+
+    # Policy value f for discrete states of shape (..., features)
+    def _values(self, states):
+        return self.state_values[tuple(states[..., j] for j in range(self.n_features))]
+
+
+    # Closed-form Shapley values for discrete states : (samples, features)
+    def _phi_from_states(self, states):
+        # Step 1 : Build every hybrid state (x on coalition, background elsewhere)
+        # Shape : (samples, coalitions, background rows, features)
+        hybrid = np.where(
+            self.masks[None, :, None, :],
+            states[:, None, None, :],
+            self.bg_states[None, None, :, :],
+        )
+
+        # Step 2 : v(S) = mean of f over background rows : (samples, coalitions)
+        v = self._values(hybrid).mean(axis=2)
+
+        # Step 3 : Weighted marginal contributions of every feature
+        phi = np.zeros((states.shape[0], self.n_features))
+        sizes = self.masks.sum(axis=1)
+        for c, mask in enumerate(self.masks):
+            for i in np.flatnonzero(~mask):
+                with_i = mask.copy()
+                with_i[i] = True
+                c_with_i = int(np.flatnonzero((self.masks == with_i).all(axis=1))[0])
+                phi[:, i] += self.weights[sizes[c]] * (v[:, c_with_i] - v[:, c])
+        return phi
+
+
+    # Same call as shap.KernelExplainer.shap_values
+    # X : (samples, 3) -> SHAP values : (samples, 3)
+    def shap_values(self, X, silent=True):
+        states = self.q_states(X)
+        if self.phi_table is not None:
+            return self.phi_table[tuple(states[:, j] for j in range(self.n_features))]
+        return self._phi_from_states(states)
+
+
+
+# 2. PD Linear Explainer : PD Layer (Logistic Regression)
+#
+# For a linear model with independent-feature masking the SHAP value is closed form :
+#       phi = coef * (x_scaled - mean(background))
+#       expected_value = coef . mean(background) + intercept   (log-odds space)
+# This is exactly what shap.LinearExplainer computes, without building an Explanation
+# object on the hot path. coef and mean are precomputed by the ModelRegistry.
+
+class PDLinearExplainer:
+
+    # coef      : (features,) logistic regression coefficients
+    # bg_mean   : (features,) mean of the scaled background sample
+    # intercept : logistic regression intercept
+    def __init__(self, coef, bg_mean, intercept=0.0):
+        self.coef = np.asarray(coef, dtype=float)
+        self.mean = np.asarray(bg_mean, dtype=float)
+        self.expected_value = float(self.coef @ self.mean + intercept)
+
+    # X : (samples, features) scaled rows -> SHAP values : (samples, features)
+    def shap_values(self, X, silent=True):
+        return self.coef * (np.atleast_2d(X) - self.mean)
+
+    # Same call as shap.LinearExplainer(X) -> shap.Explanation
+    # Only used by the plotting routes, which need an Explanation object
+    def __call__(self, X):
+        X = np.atleast_2d(X)
+        return shap.Explanation(
+            values=self.shap_values(X),
+            base_values=np.full(len(X), self.expected_value),
+            data=X,
+        )
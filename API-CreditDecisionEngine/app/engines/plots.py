@@ -0,0 +1,69 @@
+import threading
+from io import BytesIO
+import matplotlib
+matplotlib.use("Agg")
+# In Matplotlib, AGG refers to the Anti-Grain Geometry (AGG) library,
+# which is used to create pixel images of plots.
+import matplotlib.pyplot as plt
+import shap
+
+# SHAP Plot Rendering :
+# Runs inside the render worker processes (app/services/plot_renderer.py).
+# This module only imports matplotlib + shap (never the model registry),
+# so starting a worker does not load any model.
+#
+# Every render owns its figure object and saves it through that object.
+# shap.plots.waterfall and force have no ax argument : they draw on (or create) the current pyplot
+# figure, so drawing runs under _PYPLOT_LOCK with the render's own axes made current (plt.sca),
+# and the figure is detached from pyplot before the lock is released.
+# Saving to PNG only touches the figure object and runs outside the lock,
+# so render_png is thread-safe as well as process-safe.
+
+# Guards pyplot's global state (current figure / axes, figure manager)
+_PYPLOT_LOCK = threading.Lock()
+
+# Plot type -> shap plot (same plots as the original /explain/* routes)
+PLOT_TYPES = ("pd", "anomaly", "hybrid", "risk")
+
+
+# payload : {"values", "base_value", "data", "feature_names"} of one layer
+# Output  : PNG bytes
+def render_png(plot: str, payload: dict) -> bytes:
+    explanation = shap.Explanation(
+        values=payload["values"],
+        base_values=payload["base_value"],
+        data=payload["data"],
+        feature_names=payload["feature_names"],
+    )
+
+    with _PYPLOT_LOCK:
+        # Step 1 : Create the figure + axes of this render and make them current
+        fig = plt.figure(figsize=(10, 4))
+        ax = fig.add_subplot()
+        plt.sca(ax)
+        try:
+            # Step 2 : Draw the plot
+            if plot == "anomaly":
+                # Force plot : creates its own figure, the empty one is closed
+                fig_force = shap.plots.force(explanation, matplotlib=True, show=False)
+                plt.close(fig)
+                fig = fig_force
+            elif plot == "hybrid":
+                # Bar plot : drawn on the render's axes (shap sizes the figure to the features)
+                shap.plots.bar(explanation, ax=ax, show=False)
+            else:
+                # Waterfall plot (pd, risk) : drawn on the current axes
+                shap.plots.waterfall(explanation, show=False)
+        finally:
+            # Detach from pyplot : the figure object stays usable, pyplot forgets it
+            plt.close(fig)
+
+    # Step 3 : Save to PNG bytes
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+
+# Startup warm-up : unpickling this function imports matplotlib + shap in the worker
+def ping() -> bool:
+    return True
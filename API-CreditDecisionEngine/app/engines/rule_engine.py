@@ -0,0 +1,90 @@
+import numpy as np
+
+# Rule-Based Credit Score :
+# 300 - 900 score of "ML/2*. Models/4*. Hybrid-CreditScore_model/1. Rule-Based Credit Score Calculator"
+#
+#   score = clamp( 500 + income + stability + expense + emi + balance + bounce + vintage , 300 , 900 )
+#
+# Every sector is one row of a table : (sector, feature, comparison, thresholds, points)
+#   ">=" : first threshold the value reaches wins       (income >= 150k -> +90, >= 100k -> +25, ...)
+#   "<"  : first threshold the value stays below wins   (CV < 0.10 -> +15, < 0.20 -> +15, ...)
+#   "<=" : first threshold the value does not exceed wins
+#   no threshold matched -> last points of the row
+#
+# Vectorized : one np.searchsorted per sector over all N rows (no Python loop over rows),
+# ">=" rules are evaluated as "<=" on the negated values so NaN always falls to the last (worst) points.
+#
+# Tables :
+#   "training"   -> points of Rule_based_credit_score.ipynb, the calculator that produced
+#                   RuleBasedCreditScore in feature_with_rule_score.csv (the Hybrid model's target)
+#   "documented" -> points of RULE_ENGINE.md (differs from the notebook for 6 of the 7 sectors)
+
+BASE_SCORE = 500
+MIN_SCORE = 300
+MAX_SCORE = 900
+
+RULE_TABLES = {
+    "training": [
+        ("income_strength",    "avgMonthlyIncome",  ">=", (150_000, 100_000, 60_000), (90, 25, 15, -100)),
+        ("income_stability",   "incomeCV",          "<",  (0.10, 0.20),               (15, 15, -60)),
+        ("expense_discipline", "expenseRatio",      "<=", (0.50, 0.65, 0.80),         (25, 15, -10, -100)),
+        ("emi_burden",         "emiRatio",          "<=", (0.30, 0.40, 0.50),         (50, 15, -60, -100)),
+        ("liquidity_buffer",   "avgMonthlyBalance", ">=", (100_000, 50_000, 20_000),  (25, 15, -10, -100)),
+        # Bounce count is an integer >= 0 : "<= 0" is "== 0", "<= 1" is "== 1"
+        ("bounce_discipline",  "bounceCount",       "<=", (0, 1, 3),                  (70, 15, -80, -150)),
+        ("account_vintage",    "accountAgeMonths",  ">=", (60, 36, 12),               (25, 15, 15, -60)),
+    ],
+    "documented": [
+        ("income_strength",    "avgMonthlyIncome",  ">=", (150_000, 100_000, 60_000), (90, 60, 30, -60)),
+        ("income_stability",   "incomeCV",          "<",  (0.10, 0.20),               (30, 15, -40)),
+        ("expense_discipline", "expenseRatio",      "<=", (0.50, 0.65, 0.80),         (60, 30, -10, -80)),
+        ("emi_burden",         "emiRatio",          "<=", (0.30, 0.40, 0.50),         (50, 20, -40, -100)),
+        ("liquidity_buffer",   "avgMonthlyBalance", ">=", (100_000, 50_000, 20_000),  (40, 20, -10, -60)),
+        ("bounce_discipline",  "bounceCount",       "<=", (0, 1, 3),                  (70, 25, -80, -150)),
+        ("account_vintage",    "accountAgeMonths",  ">=", (60, 36, 12),               (40, 30, 15, -50)),
+    ],
+}
+
+
+class RuleScoreEngine:
+
+    # table : list of (sector, feature, comparison, thresholds, points) rows
+    def __init__(self, table, base=BASE_SCORE, min_score=MIN_SCORE, max_score=MAX_SCORE):
+        self.base = base
+        self.min_score = min_score
+        self.max_score = max_score
+        self.sectors = [row[0] for row in table]
+        self.features = [row[1] for row in table]
+
+        # Compile every row to : sign, ascending thresholds, searchsorted side, points
+        self._rules = []
+        for sector, feature, op, thresholds, points in table:
+            if len(points) != len(thresholds) + 1:
+                raise ValueError(f"Sector {sector} : needs one more points value than thresholds")
+            sign = -1.0 if op == ">=" else 1.0
+            side = {">=": "left", "<=": "left", "<": "right"}[op]
+            bounds = sign * np.asarray(thresholds, dtype=np.float64)
+            if np.any(np.diff(bounds) <= 0):
+                raise ValueError(f"Sector {sector} : thresholds must be ordered from the best points")
+            self._rules.append((feature, sign, bounds, side, np.asarray(points, dtype=np.int64)))
+
+
+    # features : Mapping feature name -> (rows,) values (dict of arrays, DataFrame, ...)
+    # Output   : {"score": (rows,) int, "points": (rows, sectors) int}
+    def evaluate(self, features):
+        points = None
+        for j, (feature, sign, bounds, side, table) in enumerate(self._rules):
+            values = np.asarray(features[feature], dtype=np.float64)
+            if points is None:
+                points = np.empty((len(values), len(self._rules)), dtype=np.int64)
+            # Index of the first matching threshold, len(thresholds) when none matches
+            points[:, j] = table[np.searchsorted(bounds, sign * values, side=side)]
+        score = np.clip(self.base + points.sum(axis=1), self.min_score, self.max_score)
+        return {"score": score, "points": points}
+
+
+    # Breakdown of one row : {"base": 500, "income_strength": 90, ...} (same keys as the notebook)
+    def breakdown(self, points_row):
+        out = {"base": self.base}
+        out.update({sector: int(p) for sector, p in zip(self.sectors, points_row)})
+        return out
@@ -0,0 +1,106 @@
+import numpy as np
+
+# Tiered Decision Pipeline :
+# Cheap layers first, then declarative policies decide which rows need the rest.
+#
+#   tier "screen" : PD (logistic regression) + Anomaly (isolation forest)
+#        |
+#        |  policies over PD, anomaly score / flag and the 7 input features
+#        |  -> REJECT / REVIEW : the row stops here (no Risk, Hybrid or RL model, no explainer of them)
+#        |  -> CONTINUE        : the row goes on (some explainers may be skipped)
+#        v
+#   tier "full"   : RiskLabel (random forest) + HybridScore (gradient boosting) + RL (Q-table)
+#
+# Every policy is one row of a table : (policy, conditions, action, skipped explainers)
+#   conditions : ((signal, comparison, value), ...) -> all must hold
+#   action     : "REJECT" / "REVIEW" end the row at the screen tier, "CONTINUE" does not
+#   skipped    : layers whose explainer is not run for the matching rows
+# The first matching REJECT / REVIEW policy (table order) decides the outcome of a row.
+# Skipped explainers of a row = union over every policy it matches.
+#
+# Vectorized : one comparison per condition over all N rows (no Python loop over rows).
+#
+# Tables :
+#   "prescreen" -> near-certain outcomes of the PD + anomaly layers (high-volume pre-screening)
+
+SCREEN = "screen"
+FULL = "full"
+
+# Layer order of the "explained" mask (same names as the SHAP values of the engine)
+LAYERS = ["PD", "Anomaly", "RiskLabel", "HybridScore", "RL_Recommendation"]
+SCREEN_LAYERS = ["PD", "Anomaly"]
+
+# Signals known after the screen tier (input features are read from the feature plan)
+SCREEN_SIGNALS = ["PD", "anomalyScore", "anomalyFlag"]
+
+ACTIONS = ["REJECT", "REVIEW", "CONTINUE"]
+
+COMPARISONS = {
+    ">=": np.greater_equal,
+    ">":  np.greater,
+    "<=": np.less_equal,
+    "<":  np.less,
+    "==": np.equal,
+}
+
+TIER_POLICIES = {
+    "prescreen": [
+        ("pd_with_bounces",   (("PD", ">=", 0.90), ("bounceCount", ">=", 3)),     "REJECT",   ()),
+        ("pd_near_certain",   (("PD", ">=", 0.98),),                              "REJECT",   ()),
+        ("anomalous_high_pd", (("anomalyFlag", "==", 1), ("PD", ">=", 0.60)),     "REVIEW",   ()),
+        # Clear low-risk applicants : scored by every layer, explained by PD + Hybrid + RL only
+        ("clear_low_pd",      (("PD", "<=", 0.05), ("anomalyFlag", "==", 0)),     "CONTINUE", ("Anomaly", "RiskLabel")),
+    ],
+}
+
+
+class TierPolicy:
+
+    # table : list of (policy, conditions, action, skipped explainers) rows
+    def __init__(self, table):
+        self.names = [row[0] for row in table]
+        self.actions = [row[2] for row in table]
+        # Signals read by at least one condition (the engine only builds these)
+        self.signals = sorted({signal for row in table for signal, _, _ in row[1]})
+
+        # Compile every row to : conditions (signal, ufunc, value), exit flag, explained mask
+        self._rules = []
+        for name, conditions, action, skipped in table:
+            if action not in ACTIONS:
+                raise ValueError(f"Policy {name} : unknown action {action} (one of {', '.join(ACTIONS)})")
+            if not conditions:
+                raise ValueError(f"Policy {name} : needs at least one condition")
+            unknown = [op for _, op, _ in conditions if op not in COMPARISONS]
+            unknown += [layer for layer in skipped if layer not in LAYERS]
+            if unknown:
+                raise ValueError(f"Policy {name} : unknown comparison / layer {', '.join(unknown)}")
+            compiled = [(signal, COMPARISONS[op], float(value)) for signal, op, value in conditions]
+            keep = np.array([layer not in skipped for layer in LAYERS])
+            self._rules.append((compiled, action != "CONTINUE", keep))
+
+
+    # signals : Mapping signal name -> (rows,) values, n : rows
+    # Output  : {"exit": (rows,) int policy index of the outcome (-1 : goes to the full tier),
+    #            "explained": (rows, layers) bool explainer run for the layer}
+    # NaN never matches a condition
+    def evaluate(self, signals, n):
+        exit_idx = np.full(n, -1, dtype=np.int64)
+        explained = np.ones((n, len(LAYERS)), dtype=bool)
+        for j, (conditions, exits, keep) in enumerate(self._rules):
+            match = np.ones(n, dtype=bool)
+            for signal, compare, value in conditions:
+                match &= compare(np.asarray(signals[signal], dtype=np.float64), value)
+            if exits:
+                match_exit = match & (exit_idx < 0)
+                exit_idx[match_exit] = j
+            explained[match] &= keep
+        # Rows that stop at the screen tier never run the explainers of the full tier
+        explained[exit_idx >= 0, len(SCREEN_LAYERS):] = False
+        return {"exit": exit_idx, "explained": explained}
+
+
+    # Tier / outcome / policy name of one row (exit index from evaluate)
+    def describe(self, exit_idx):
+        if exit_idx < 0:
+            return FULL, None, None
+        return SCREEN, self.actions[exit_idx], self.names[exit_idx]
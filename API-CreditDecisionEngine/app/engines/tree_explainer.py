@@ -0,0 +1,296 @@
+import math
+import threading
+import numpy as np
+import shap
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Native Tree Explainer :
+# In-project TreeSHAP over the flat node arrays built by app/core/tree_arrays.py
+#
+# Idea :
+# A leaf only depends on the UNIQUE features on its path.
+# For every one of those features the path defines an interval (lo, hi]
+# and a row either satisfies it (bit = 1) or not (bit = 0).
+# With u unique features a leaf sees only 2^u possible bit patterns,
+# and the Shapley contribution of the leaf only depends on that pattern.
+# So we precompute, at startup, a table :
+#       table[leaf, pattern, k] = SHAP weight of the k-th path feature
+# and explaining a row becomes : compare -> pattern -> gather -> one matrix product.
+#
+# 1. Path-dependent (no background, like shap.TreeExplainer(model)) :
+#       E[f | S] for one leaf = value * prod over path features j of
+#                               (bit_j       if j in S
+#                                cover_ratio if j not in S)
+#    -> product game, exact Shapley value with the polynomial (DP) trick of TreeSHAP
+#
+# 2. Interventional (with background, like shap.Explainer(model, background)) :
+#       for one (x, background z) pair a leaf is reached by the hybrid point iff
+#       features in A (only x satisfies) are in S and features in B (only z satisfies) are not
+#    -> phi = (a-1)! b! / (a+b)!   for features in A
+#       phi = -a! (b-1)! / (a+b)!  for features in B
+#    The background only enters through how many rows produce each z pattern per leaf.
+
+
+class NativeTreeExplainer:
+
+    # flat       : FlatTreeEnsemble (contiguous node arrays)
+    # background : None -> path-dependent, (rows, features) array -> interventional
+    # background_weights : weight of every background row (None -> equal weights)
+    # chunk_size : rows explained per chunk (bounds memory on large batches)
+    # n_jobs     : chunks explained in parallel (1 = no pool)
+    # backend    : "thread" or "process" pool for parallel chunks
+    def __init__(self, flat, background=None, background_weights=None,
+                 chunk_size=128, n_jobs=1, backend="thread"):
+        self.flat = flat
+        self.n_features = flat.n_features
+        self.n_outputs = flat.n_outputs
+        self.input_dtype = flat.input_dtype
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self._pool = None
+        # Shared by the micro-batcher, the explanation store and the plot threads : one pool per explainer
+        self._pool_lock = threading.Lock()
+
+        if background is not None:
+            background = self._prepare(background)
+            if background_weights is None:
+                background_weights = np.ones(len(background))
+            background_weights = np.asarray(background_weights, dtype=np.float64)
+            background_weights = background_weights / background_weights.sum()
+            self.feature_perturbation = "interventional"
+        else:
+            self.feature_perturbation = "tree_path_dependent"
+
+        # Step 1 : Walk every tree once -> leaf paths grouped by number of unique features
+        leaves = self._leaf_paths()
+
+        # Step 2 : Per group, precompute the SHAP table and the feature projection
+        self.groups = []
+        expected = np.zeros(self.n_outputs)
+        for u, leaf in sorted(leaves.items()):
+            feats  = np.array(leaf["features"], dtype=np.int64)    # (L, u)
+            lo     = np.array(leaf["lo"])                          # (L, u)
+            hi     = np.array(leaf["hi"])                          # (L, u)
+            values = self.flat.values[np.array(leaf["node"])]       # (L, outputs)
+
+            if background is None:
+                table = self._path_dependent_table(np.array(leaf["ratio"]))
+                # E[f] : every feature follows the cover ratios
+                weight = np.prod(leaf["ratio"], axis=1)
+            else:
+                counts = self._pattern_counts(background, background_weights, feats, lo, hi)
+                table = self._interventional_table(counts)
+                # E[f] : (weighted) fraction of background rows that reach the leaf
+                weight = counts[:, -1]
+            expected += weight @ values
+
+            # Projection (leaf, k) -> (feature, output) weighted by the leaf value
+            L = len(feats)
+            proj = np.zeros((L * u, self.n_features, self.n_outputs))
+            proj[np.arange(L * u), feats.ravel()] = np.repeat(values, u, axis=0)
+
+            self.groups.append({
+                "u": u,
+                "features": feats,
+                "lo": lo,
+                "hi": hi,
+                "powers": (1 << np.arange(u)).astype(np.uint16),
+                "table": table.reshape(L * 2 ** u, u),
+                "offsets": np.arange(L) * 2 ** u,
+                "proj": proj.reshape(L * u, self.n_features * self.n_outputs),
+            })
+
+        self.expected_value = expected + self.flat.base_offset
+        if self.n_outputs == 1:
+            self.expected_value = float(self.expected_value[0])
+
+
+    # Cast like the model does before comparing with thresholds
+    def _prepare(self, X):
+        X = np.asarray(X)
+        return np.atleast_2d(X.astype(self.input_dtype)).astype(np.float64)
+
+
+    # Leaf Paths : for every leaf, the interval (lo, hi] and the cover ratio of every unique feature
+    def _leaf_paths(self):
+        f = self.flat
+        groups = {}
+        for root in f.roots:
+            # Stack of (node, {feature: [lo, hi, ratio]})
+            stack = [(int(root), {})]
+            while stack:
+                node, path = stack.pop()
+                if f.children_left[node] == -1:
+                    u = len(path)
+                    leaf = groups.setdefault(u, {"node": [], "features": [], "lo": [], "hi": [], "ratio": []})
+                    leaf["node"].append(node)
+                    leaf["features"].append(list(path.keys()))
+                    leaf["lo"].append([p[0] for p in path.values()])
+                    leaf["hi"].append([p[1] for p in path.values()])
+                    leaf["ratio"].append([p[2] for p in path.values()])
+                    continue
+                feat, thr = int(f.features[node]), f.thresholds[node]
+                left, right = int(f.children_left[node]), int(f.children_right[node])
+                lo, hi, ratio = path.get(feat, (-np.inf, np.inf, 1.0))
+                # Left child : x <= threshold
+                path_left = dict(path)
+                path_left[feat] = (lo, min(hi, thr), ratio * f.cover[left] / f.cover[node])
+                # Right child : x > threshold
+                path_right = dict(path)
+                path_right[feat] = (max(lo, thr), hi, ratio * f.cover[right] / f.cover[node])
+                stack.append((right, path_right))
+                stack.append((left, path_left))
+        return groups
+
+
+    # Bit patterns : pattern[m, j] = j-th bit of m
+    @staticmethod
+    def _bits(u):
+        return ((np.arange(2 ** u)[:, None] >> np.arange(u)) & 1).astype(np.float64)
+
+
+    # Path-dependent SHAP table : (leaves, patterns, u)
+    # phi_k = (bit_k - r_k) * sum over s of  s! (u-s-1)! / u!  * e_s(k)
+    # e_s(k) = coefficient of t^s in prod over j != k of (r_j + bit_j * t)
+    def _path_dependent_table(self, ratio):
+        L, u = ratio.shape
+        bits = self._bits(u)                                             # (P, u)
+        w = np.array([math.factorial(s) * math.factorial(u - s - 1) / math.factorial(u)
+                      for s in range(u)])
+        table = np.zeros((L, 2 ** u, u))
+        for k in range(u):
+            coef = np.zeros((L, 2 ** u, u))
+            coef[:, :, 0] = 1.0
+            for j in range(u):
+                if j == k:
+                    continue
+                shifted = np.zeros_like(coef)
+                shifted[:, :, 1:] = coef[:, :, :-1] * bits[None, :, j, None]
+                coef = coef * ratio[:, None, j, None] + shifted
+            table[:, :, k] = (bits[None, :, k] - ratio[:, None, k]) * (coef @ w)
+        return table
+
+
+    # Background pattern counts : counts[leaf, pattern] = weight of the background rows producing that pattern
+    # Background rows are processed in slices (a full 30k-row background over 25k leaves does not fit at once)
+    def _pattern_counts(self, background, weights, feats, lo, hi):
+        L, u = feats.shape
+        P = 2 ** u
+        counts = np.zeros(L * P)
+        powers = (1 << np.arange(u)).astype(np.uint16)
+        offsets = np.arange(L) * P
+        step = max(1, (1 << 22) // (L * max(u, 1)))
+        for i in range(0, len(background), step):
+            patterns = self._patterns(background[i:i + step], feats, lo, hi, powers)  # (B, L)
+            w = np.broadcast_to(weights[i:i + step, None], patterns.shape)
+            counts += np.bincount((offsets + patterns).ravel(), weights=w.ravel(), minlength=L * P)
+        return counts.reshape(L, P)
+
+
+    # Interventional SHAP table : (leaves, patterns, u)
+    def _interventional_table(self, counts):
+        L, P = counts.shape
+        u = P.bit_length() - 1
+        x_bits = self._bits(u).astype(bool)[:, None, :]                  # (P, 1, u)
+        z_bits = self._bits(u).astype(bool)[None, :, :]                  # (1, P, u)
+        in_a = x_bits & ~z_bits
+        in_b = ~x_bits & z_bits
+        conflict = (~x_bits & ~z_bits).any(axis=2, keepdims=True)
+        a = in_a.sum(axis=2, keepdims=True)
+        b = in_b.sum(axis=2, keepdims=True)
+        fact = np.array([math.factorial(i) for i in range(u + 1)], dtype=np.float64)
+        total = fact[a + b]
+        w_a = fact[np.maximum(a - 1, 0)] * fact[b] / total
+        w_b = fact[a] * fact[np.maximum(b - 1, 0)] / total
+        weights = np.where(in_a, w_a, 0.0) - np.where(in_b, w_b, 0.0)
+        weights = np.where(conflict, 0.0, weights)                       # (Px, Pz, u)
+        # table[leaf, x pattern, k] = sum over z patterns of counts * weights
+        return np.einsum("lz,xzk->lxk", counts, weights)
+
+
+    # Patterns of rows for one group : (rows, leaves)
+    # pattern = sum over k of bit_k * 2^k  (u <= 16 bits fits uint16)
+    @staticmethod
+    def _patterns(X, feats, lo, hi, powers):
+        xf = X[:, feats]                                                  # (N, L, u)
+        ok = (xf > lo) & (xf <= hi)
+        return np.einsum("nlu,u->nl", ok.astype(np.uint16), powers).astype(np.intp)
+
+
+    # SHAP values of one chunk : (rows, features * outputs)
+    def _explain_chunk(self, X):
+        phi = np.zeros((len(X), self.n_features * self.n_outputs))
+        for g in self.groups:
+            patterns = self._patterns(X, g["features"], g["lo"], g["hi"], g["powers"])
+            gathered = g["table"].take(g["offsets"] + patterns, axis=0)  # (N, L, u)
+            phi += gathered.reshape(len(X), -1) @ g["proj"]
+        return phi
+
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                if self.backend == "process":
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.n_jobs, initializer=_init_worker, initargs=(self,)
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.n_jobs)
+            return self._pool
+
+
+    # Same call as shap.TreeExplainer.shap_values
+    # Output : (samples, features) for one output, (samples, features, outputs) otherwise
+    def shap_values(self, X, silent=True):
+        X = self._prepare(X)
+        chunks = [X[i:i + self.chunk_size] for i in range(0, len(X), self.chunk_size)]
+
+        if self.n_jobs > 1 and len(chunks) > 1:
+            if self.backend == "process":
+                parts = list(self._executor().map(_explain_in_worker, chunks))
+            else:
+                parts = list(self._executor().map(self._explain_chunk, chunks))
+        else:
+            parts = [self._explain_chunk(chunk) for chunk in chunks]
+
+        phi = np.concatenate(parts).reshape(len(X), self.n_features, self.n_outputs)
+        if self.n_outputs == 1:
+            return phi[:, :, 0]
+        return phi
+
+
+    # Same call as shap explainer(X) -> shap.Explanation
+    # Only used by the plotting routes, which need an Explanation object
+    def __call__(self, X):
+        data = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        values = self.shap_values(data)
+        base_values = np.tile(self.expected_value, (len(data), 1))
+        if self.n_outputs == 1:
+            base_values = base_values[:, 0]
+        return shap.Explanation(values=values, base_values=base_values, data=data)
+
+
+    # Pools hold threads / processes, locks cannot be pickled : never pickle them
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        del state["_pool_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+
+
+# Process pool workers keep their own copy of the explainer (sent once at start)
+_worker_explainer = None
+
+
+def _init_worker(explainer):
+    global _worker_explainer
+    _worker_explainer = explainer
+
+
+def _explain_in_worker(X):
+    return _worker_explainer._explain_chunk(X)
@@ -0,0 +1,43 @@
+import numpy as np
+
+# What-If Sweep :
+# One applicant, one or two features varied over a grid, every layer scored over the whole grid at once.
+#
+#   base row --> (cells + 1, columns) matrix : base row repeated, varied columns set from the meshgrid
+#                (last row = the base applicant itself)
+#            --> engine.score_matrix : PD, Anomaly, Risk, Hybrid, RL over every row (no explanations)
+#            --> surfaces : every output reshaped to the grid shape
+#            --> crossings : neighbouring grid points where a label output changes
+#
+# Vectorized : no Python loop over grid points (crossings are found by comparing shifted label grids).
+
+
+# Feature matrix of the sweep : (cells + 1, columns)
+# X_base : (1, columns) matrix of the base applicant (FeaturePlan.matrix)
+# axes   : [(column slot, values), ...] in axis order
+# Output : matrix, grid shape ; row i < cells is grid point np.unravel_index(i, shape), the last row is X_base
+def grid_matrix(X_base, axes):
+    shape = tuple(len(values) for _, values in axes)
+    cells = int(np.prod(shape))
+    X = np.repeat(X_base, cells + 1, axis=0)
+    mesh = np.meshgrid(*[np.asarray(values, dtype=np.float64) for _, values in axes], indexing="ij")
+    for (slot, _), column in zip(axes, mesh):
+        X[:cells, slot] = column.ravel()
+    return X, shape
+
+
+# Boundary crossings of one label grid
+# codes : (cells,) integer label of every grid point, shape : grid shape
+# Output : [(axis, index of the grid point before the change, index after), ...] in axis then grid order
+def crossings(codes, shape):
+    grid = codes.reshape(shape)
+    out = []
+    for axis in range(grid.ndim):
+        n = grid.shape[axis]
+        before = np.take(grid, np.arange(n - 1), axis=axis)
+        after = np.take(grid, np.arange(1, n), axis=axis)
+        for idx in np.argwhere(before != after):
+            lo = tuple(int(i) for i in idx)
+            hi = lo[:axis] + (lo[axis] + 1,) + lo[axis + 1:]
+            out.append((axis, lo, hi))
+    return out
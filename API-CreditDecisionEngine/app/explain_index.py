@@ -0,0 +1,84 @@
+import argparse
+import json
+import sys
+import time
+
+from app.core.config import EXPLAIN_INDEX_WORKERS, EXPLAIN_INDEX_CHUNK_SIZE
+from app.core.model_bundle import BundleError
+from app.services.explanation_index import ExplanationIndex, IndexBuildInProgress, IndexNotReady, query_index, FAILED
+from app.services.model_manager import load_deployment
+
+# Explanation Index CLI :
+# Offline build of the portfolio SHAP index of a model version (app/services/explanation_index.py),
+# across a process pool, before the API serves GET /api/explain/global/{layer}.
+# The running API picks the index file up on its next query (no restart).
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m app.explain_index build [--version v2] [--workers 8] [--chunk-size 2000] [--force]
+#   python -m app.explain_index show [--version v2]
+#   python -m app.explain_index query RiskLabel [--version v2] [--segment-by risk_label]
+
+
+def build(args):
+    deployment = load_deployment(args.version, warm_up=False)
+    index = ExplanationIndex(workers=args.workers, chunk_size=args.chunk_size)
+    last = [0.0]
+
+    def progress(done, rows):
+        if time.perf_counter() - last[0] > 5 or done == rows:
+            last[0] = time.perf_counter()
+            print(f"{done} / {rows} rows", flush=True)
+
+    status = index.build(deployment, wait=True, force=args.force, progress=progress)
+    if status["build"]["status"] == FAILED:
+        sys.exit(f"Error : {status['build']['error']}")
+    print(json.dumps(status["index"], indent=2))
+
+
+def show(args):
+    deployment = load_deployment(args.version, warm_up=False)
+    print(json.dumps(ExplanationIndex().status(deployment), indent=2))
+
+
+def query(args):
+    deployment = load_deployment(args.version, warm_up=False)
+    index = ExplanationIndex().get(deployment)
+    start = time.perf_counter()
+    result = query_index(index, args.layer, segment_by=args.segment_by, top_k=args.top_k, distribution=args.distribution)
+    seconds = time.perf_counter() - start
+    print(result.model_dump_json(indent=2))
+    print(f"{seconds * 1000:.2f} ms", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinSight-AA explanation index : SHAP values of every background row")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("build", help="explain every background row of a model version and write its index")
+    p.add_argument("--version", help="model version (default : bundles/CURRENT)")
+    p.add_argument("--workers", type=int, default=EXPLAIN_INDEX_WORKERS, help="processes (1 : this process)")
+    p.add_argument("--chunk-size", type=int, default=EXPLAIN_INDEX_CHUNK_SIZE, help="rows per engine call")
+    p.add_argument("--force", action="store_true", help="rebuild an existing index")
+    p.set_defaults(run=build)
+
+    p = commands.add_parser("show", help="index of a model version + build status")
+    p.add_argument("--version")
+    p.set_defaults(run=show)
+
+    p = commands.add_parser("query", help="global importance of one layer (same answer as GET /api/explain/global/{layer})")
+    p.add_argument("layer", choices=["PD", "Anomaly", "RiskLabel", "HybridScore", "RL_Recommendation"])
+    p.add_argument("--version")
+    p.add_argument("--segment-by", choices=["risk_label", "recommendation", "anomaly_flag"])
+    p.add_argument("--top-k", type=int, default=3)
+    p.add_argument("--distribution", action="store_true")
+    p.set_defaults(run=query)
+
+    args = parser.parse_args()
+    try:
+        args.run(args)
+    except (BundleError, IndexBuildInProgress, IndexNotReady) as e:
+        sys.exit(f"Error : {e}")
+
+
+if __name__ == "__main__":
+    main()
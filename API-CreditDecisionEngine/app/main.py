@@ -1,5 +1,16 @@
 from fastapi import FastAPI
 from app.api.api_router import api_router
+from app.api.routes.health import health_router
+from app.api.routes.metrics import metrics_router
+from app.api.middleware import MetricsMiddleware
+from app.core.metrics import metrics
+from app.services.plot_renderer import plot_renderer
+from app.services.startup_service import start_warm_up
+from app.services.model_manager import install_reload_signal
+from app.rpc.server import rpc_server
+from app.services.explanation_index import explanation_index
+from app.services.bulk_scoring import bulk_pool
+from app.core.config import MODEL_RELOAD_SIGNAL
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -18,4 +29,34 @@ Production-grade Credit Decision API with ML-powered risk assessment.
 )
 
 # Include API router 
-app.include_router(api_router, prefix="/api")
\ No newline at end of file
+app.include_router(api_router, prefix="/api")
+
+# Liveness + readiness at the root : GET /health, GET /ready
+app.include_router(health_router)
+
+# Prometheus metrics at the root : GET /metrics
+# Request timings + Server-Timing header (skipped entirely when METRICS_ENABLED = False)
+app.include_router(metrics_router)
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Warm-up every layer on startup (readiness flips when done)
+app.add_event_handler("startup", start_warm_up)
+
+# SIGHUP -> hot reload of the model bundle named in bundles/CURRENT
+if MODEL_RELOAD_SIGNAL:
+    app.add_event_handler("startup", install_reload_signal)
+
+# Start the plot render workers on startup, stop them on shutdown
+app.add_event_handler("startup", plot_renderer.start)
+app.add_event_handler("shutdown", plot_renderer.shutdown)
+
+# Bulk scoring processes of this API process (started on the first upload)
+app.add_event_handler("shutdown", bulk_pool.shutdown)
+
+# gRPC transport of the decision service on the same event loop (RPC_ENABLED, app/rpc/server.py)
+app.add_event_handler("startup", rpc_server.start)
+app.add_event_handler("shutdown", rpc_server.stop)
+
+# Explanation index of the serving version : loaded / built in the background (EXPLAIN_INDEX_AUTO_BUILD)
+app.add_event_handler("startup", explanation_index.start)
@@ -0,0 +1 @@
+# gRPC package
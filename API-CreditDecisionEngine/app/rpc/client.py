@@ -0,0 +1,67 @@
+from app.core.config import RPC_HOST, RPC_PORT, RPC_UNIX_SOCKET
+from app.rpc.messages import require_grpc, applicant_message, EXPLAIN, PIPELINE
+
+# gRPC Client of the decision service (app/rpc/credit.proto)
+# Keeps one channel (one HTTP/2 connection, multiplexed) for every call.
+#
+#   with CreditRpcClient() as client:                              # RPC_UNIX_SOCKET, else RPC_HOST:RPC_PORT
+#       decision = client.decide(applicant)                        # CreditDecisionResponse message
+#       decision.PD.Probability_of_Default
+#       client.decide_batch([a1, a2], pipeline="tiered")           # list of messages, same order
+#       for decision in client.decide_stream(applicants): ...      # one stream, answers in order
+#       to_dict(decision)                                          # same keys as the JSON response (app/rpc/messages.py)
+#
+# Targets : "unix:/tmp/finsight-credit.sock", "127.0.0.1:50051"
+# Errors come back as grpc.RpcError (INVALID_ARGUMENT : input out of bounds, RESOURCE_EXHAUSTED : queue full)
+
+EXPLAIN_CODES = {mode: code for code, mode in EXPLAIN.items()}
+PIPELINE_CODES = {pipeline: code for code, pipeline in PIPELINE.items()}
+
+
+def default_target():
+    if RPC_UNIX_SOCKET:
+        return f"unix:{RPC_UNIX_SOCKET}"
+    return f"{RPC_HOST}:{RPC_PORT}"
+
+
+class CreditRpcClient:
+
+    # target  : gRPC target (None -> default_target())
+    # timeout : seconds per call (None -> no deadline)
+    def __init__(self, target=None, timeout=30.0):
+        grpc, self.pb, pb_grpc = require_grpc()
+        self.target = target or default_target()
+        self.timeout = timeout
+        self.channel = grpc.insecure_channel(self.target)
+        self.stub = pb_grpc.CreditDecisionServiceStub(self.channel)
+
+
+    def decide(self, applicant: dict, explain: str = "full"):
+        request = self.pb.DecisionRequest(applicant=applicant_message(self.pb, applicant), explain=EXPLAIN_CODES[explain])
+        return self.stub.Decide(request, timeout=self.timeout)
+
+
+    # pipeline : "full" / "tiered" (None -> DECISION_PIPELINE of the server)
+    def decide_batch(self, applicants: list, pipeline: str = None) -> list:
+        request = self.pb.DecisionBatchRequest(
+            applicants=[applicant_message(self.pb, a) for a in applicants],
+            pipeline=PIPELINE_CODES[pipeline],
+        )
+        return list(self.stub.DecideBatch(request, timeout=self.timeout).decisions)
+
+
+    # applicants : any iterable of input dictionaries (read lazily), yields one decision per applicant
+    def decide_stream(self, applicants, explain: str = "full"):
+        code = EXPLAIN_CODES[explain]
+        requests = (self.pb.DecisionRequest(applicant=applicant_message(self.pb, a), explain=code) for a in applicants)
+        return self.stub.DecideStream(requests)
+
+
+    def close(self):
+        self.channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: app/rpc/credit.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'app/rpc/credit.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14\x61pp/rpc/credit.proto\x12\x12\x66insight.credit.v1\"\xad\x01\n\rCreditRequest\x12\x18\n\x10\x61vgMonthlyIncome\x18\x01 \x01(\x01\x12\x10\n\x08incomeCV\x18\x02 \x01(\x01\x12\x14\n\x0c\x65xpenseRatio\x18\x03 \x01(\x01\x12\x10\n\x08\x65miRatio\x18\x04 \x01(\x01\x12\x19\n\x11\x61vgMonthlyBalance\x18\x05 \x01(\x01\x12\x13\n\x0b\x62ounceCount\x18\x06 \x01(\x05\x12\x18\n\x10\x61\x63\x63ountAgeMonths\x18\x07 \x01(\x05\"u\n\x0f\x44\x65\x63isionRequest\x12\x34\n\tapplicant\x18\x01 \x01(\x0b\x32!.finsight.credit.v1.CreditRequest\x12,\n\x07\x65xplain\x18\x02 \x01(\x0e\x32\x1b.finsight.credit.v1.Explain\"}\n\x14\x44\x65\x63isionBatchRequest\x12\x35\n\napplicants\x18\x01 \x03(\x0b\x32!.finsight.credit.v1.CreditRequest\x12.\n\x08pipeline\x18\x02 \x01(\x0e\x32\x1c.finsight.credit.v1.Pipeline\"%\n\x06\x46\x61\x63tor\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01\"]\n\nPDResponse\x12\x1e\n\x16Probability_of_Default\x18\x01 \x01(\x01\x12/\n\x0btop_factors\x18\x02 \x03(\x0b\x32\x1a.finsight.credit.v1.Factor\"o\n\x0f\x41nomalyResponse\x12\x15\n\rAnomaly_Score\x18\x01 \x01(\x01\x12\x14\n\x0c\x41nomaly_Flag\x18\x02 \x01(\x05\x12/\n\x0btop_factors\x18\x03 \x03(\x0b\x32\x1a.finsight.credit.v1.Factor\"T\n\x11RiskLabelResponse\x12\x12\n\nRisk_Label\x18\x01 \x01(\t\x12+\n\x07\x44rivers\x18\x02 \x03(\x0b\x32\x1a.finsight.credit.v1.Factor\"X\n\x13HybridScoreResponse\x12\x14\n\x0cHybrid_Score\x18\x01 \x01(\x01\x12+\n\x07\x66\x61\x63tors\x18\x02 \x03(\x0b\x32\x1a.finsight.credit.v1.Factor\"b\n\x18RLRecommendationResponse\x12\x16\n\x0eRecommendation\x18\x01 \x01(\t\x12.\n\nRationales\x18\x02 \x03(\x0b\x32\x1a.finsight.credit.v1.Factor\"\xa2\x01\n\x11RuleScoreResponse\x12\x12\n\nRule_Score\x18\x01 \x01(\x05\x12G\n\tbreakdown\x18\x02 \x03(\x0b\x32\x34.finsight.credit.v1.RuleScoreResponse.BreakdownEntry\x1a\x30\n\x0e\x42reakdownEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"z\n\x0cTierResponse\x12\x0c\n\x04Tier\x18\x01 \x01(\t\x12\x14\n\x07Outcome\x18\x02 \x01(\tH\x00\x88\x01\x01\x12\x13\n\x06Policy\x18\x03 \x01(\tH\x01\x88\x01\x01\x12\x1a\n\x12Skipped_Explainers\x18\x04 \x03(\tB\n\n\x08_OutcomeB\t\n\x07_Policy\"\xfd\x03\n\x16\x43reditDecisionResponse\x12*\n\x02PD\x18\x01 \x01(\x0b\x32\x1e.finsight.credit.v1.PDResponse\x12\x34\n\x07\x41nomaly\x18\x02 \x01(\x0b\x32#.finsight.credit.v1.AnomalyResponse\x12\x38\n\tRiskLabel\x18\x03 \x01(\x0b\x32%.finsight.credit.v1.RiskLabelResponse\x12<\n\x0bHybridScore\x18\x04 \x01(\x0b\x32\'.finsight.credit.v1.HybridScoreResponse\x12G\n\x11RL_Recommendation\x18\x05 \x01(\x0b\x32,.finsight.credit.v1.RLRecommendationResponse\x12\x38\n\tRuleScore\x18\x06 \x01(\x0b\x32%.finsight.credit.v1.RuleScoreResponse\x12.\n\x04Tier\x18\x07 \x01(\x0b\x32 .finsight.credit.v1.TierResponse\x12\x18\n\x0b\x64\x65\x63ision_id\x18\x08 \x01(\tH\x00\x88\x01\x01\x12\x1a\n\rmodel_version\x18\t \x01(\tH\x01\x88\x01\x01\x42\x0e\n\x0c_decision_idB\x10\n\x0e_model_version\"V\n\x15\x44\x65\x63isionBatchResponse\x12=\n\tdecisions\x18\x01 \x03(\x0b\x32*.finsight.credit.v1.CreditDecisionResponse*C\n\x07\x45xplain\x12\x10\n\x0c\x45XPLAIN_FULL\x10\x00\x12\x14\n\x10\x45XPLAIN_DEFERRED\x10\x01\x12\x10\n\x0c\x45XPLAIN_NONE\x10\x02*H\n\x08Pipeline\x12\x14\n\x10PIPELINE_DEFAULT\x10\x00\x12\x11\n\rPIPELINE_FULL\x10\x01\x12\x13\n\x0fPIPELINE_TIERED\x10\x02\x32\xbb\x02\n\x15\x43reditDecisionService\x12Y\n\x06\x44\x65\x63ide\x12#.finsight.credit.v1.DecisionRequest\x1a*.finsight.credit.v1.CreditDecisionResponse\x12\x62\n\x0b\x44\x65\x63ideBatch\x12(.finsight.credit.v1.DecisionBatchRequest\x1a).finsight.credit.v1.DecisionBatchResponse\x12\x63\n\x0c\x44\x65\x63ideStream\x12#.finsight.credit.v1.DecisionRequest\x1a*.finsight.credit.v1.CreditDecisionResponse(\x01\x30\x01\x42\x1b\n\x17\x63om.finsight.credit.rpcP\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'app.rpc.credit_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  _globals['DESCRIPTOR']._loaded_options = None
+  _globals['DESCRIPTOR']._serialized_options = b'\n\027com.finsight.credit.rpcP\001'
+  _globals['_RULESCORERESPONSE_BREAKDOWNENTRY']._loaded_options = None
+  _globals['_RULESCORERESPONSE_BREAKDOWNENTRY']._serialized_options = b'8\001'
+  _globals['_EXPLAIN']._serialized_start=1878
+  _globals['_EXPLAIN']._serialized_end=1945
+  _globals['_PIPELINE']._serialized_start=1947
+  _globals['_PIPELINE']._serialized_end=2019
+  _globals['_CREDITREQUEST']._serialized_start=45
+  _globals['_CREDITREQUEST']._serialized_end=218
+  _globals['_DECISIONREQUEST']._serialized_start=220
+  _globals['_DECISIONREQUEST']._serialized_end=337
+  _globals['_DECISIONBATCHREQUEST']._serialized_start=339
+  _globals['_DECISIONBATCHREQUEST']._serialized_end=464
+  _globals['_FACTOR']._serialized_start=466
+  _globals['_FACTOR']._serialized_end=503
+  _globals['_PDRESPONSE']._serialized_start=505
+  _globals['_PDRESPONSE']._serialized_end=598
+  _globals['_ANOMALYRESPONSE']._serialized_start=600
+  _globals['_ANOMALYRESPONSE']._serialized_end=711
+  _globals['_RISKLABELRESPONSE']._serialized_start=713
+  _globals['_RISKLABELRESPONSE']._serialized_end=797
+  _globals['_HYBRIDSCORERESPONSE']._serialized_start=799
+  _globals['_HYBRIDSCORERESPONSE']._serialized_end=887
+  _globals['_RLRECOMMENDATIONRESPONSE']._serialized_start=889
+  _globals['_RLRECOMMENDATIONRESPONSE']._serialized_end=987
+  _globals['_RULESCORERESPONSE']._serialized_start=990
+  _globals['_RULESCORERESPONSE']._serialized_end=1152
+  _globals['_RULESCORERESPONSE_BREAKDOWNENTRY']._serialized_start=1104
+  _globals['_RULESCORERESPONSE_BREAKDOWNENTRY']._serialized_end=1152
+  _globals['_TIERRESPONSE']._serialized_start=1154
+  _globals['_TIERRESPONSE']._serialized_end=1276
+  _globals['_CREDITDECISIONRESPONSE']._serialized_start=1279
+  _globals['_CREDITDECISIONRESPONSE']._serialized_end=1788
+  _globals['_DECISIONBATCHRESPONSE']._serialized_start=1790
+  _globals['_DECISIONBATCHRESPONSE']._serialized_end=1876
+  _globals['_CREDITDECISIONSERVICE']._serialized_start=2022
+  _globals['_CREDITDECISIONSERVICE']._serialized_end=2337
+# @@protoc_insertion_point(module_scope)
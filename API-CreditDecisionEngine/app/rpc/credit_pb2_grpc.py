@@ -0,0 +1,186 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from app.rpc import credit_pb2 as app_dot_rpc_dot_credit__pb2
+
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in app/rpc/credit_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class CreditDecisionServiceStub:
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Decide = channel.unary_unary(
+                '/finsight.credit.v1.CreditDecisionService/Decide',
+                request_serializer=app_dot_rpc_dot_credit__pb2.DecisionRequest.SerializeToString,
+                response_deserializer=app_dot_rpc_dot_credit__pb2.CreditDecisionResponse.FromString,
+                _registered_method=True)
+        self.DecideBatch = channel.unary_unary(
+                '/finsight.credit.v1.CreditDecisionService/DecideBatch',
+                request_serializer=app_dot_rpc_dot_credit__pb2.DecisionBatchRequest.SerializeToString,
+                response_deserializer=app_dot_rpc_dot_credit__pb2.DecisionBatchResponse.FromString,
+                _registered_method=True)
+        self.DecideStream = channel.stream_stream(
+                '/finsight.credit.v1.CreditDecisionService/DecideStream',
+                request_serializer=app_dot_rpc_dot_credit__pb2.DecisionRequest.SerializeToString,
+                response_deserializer=app_dot_rpc_dot_credit__pb2.CreditDecisionResponse.FromString,
+                _registered_method=True)
+
+
+class CreditDecisionServiceServicer:
+    """Missing associated documentation comment in .proto file."""
+
+    def Decide(self, request, context):
+        """POST /credit/decision (micro-batched with the HTTP requests)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DecideBatch(self, request, context):
+        """POST /credit/decision/batch (one engine call)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DecideStream(self, request_iterator, context):
+        """One decision per request message, answered in request order over one long-lived stream
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_CreditDecisionServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Decide': grpc.unary_unary_rpc_method_handler(
+                    servicer.Decide,
+                    request_deserializer=app_dot_rpc_dot_credit__pb2.DecisionRequest.FromString,
+                    response_serializer=app_dot_rpc_dot_credit__pb2.CreditDecisionResponse.SerializeToString,
+            ),
+            'DecideBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.DecideBatch,
+                    request_deserializer=app_dot_rpc_dot_credit__pb2.DecisionBatchRequest.FromString,
+                    response_serializer=app_dot_rpc_dot_credit__pb2.DecisionBatchResponse.SerializeToString,
+            ),
+            'DecideStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.DecideStream,
+                    request_deserializer=app_dot_rpc_dot_credit__pb2.DecisionRequest.FromString,
+                    response_serializer=app_dot_rpc_dot_credit__pb2.CreditDecisionResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'finsight.credit.v1.CreditDecisionService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('finsight.credit.v1.CreditDecisionService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class CreditDecisionService:
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Decide(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/finsight.credit.v1.CreditDecisionService/Decide',
+            app_dot_rpc_dot_credit__pb2.DecisionRequest.SerializeToString,
+            app_dot_rpc_dot_credit__pb2.CreditDecisionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DecideBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/finsight.credit.v1.CreditDecisionService/DecideBatch',
+            app_dot_rpc_dot_credit__pb2.DecisionBatchRequest.SerializeToString,
+            app_dot_rpc_dot_credit__pb2.DecisionBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DecideStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/finsight.credit.v1.CreditDecisionService/DecideStream',
+            app_dot_rpc_dot_credit__pb2.DecisionRequest.SerializeToString,
+            app_dot_rpc_dot_credit__pb2.CreditDecisionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
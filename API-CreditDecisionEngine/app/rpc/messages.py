@@ -0,0 +1,100 @@
+from app.schemas.credit import CreditRequest
+
+# Protobuf messages of the gRPC transport (app/rpc/credit.proto) <-> dictionaries / pydantic responses
+# Shared by the server (app/rpc/server.py) and the client (app/rpc/client.py)
+# Needs grpcio + protobuf (optional dependencies, imported on first use by require_grpc)
+
+# Enum values of credit.proto -> explain / pipeline of the HTTP routes
+EXPLAIN = {0: "full", 1: "deferred", 2: "none"}
+PIPELINE = {0: None, 1: "full", 2: "tiered"}
+
+FEATURES = list(CreditRequest.model_fields)
+
+
+def require_grpc():
+    try:
+        import grpc
+        from app.rpc import credit_pb2, credit_pb2_grpc
+    except ImportError:
+        raise ImportError("The gRPC transport needs grpcio and protobuf : pip install -r requirements-grpc.txt")
+    return grpc, credit_pb2, credit_pb2_grpc
+
+
+# CreditRequest message -> validated input dictionary (same bounds as the HTTP routes)
+def from_message(applicant) -> dict:
+    return CreditRequest.model_validate({name: getattr(applicant, name) for name in FEATURES}).model_dump()
+
+
+def _factors(pb, factors):
+    return [pb.Factor(name=name, value=value) for name, value in factors] if factors else None
+
+
+# CreditDecisionResponse (pydantic, built by the engine) -> CreditDecisionResponse message
+# None sections / fields are left unset
+def to_message(pb, r):
+    msg = pb.CreditDecisionResponse(
+        PD=pb.PDResponse(Probability_of_Default=r.PD.Probability_of_Default, top_factors=_factors(pb, r.PD.top_factors)),
+        Anomaly=pb.AnomalyResponse(
+            Anomaly_Score=r.Anomaly.Anomaly_Score,
+            Anomaly_Flag=r.Anomaly.Anomaly_Flag,
+            top_factors=_factors(pb, r.Anomaly.top_factors),
+        ),
+        decision_id=r.decision_id,
+        model_version=r.model_version,
+    )
+    if r.RiskLabel is not None:
+        msg.RiskLabel.CopyFrom(pb.RiskLabelResponse(Risk_Label=r.RiskLabel.Risk_Label, Drivers=_factors(pb, r.RiskLabel.Drivers)))
+    if r.HybridScore is not None:
+        msg.HybridScore.CopyFrom(pb.HybridScoreResponse(Hybrid_Score=r.HybridScore.Hybrid_Score, factors=_factors(pb, r.HybridScore.factors)))
+    if r.RL_Recommendation is not None:
+        msg.RL_Recommendation.CopyFrom(pb.RLRecommendationResponse(
+            Recommendation=r.RL_Recommendation.Recommendation,
+            Rationales=_factors(pb, r.RL_Recommendation.Rationales),
+        ))
+    if r.RuleScore is not None:
+        msg.RuleScore.CopyFrom(pb.RuleScoreResponse(Rule_Score=r.RuleScore.Rule_Score, breakdown=r.RuleScore.breakdown))
+    if r.Tier is not None:
+        msg.Tier.CopyFrom(pb.TierResponse(
+            Tier=r.Tier.Tier, Outcome=r.Tier.Outcome, Policy=r.Tier.Policy, Skipped_Explainers=r.Tier.Skipped_Explainers,
+        ))
+    return msg
+
+
+# Input dictionary (CreditRequest fields) -> CreditRequest message
+def applicant_message(pb, applicant: dict):
+    return pb.CreditRequest(**{name: applicant[name] for name in FEATURES})
+
+
+# CreditDecisionResponse message -> dictionary (unset sections / fields -> None, factors -> [name, value])
+def to_dict(decision) -> dict:
+    def factors(items):
+        return [[f.name, f.value] for f in items] or None
+
+    def section(name, fields):
+        if not decision.HasField(name):
+            return None
+        msg = getattr(decision, name)
+        return {field: (factors(getattr(msg, field)) if kind == "factors" else getattr(msg, field)) for field, kind in fields}
+
+    result = {
+        "PD": section("PD", [("Probability_of_Default", None), ("top_factors", "factors")]),
+        "Anomaly": section("Anomaly", [("Anomaly_Score", None), ("Anomaly_Flag", None), ("top_factors", "factors")]),
+        "RiskLabel": section("RiskLabel", [("Risk_Label", None), ("Drivers", "factors")]),
+        "HybridScore": section("HybridScore", [("Hybrid_Score", None), ("factors", "factors")]),
+        "RL_Recommendation": section("RL_Recommendation", [("Recommendation", None), ("Rationales", "factors")]),
+        "RuleScore": None,
+        "Tier": None,
+        "decision_id": decision.decision_id if decision.HasField("decision_id") else None,
+        "model_version": decision.model_version if decision.HasField("model_version") else None,
+    }
+    if decision.HasField("RuleScore"):
+        result["RuleScore"] = {"Rule_Score": decision.RuleScore.Rule_Score, "breakdown": dict(decision.RuleScore.breakdown)}
+    if decision.HasField("Tier"):
+        tier = decision.Tier
+        result["Tier"] = {
+            "Tier": tier.Tier,
+            "Outcome": tier.Outcome if tier.HasField("Outcome") else None,
+            "Policy": tier.Policy if tier.HasField("Policy") else None,
+            "Skipped_Explainers": list(tier.Skipped_Explainers),
+        }
+    return result
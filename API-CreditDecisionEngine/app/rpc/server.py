@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import (
+    RPC_ENABLED,
+    RPC_HOST,
+    RPC_PORT,
+    RPC_UNIX_SOCKET,
+    RPC_STREAM_WINDOW,
+    SERVER_TIMING_ENABLED,
+    MAX_BATCH_ROWS,
+)
+from app.core.metrics import metrics, collect_timings, server_timing_header
+from app.rpc.messages import require_grpc, from_message, to_message, EXPLAIN, PIPELINE
+from app.services.decision_service import generate_decision_async, generate_decision_batch
+from app.services.micro_batcher import BatcherOverloaded
+
+# gRPC Transport : a second way in to the same decision service (app/rpc/credit.proto)
+#   Decide       -> POST /credit/decision       (micro-batched together with the HTTP requests)
+#   DecideBatch  -> POST /credit/decision/batch (one engine call)
+#   DecideStream -> one decision per message over one long-lived stream, answered in request order
+#
+# The gRPC server runs on the event loop of the FastAPI app (started by its startup event), so
+# both transports share the engine, the decision cache, the micro-batcher and the metrics.
+# Protobuf instead of JSON, HTTP/2 frames instead of HTTP/1.1 headers, and over a Unix-domain
+# socket no TCP stack at all : the Java backend and this engine run on the same host.
+#
+# Listens on RPC_HOST:RPC_PORT and / or RPC_UNIX_SOCKET.
+# With app/serve.py every forked worker serves the TCP port (SO_REUSEPORT, the kernel spreads
+# connections over the workers). The Unix socket is for single-process servers (uvicorn app.main:app) :
+# one path can only be bound by one process, and gRPC removes the file when that process stops.
+#
+# Metrics : credit_request_seconds / credit_requests_total with endpoint "rpc_decide", "rpc_decide_batch",
+# "rpc_decide_stream" and the gRPC status code as status. Stage timings of a unary call come back in
+# the "server-timing" trailing metadata (same format as the Server-Timing header).
+#
+# Needs grpcio + protobuf (optional dependencies, imported on first use)
+#
+# Usage (from API-CreditDecisionEngine/) : one process, HTTP + gRPC (TCP and Unix socket)
+#   python -m app.rpc.server --port 8000 --rpc-port 50051 --unix-socket /tmp/finsight-credit.sock
+
+# Status codes that are the caller's fault (not counted in credit_request_errors_total)
+CLIENT_CODES = ("OK", "INVALID_ARGUMENT", "CANCELLED")
+
+
+# Request rejected by a check of the servicer itself (answered as INVALID_ARGUMENT by _call)
+class InvalidArgument(ValueError):
+    pass
+
+
+class CreditDecisionServicer:
+
+    def __init__(self, grpc, pb):
+        self.grpc = grpc
+        self.pb = pb
+
+
+    # Metrics + error mapping of one call
+    #   pydantic ValidationError / InvalidArgument -> INVALID_ARGUMENT, BatcherOverloaded -> RESOURCE_EXHAUSTED
+    # (context.abort is only called here : the status it raises would be counted as UNKNOWN)
+    # timed = True : stage timings in the "server-timing" trailing metadata
+    @asynccontextmanager
+    async def _call(self, endpoint, context, timed=True):
+        start = time.perf_counter()
+        status = ["UNKNOWN"]
+        try:
+            with collect_timings() as timings:
+                try:
+                    yield
+                except (ValidationError, InvalidArgument) as e:
+                    status[0] = "INVALID_ARGUMENT"
+                    await context.abort(self.grpc.StatusCode.INVALID_ARGUMENT, str(e))
+                except BatcherOverloaded as e:
+                    status[0] = "RESOURCE_EXHAUSTED"
+                    await context.abort(self.grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+                except (asyncio.CancelledError, GeneratorExit):
+                    status[0] = "CANCELLED"
+                    raise
+                status[0] = "OK"
+                if timed and SERVER_TIMING_ENABLED and metrics.enabled:
+                    context.set_trailing_metadata(
+                        (("server-timing", server_timing_header(timings, time.perf_counter() - start)),)
+                    )
+        finally:
+            metrics.observe("credit_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+            metrics.inc("credit_requests_total", endpoint=endpoint, status=status[0])
+            if status[0] not in CLIENT_CODES:
+                metrics.inc("credit_request_errors_total", endpoint=endpoint)
+
+
+    async def Decide(self, request, context):
+        async with self._call("rpc_decide", context):
+            result = await generate_decision_async(from_message(request.applicant), EXPLAIN.get(request.explain, "full"))
+            return to_message(self.pb, result)
+
+
+    # At most MAX_BATCH_ROWS applicants (INVALID_ARGUMENT above, same limit as POST /credit/decision/batch)
+    async def DecideBatch(self, request, context):
+        async with self._call("rpc_decide_batch", context):
+            if len(request.applicants) > MAX_BATCH_ROWS:
+                raise InvalidArgument(f"{len(request.applicants)} applicants, at most {MAX_BATCH_ROWS} per batch")
+            inputs = [from_message(applicant) for applicant in request.applicants]
+            results = await run_in_threadpool(generate_decision_batch, inputs, PIPELINE.get(request.pipeline))
+            return self.pb.DecisionBatchResponse(decisions=[to_message(self.pb, r) for r in results])
+
+
+    # Requests are read ahead of the answers : up to RPC_STREAM_WINDOW decisions in flight per stream
+    # (they join the micro-batches), answers are written in request order
+    # An invalid message ends the stream with INVALID_ARGUMENT
+    async def DecideStream(self, request_iterator, context):
+        pending = asyncio.Queue(maxsize=RPC_STREAM_WINDOW)
+
+        async def decide(request):
+            return await generate_decision_async(from_message(request.applicant), EXPLAIN.get(request.explain, "full"))
+
+        async def read():
+            try:
+                async for request in request_iterator:
+                    await pending.put(asyncio.ensure_future(decide(request)))
+            finally:
+                await pending.put(None)
+
+        reader = asyncio.ensure_future(read())
+        try:
+            async with self._call("rpc_decide_stream", context, timed=False):
+                while True:
+                    future = await pending.get()
+                    if future is None:
+                        break
+                    yield to_message(self.pb, await future)
+                await reader
+        finally:
+            reader.cancel()
+            while not pending.empty():
+                future = pending.get_nowait()
+                if future is not None:
+                    future.cancel()
+
+
+class RpcServer:
+
+    def __init__(self, enabled=RPC_ENABLED, host=RPC_HOST, port=RPC_PORT, unix_socket=RPC_UNIX_SOCKET):
+        self.enabled = enabled
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.addresses = []
+        self._server = None
+
+
+    # Called by the FastAPI startup event (runs on the event loop of the app)
+    async def start(self):
+        if not self.enabled or self._server is not None:
+            return
+        grpc, pb, pb_grpc = require_grpc()
+        server = grpc.aio.server()
+        pb_grpc.add_CreditDecisionServiceServicer_to_server(CreditDecisionServicer(grpc, pb), server)
+        addresses = []
+        if self.port is not None:
+            addresses.append(f"{self.host}:{self.port}")
+        if self.unix_socket:
+            addresses.append(f"unix:{self.unix_socket}")
+        for address in addresses:
+            server.add_insecure_port(address)
+        await server.start()
+        self._server, self.addresses = server, addresses
+        print(f"gRPC decision service listening on {', '.join(addresses)}")
+
+
+    # Called by the FastAPI shutdown event : calls in flight get `grace` seconds to finish
+    async def stop(self, grace=5.0):
+        if self._server is not None:
+            await self._server.stop(grace)
+            self._server = None
+
+
+# Global gRPC server instance
+rpc_server = RpcServer()
+
+
+# Single-process server : the FastAPI app with the gRPC transport enabled
+def main():
+    parser = argparse.ArgumentParser(description="FinSight-AA API : HTTP + gRPC in one process")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--rpc-host", default=RPC_HOST)
+    parser.add_argument("--rpc-port", type=int, default=RPC_PORT)
+    parser.add_argument("--unix-socket", default=RPC_UNIX_SOCKET, help="Unix-domain socket path ('' : none)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    import uvicorn
+    from app.main import app
+    # The instance app.main starts (this file runs as __main__, a second copy of the module)
+    from app.rpc.server import rpc_server as server
+    server.enabled = True
+    server.host, server.port, server.unix_socket = args.rpc_host, args.rpc_port, args.unix_socket or None
+    uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
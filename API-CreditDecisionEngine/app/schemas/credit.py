@@ -1,8 +1,10 @@
 # A Pydantic model : A class that inherits from pydantic.BaseModel 
 # - uses Python type annotations to define data structures
 # - automatically validate data.
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, ValidationError, model_validator
+from typing import Optional, List, Dict, Tuple, Annotated, Literal, Union
+
+from app.core.config import WHATIF_MAX_CELLS
 
 
 # 1 . CreditRequest : Input Schema
@@ -38,36 +40,230 @@ class CreditRequest(BaseModel):
     # RiskLabel
     # HybridScore
     # RL_Recommendation
+    # Tier (tiered pipeline only)
+
+# Factor lists : (business name, SHAP value) pairs, built once by the engine
+# JSON     -> "Monthly Income Level (+0.002)" strings (same text as before)
+# Python / MessagePack -> [name, value] pairs (app/api/encoding.py)
+def format_factors(factors):
+    if factors is None:
+        return None
+    return [f"{name} ({value:+.3f})" for name, value in factors]
+
+
+Factors = Annotated[
+    List[Tuple[str, float]],
+    PlainSerializer(format_factors, return_type=List[str], when_used="json-unless-none"),
+]
+
+# Every response below is built by the engine with model_construct (trusted output, no validation)
 
 class PDResponse(BaseModel):
     Probability_of_Default: float
-    top_factors: Optional[List[str]] = None # This Means Optional<List<String>>
+    top_factors: Optional[Factors] = None # This Means Optional<List<(String, Float)>>
 
 
 class AnomalyResponse(BaseModel):
     Anomaly_Score: float
     Anomaly_Flag: int  # 1 = anomaly detected, 0 = normal  (threshold: if_score < -0.05)
-    top_factors: Optional[List[str]] = None
+    top_factors: Optional[Factors] = None
 
 
 class RiskLabelResponse(BaseModel):
     Risk_Label: str
-    Drivers: Optional[List[str]] = None
+    Drivers: Optional[Factors] = None
 
 
 class HybridScoreResponse(BaseModel):
     Hybrid_Score: float
-    factors: Optional[List[str]] = None
+    factors: Optional[Factors] = None
 
 
 class RLRecommendationResponse(BaseModel):
     Recommendation: str
-    Rationales: Optional[List[str]] = None
+    Rationales: Optional[Factors] = None
+
+
+class RuleScoreResponse(BaseModel):
+    Rule_Score: int  # 300 - 900, rule-based (no model)
+    breakdown: Dict[str, int]  # base + points of every sector
+
+
+class TierResponse(BaseModel):
+    Tier: str  # "screen" (stopped after PD + Anomaly) / "full" (every layer)
+    Outcome: Optional[str] = None  # REJECT / REVIEW when a policy stopped the row
+    Policy: Optional[str] = None  # Name of that policy
+    Skipped_Explainers: List[str] = []  # Layers scored but not explained
 
 
 class CreditDecisionResponse(BaseModel):
+    # "model_version" is a field name, not a pydantic "model_" attribute
+    model_config = ConfigDict(protected_namespaces=())
+
     PD: PDResponse
     Anomaly: AnomalyResponse
-    RiskLabel: RiskLabelResponse
-    HybridScore: HybridScoreResponse
-    RL_Recommendation: RLRecommendationResponse
+    # RiskLabel / HybridScore / RL_Recommendation : None when the tiered pipeline stopped at the screen tier
+    RiskLabel: Optional[RiskLabelResponse] = None
+    HybridScore: Optional[HybridScoreResponse] = None
+    RL_Recommendation: Optional[RLRecommendationResponse] = None
+    RuleScore: Optional[RuleScoreResponse] = None  # Only set when RULE_SCORE_ENABLED
+    Tier: Optional[TierResponse] = None  # Only set by the tiered pipeline
+    decision_id: Optional[str] = None  # Only set when explain=deferred
+    model_version: Optional[str] = None  # Model bundle version that made the decision
+
+
+# Sections of a decision that only exist when their feature is on : left out of the payload when None
+# (RULE_SCORE_ENABLED, tiered pipeline, explain=deferred), so default responses keep the baseline shape
+OPTIONAL_SECTIONS = ("RuleScore", "Tier", "decision_id")
+
+
+
+# 3 . DecisionExplanationsResponse : Output Schema of GET /credit/decision/{id}/explanations
+
+#Define Schema For Deferred Explanations :
+    # status : PENDING (still computing) / READY / FAILED / NOT_QUEUED (explanation pool was full)
+    # Factor lists are None until status is READY
+    # model_version : model bundle version that scored the decision (and computes its explanations)
+
+class DecisionExplanationsResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    decision_id: str
+    status: str
+    PD_top_factors: Optional[Factors] = None
+    Anomaly_top_factors: Optional[Factors] = None
+    RiskLabel_Drivers: Optional[Factors] = None
+    HybridScore_factors: Optional[Factors] = None
+    RL_Rationales: Optional[Factors] = None
+    model_version: str
+
+
+
+# 4 . WhatIfRequest / WhatIfResponse : Schemas of POST /credit/whatif
+
+#Define Schema For a What-If Sweep :
+    # Input :
+    # base       -> CreditRequest of the applicant
+    # axes       -> 1 or 2 features to vary, each with a step list (values) or a range (start, stop, steps)
+    # boundaries -> outputs whose decision boundaries are reported (default : Recommendation + Risk_Label)
+    # Output :
+    # surface    -> every output over the grid (list for 1 axis, list of lists for 2 axes, rows = first axis)
+    # crossings  -> neighbouring grid points where a boundary output changes
+
+WhatIfFeature = Literal[
+    "avgMonthlyIncome", "incomeCV", "expenseRatio", "emiRatio",
+    "avgMonthlyBalance", "bounceCount", "accountAgeMonths",
+]
+
+WhatIfBoundary = Literal["Recommendation", "Risk_Label", "Anomaly_Flag"]
+
+
+class WhatIfAxis(BaseModel):
+    feature: WhatIfFeature
+    values: Optional[List[float]] = Field(None, min_length=1)  # Step list (kept in this order)
+    start: Optional[float] = None  # Range : steps evenly spaced values from start to stop (both included)
+    stop: Optional[float] = None
+    steps: Optional[int] = Field(None, ge=2, le=WHATIF_MAX_CELLS)
+
+    @model_validator(mode="after")
+    def _one_kind(self):
+        ranged = (self.start, self.stop, self.steps)
+        if self.values is None and None in ranged:
+            raise ValueError("give either values or start + stop + steps")
+        if self.values is not None and ranged != (None, None, None):
+            raise ValueError("give either values or start + stop + steps, not both")
+        return self
+
+    # Number of grid values (without building the grid)
+    def size(self) -> int:
+        return len(self.values) if self.values is not None else self.steps
+
+    # Grid values of the axis
+    def grid(self) -> List[float]:
+        if self.values is not None:
+            return self.values
+        return [self.start + (self.stop - self.start) * i / (self.steps - 1) for i in range(self.steps)]
+
+
+class WhatIfRequest(BaseModel):
+    base: CreditRequest
+    axes: List[WhatIfAxis] = Field(..., min_length=1, max_length=2)
+    boundaries: List[WhatIfBoundary] = ["Recommendation", "Risk_Label"]
+
+    # Distinct features, grid size <= WHATIF_MAX_CELLS, every grid point within the CreditRequest bounds
+    @model_validator(mode="after")
+    def _check_grid(self):
+        if len({axis.feature for axis in self.axes}) != len(self.axes):
+            raise ValueError("axes must vary different features")
+        cells = 1
+        for axis in self.axes:
+            cells *= axis.size()
+        if cells > WHATIF_MAX_CELLS:
+            raise ValueError(f"grid of {cells} points, at most {WHATIF_MAX_CELLS}")
+        base = self.base.model_dump()
+        for axis in self.axes:
+            for value in axis.grid():
+                try:
+                    CreditRequest.model_validate({**base, axis.feature: value})
+                except ValidationError as e:
+                    raise ValueError(f"{axis.feature} = {value} : {e.errors()[0]['msg']}")
+        return self
+
+
+class WhatIfAxisValues(BaseModel):
+    feature: str
+    values: List[float]
+
+
+class WhatIfCrossing(BaseModel):
+    output: str  # Recommendation / Risk_Label / Anomaly_Flag
+    feature: str  # Axis along which the output changes
+    between: Tuple[float, float]  # Neighbouring grid values of that feature
+    before: str  # Output at the first value
+    after: str  # Output at the second value
+    at: Dict[str, float] = {}  # Value of the other axis (2 axes only)
+
+
+class WhatIfResponse(BaseModel):
+    # "model_version" is a field name, not a pydantic "model_" attribute
+    model_config = ConfigDict(protected_namespaces=())
+
+    axes: List[WhatIfAxisValues]
+    base: Dict[str, Union[int, float, str]]  # Outputs of the base applicant
+    surface: Dict[str, list]  # PD, Anomaly_Score, Anomaly_Flag, Risk_Label, Hybrid_Score, Recommendation (+ Rule_Score)
+    crossings: List[WhatIfCrossing]
+    model_version: Optional[str] = None
+
+
+
+# 5 . GlobalImportanceResponse : Output Schema of GET /explain/global/{layer}
+
+#Define Schema For Portfolio-Level Explanations (app/services/explanation_index.py) :
+    # segments -> every matching background row (segment = None), or one segment per value of segment_by
+    # factors  -> every feature of the layer, highest mean |SHAP| first
+
+class GlobalFactor(BaseModel):
+    feature: str
+    name: str  # Business readable name (same as the top factors of a decision)
+    mean_abs_shap: float  # Global importance
+    mean_shap: float  # Average direction of the effect
+    top_k_share: float  # Share of the rows where the feature is one of their top_k factors
+    quantiles: Optional[Dict[str, float]] = None  # SHAP value p5 / p25 / p50 / p75 / p95 (distribution=true)
+
+
+class GlobalSegment(BaseModel):
+    segment: Optional[str] = None  # Value of segment_by (LOW, REJECT, 1, ...)
+    rows: int
+    factors: List[GlobalFactor]
+
+
+class GlobalImportanceResponse(BaseModel):
+    # "model_version" is a field name, not a pydantic "model_" attribute
+    model_config = ConfigDict(protected_namespaces=())
+
+    layer: str
+    rows_indexed: int  # Background rows in the index
+    rows_matched: int  # Rows left after the filters
+    segment_by: Optional[str] = None
+    segments: List[GlobalSegment]
+    model_version: Optional[str] = None
@@ -0,0 +1,204 @@
+import argparse
+import gc
+import os
+import select
+import signal
+import socket
+import threading
+
+import uvicorn
+
+# Multi-Worker Server (preload before fork) :
+# `uvicorn --workers N` starts N fresh interpreters : each one loads every model,
+# the 30k-row background and builds every SHAP explainer again (memory x N).
+#
+# Here the master process does all of that ONCE, then forks the workers.
+# Forked workers share the master's memory pages (copy-on-write) :
+#   - sklearn models, SHAP explainer tables -> shared until written (they never are)
+#   - snapshot arrays (bg_data, flat trees, Q-table) -> read-only memory maps of one file
+# gc.freeze() keeps the garbage collector from touching (and so copying) the preloaded objects.
+#
+# Hot reload (SIGHUP to the master, or POST /api/models/reload on any worker) :
+# the master loads + warms the model bundle of bundles/CURRENT, forks a new set of workers
+# from it, then stops the old workers gracefully (they finish their requests in flight).
+#
+# gRPC transport (app/rpc/server.py) : every worker serves the same TCP port (SO_REUSEPORT),
+# the Unix-domain socket is not used (one path cannot be shared by several processes).
+#
+# Usage (from API-CreditDecisionEngine/, Linux / macOS) :
+#   python -m app.serve --workers 4 --port 8000
+#   python -m app.serve --workers 4 --port 8000 --rpc-port 50051
+
+# Seconds an old worker keeps serving its accepted connections after a rolling reload
+RETIRE_GRACE_SECONDS = 1.0
+
+
+def _serve(app, sock, log_level, master):
+    # Workers use uvicorn's own signal handling (graceful shutdown on SIGTERM / SIGINT)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.set_wakeup_fd(-1)
+    # A reload asked to a worker is done by the master (one load, shared by every new worker)
+    from app.services.model_manager import model_manager
+    model_manager.reload_hook = lambda: os.kill(master, signal.SIGHUP)
+    config = uvicorn.Config(app, log_level=log_level)
+    server = uvicorn.Server(config)
+
+    # SIGUSR1 (rolling reload) : stop accepting, serve what was already accepted, then exit
+    # (a plain SIGTERM could close connections accepted but not read yet)
+    def retire(signum, frame):
+        for listener in server.servers:
+            listener.close()
+        threading.Timer(RETIRE_GRACE_SECONDS, lambda: setattr(server, "should_exit", True)).start()
+    signal.signal(signal.SIGUSR1, retire)
+
+    server.run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinSight-AA API : preload models, then fork workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--rpc-port", type=int, help="also serve the gRPC transport on this port (default : RPC_ENABLED)")
+    args = parser.parse_args()
+
+    # Step 1 : Load the registry, build every explainer and warm up (master only)
+    from app.main import app
+    from app.services.startup_service import warm_up
+    from app.rpc.server import rpc_server
+    if args.rpc_port is not None:
+        rpc_server.enabled, rpc_server.port = True, args.rpc_port
+    rpc_server.unix_socket = None
+    warm_up()
+
+    # Step 2 : Freeze the preloaded objects before forking
+    gc.collect()
+    gc.freeze()
+
+    # Step 3 : One listening socket shared by every worker
+    # proto = IPPROTO_TCP : asyncio only sets TCP_NODELAY on accepted connections of a TCP socket
+    # (proto 0 leaves Nagle on, and keep-alive responses wait for the delayed ACK)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    print(f"Master {os.getpid()} listening on {args.host}:{args.port} with {args.workers} workers")
+
+    # Step 4 : Fork the workers (a worker that dies is forked again from the warm master)
+    workers = set()
+    retiring = set()   # workers of the previous model version, stopping after a reload
+    stopping = False
+    reload_requested = False
+    master = os.getpid()
+
+    def spawn():
+        if stopping:
+            return
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(wakeup_r)
+                os.close(wakeup_w)
+                _serve(app, sock, args.log_level, master)
+            finally:
+                os._exit(0)
+        workers.add(pid)
+        if stopping:
+            # SIGTERM arrived between the fork and workers.add : stop() did not see this worker
+            os.kill(pid, signal.SIGTERM)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers | retiring):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    # SIGHUP only asks for a reload : it runs in the supervise loop (Step 5), never inside the handler,
+    # so a SIGTERM during the load / warm-up is handled and no worker is forked after it.
+    # A SIGHUP during a reload is not lost : one more reload runs right after
+    def reload(signum, frame):
+        nonlocal reload_requested
+        reload_requested = True
+
+    # Rolling reload : new workers first, then the old ones stop (no moment without a worker)
+    def rolling_reload():
+        from app.services.model_manager import model_manager, FAILED
+        print("Reloading the model bundle")
+        gc.unfreeze()
+        try:
+            status = model_manager.reload(wait=True)
+        finally:
+            # Old model version freed before the new workers are forked
+            gc.collect()
+            gc.freeze()
+        # SIGTERM during the load / warm-up : the old workers are already stopping, fork nothing
+        if stopping:
+            return
+        if status["status"] == FAILED:
+            print(f"Reload failed, workers keep model version {model_manager.active_version()}")
+            return
+        old = set(workers)
+        for _ in range(args.workers):
+            spawn()
+        if stopping:
+            return
+        for pid in old:
+            workers.discard(pid)
+            retiring.add(pid)
+            try:
+                os.kill(pid, signal.SIGUSR1)
+            except ProcessLookupError:
+                pass
+
+    # Every signal wakes the supervise loop up (signal handlers only set flags)
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, reload)
+
+    for _ in range(args.workers):
+        spawn()
+
+    # Step 5 : Supervise (reap exited workers, run the requested reloads)
+    while workers or retiring:
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid == 0:
+                break
+            if pid in retiring:
+                retiring.discard(pid)
+                continue
+            workers.discard(pid)
+            if not stopping:
+                print(f"Worker {pid} exited, forking a new one")
+                spawn()
+        if reload_requested and not stopping:
+            reload_requested = False
+            rolling_reload()
+            continue
+        select.select([wakeup_r], [], [], 1.0)
+        try:
+            while os.read(wakeup_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
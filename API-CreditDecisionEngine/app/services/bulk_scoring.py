@@ -0,0 +1,397 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+from pydantic import ValidationError
+
+from app.core.config import (
+    BULK_CHUNK_SIZE, BULK_WORKERS, BULK_INFLIGHT_PER_WORKER, BULK_API_WORKERS, BULK_API_MAX_JOBS, DECISION_PIPELINE,
+    RULE_SCORE_ENABLED,
+)
+from app.schemas.credit import CreditRequest, format_factors
+from app.services.model_manager import model_manager, load_deployment
+
+# Bulk Scoring :
+# Re-scores a whole portfolio file shaped like "features_only.csv" (7 feature columns, N rows)
+#
+#   input file --> chunks of BULK_CHUNK_SIZE rows --> process pool (one vectorized engine call per chunk)
+#              --> rows written in input order (NDJSON / CSV / Parquet)
+#
+# Memory stays bounded : at most workers x BULK_INFLIGHT_PER_WORKER chunks are in flight,
+# and every chunk is written (then dropped) before the next one is read past that bound.
+# Processes : the CLI starts one pool of BULK_WORKERS per job, the API shares one pool of
+# BULK_API_WORKERS per process (bulk_pool) and scores at most BULK_API_MAX_JOBS uploads at once.
+# Every row is validated with the CreditRequest schema : an invalid row gets status "error"
+# with the validation message, the other rows of its chunk are still scored.
+# The decision cache is NOT used : a full book re-score would only evict the hot API entries.
+# pipeline = "tiered" : rows stopped by a tier policy have no Risk / Hybrid / RL values,
+# and the Tier / Outcome / Policy columns say where and why they stopped.
+#
+# Parquet needs pyarrow (optional dependency, imported on first use).
+
+FEATURES = list(CreditRequest.model_fields)
+FORMATS = ("ndjson", "csv", "parquet")
+INPUT_FORMATS = ("csv", "parquet")
+
+# Output columns of one scored row
+SCORE_COLUMNS = [
+    "row", "status", "error",
+    "Probability_of_Default", "Anomaly_Score", "Anomaly_Flag",
+    "Risk_Label", "Hybrid_Score", "Recommendation", "model_version",
+]
+# RULE_SCORE_ENABLED only (placed after Recommendation)
+RULE_SCORE_COLUMNS = ["Rule_Score"] if RULE_SCORE_ENABLED else []
+# Tiered pipeline only
+TIER_COLUMNS = ["Tier", "Outcome", "Policy"]
+# Same names as GET /credit/decision/{decision_id}/explanations
+EXPLANATION_COLUMNS = [
+    "PD_top_factors", "Anomaly_top_factors", "RiskLabel_Drivers", "HybridScore_factors", "RL_Rationales",
+]
+
+
+def output_columns(explain: bool, pipeline: str = DECISION_PIPELINE) -> list:
+    tier = TIER_COLUMNS if pipeline == "tiered" else []
+    scores = SCORE_COLUMNS[:-1] + RULE_SCORE_COLUMNS + SCORE_COLUMNS[-1:]
+    return scores + tier + (EXPLANATION_COLUMNS if explain else [])
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet input / output needs pyarrow : pip install -r requirements-parquet.txt")
+    return pyarrow
+
+
+# Input format from the file name (.parquet / .pq -> parquet, anything else -> csv)
+def input_format(path) -> str:
+    return "parquet" if str(path).lower().endswith((".parquet", ".pq")) else "csv"
+
+
+# Raises ValueError if a feature column is missing (checked before any row is scored)
+def check_columns(path, fmt="csv"):
+    if fmt == "parquet":
+        columns = require_pyarrow().parquet.ParquetFile(path).schema_arrow.names
+    else:
+        columns = pd.read_csv(path, nrows=0).columns
+    missing = [f for f in FEATURES if f not in columns]
+    if missing:
+        raise ValueError(f"Missing feature columns : {', '.join(missing)}")
+
+
+# Input chunks : DataFrames of the 7 feature columns, chunk_size rows each
+# skip_rows : rows already scored (resume), skipped without being scored
+def read_chunks(path, chunk_size=BULK_CHUNK_SIZE, fmt="csv", skip_rows=0):
+    if fmt == "parquet":
+        pq = require_pyarrow().parquet
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=FEATURES)
+        buffer = []
+        for batch in batches:
+            df = batch.to_pandas()
+            if skip_rows:
+                skipped = min(skip_rows, len(df))
+                df, skip_rows = df.iloc[skipped:], skip_rows - skipped
+            buffer.append(df)
+            # Re-cut the record batches to exactly chunk_size rows (resume counts whole chunks)
+            while sum(len(b) for b in buffer) >= chunk_size:
+                df = pd.concat(buffer, ignore_index=True)
+                yield df.iloc[:chunk_size]
+                buffer = [df.iloc[chunk_size:]]
+        rest = pd.concat(buffer, ignore_index=True) if buffer else None
+        if rest is not None and len(rest):
+            yield rest
+        return
+
+    reader = pd.read_csv(path, usecols=FEATURES, chunksize=chunk_size, skiprows=range(1, skip_rows + 1))
+    for df in reader:
+        yield df
+
+
+# Score one chunk (runs in a worker process)
+# start : input row number of the first row of the chunk
+# engine : None -> the active model version of the process
+# Output : list of flat row Dictionaries (output_columns), same order as the chunk
+def score_chunk(start: int, df: pd.DataFrame, explain: bool = False, engine=None,
+                pipeline: str = DECISION_PIPELINE) -> list:
+    engine = engine or model_manager.current().engine
+    rows = [None] * len(df)
+    valid = []   # (position in chunk, validated input)
+    for i, record in enumerate(df[FEATURES].to_dict("records")):
+        try:
+            valid.append((i, CreditRequest(**record).model_dump()))
+        except ValidationError as e:
+            rows[i] = _error_row(start + i, _validation_message(e), explain, pipeline)
+
+    if valid:
+        try:
+            results = engine.get_decision_batch([x for _, x in valid], explain=explain, pipeline=pipeline)
+        except Exception:
+            # One bad row must not fail the chunk : score the rows one by one
+            results = [_score_one(engine, x, explain, pipeline) for _, x in valid]
+        for (i, _), result in zip(valid, results):
+            if isinstance(result, Exception):
+                rows[i] = _error_row(start + i, f"{type(result).__name__}: {result}", explain, pipeline)
+            else:
+                rows[i] = _result_row(start + i, result, explain, pipeline)
+    return rows
+
+
+def _score_one(engine, x, explain, pipeline):
+    try:
+        return engine.get_decision(x, explain=explain, pipeline=pipeline)
+    except Exception as e:
+        return e
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+
+
+def _error_row(row, message, explain, pipeline):
+    out = dict.fromkeys(output_columns(explain, pipeline))
+    out.update(row=row, status="error", error=message)
+    return out
+
+
+# Sections a tiered row stopped at the screen tier does not have are None
+def _result_row(row, result, explain, pipeline):
+    risk, hybrid, rl = result.RiskLabel, result.HybridScore, result.RL_Recommendation
+    out = {
+        "row": row,
+        "status": "ok",
+        "error": None,
+        "Probability_of_Default": result.PD.Probability_of_Default,
+        "Anomaly_Score": result.Anomaly.Anomaly_Score,
+        "Anomaly_Flag": result.Anomaly.Anomaly_Flag,
+        "Risk_Label": risk.Risk_Label if risk is not None else None,
+        "Hybrid_Score": hybrid.Hybrid_Score if hybrid is not None else None,
+        "Recommendation": rl.Recommendation if rl is not None else None,
+        "model_version": result.model_version,
+    }
+    if RULE_SCORE_COLUMNS:
+        out["Rule_Score"] = result.RuleScore.Rule_Score if result.RuleScore is not None else None
+    if pipeline == "tiered":
+        out["Tier"] = result.Tier.Tier
+        out["Outcome"] = result.Tier.Outcome
+        out["Policy"] = result.Tier.Policy
+    if explain:
+        # Same factor text as the JSON responses
+        out["PD_top_factors"] = format_factors(result.PD.top_factors)
+        out["Anomaly_top_factors"] = format_factors(result.Anomaly.top_factors)
+        out["RiskLabel_Drivers"] = format_factors(risk.Drivers) if risk is not None else None
+        out["HybridScore_factors"] = format_factors(hybrid.factors) if hybrid is not None else None
+        out["RL_Rationales"] = format_factors(rl.Rationales) if rl is not None else None
+    return out
+
+
+# Pool worker start : load the model version of the job once (snapshot memory maps)
+def _init_worker(version):
+    model_manager.activate(load_deployment(version, warm_up=False))
+
+
+# Score one chunk with a given model version (runs in a worker of the shared API pool)
+# A worker keeps the last version it loaded : jobs started after a hot reload load the new one once
+def score_chunk_version(version, start, df, explain=False, pipeline=DECISION_PIPELINE):
+    if model_manager.active_version() != version:
+        _init_worker(version)
+    return score_chunk(start, df, explain, None, pipeline)
+
+
+# Scored chunks in input order : yields (chunk index, rows)
+# workers = 1 -> chunks are scored in this process (no pool, no model reload)
+# workers > 1 -> "spawn" process pool of this job, each worker loads the registry once (snapshot memory maps)
+# executor    -> chunks go to that shared pool (bulk_pool of the API), workers bounds the chunks in flight
+# Every chunk of a job is scored by the model version active when the job started
+def score_chunks(chunks, chunk_size=BULK_CHUNK_SIZE, explain=False, workers=BULK_WORKERS, first_chunk=0,
+                 pipeline=DECISION_PIPELINE, executor=None):
+    chunks = enumerate(chunks, start=first_chunk)
+    deployment = model_manager.current()
+    if workers <= 1 and executor is None:
+        for idx, df in chunks:
+            yield idx, score_chunk(idx * chunk_size, df, explain, deployment.engine, pipeline)
+        return
+
+    pool = executor or ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=_init_worker, initargs=(deployment.model_version,))
+    pending = deque()
+    try:
+        for idx, df in chunks:
+            if executor is None:
+                future = pool.submit(score_chunk, idx * chunk_size, df, explain, None, pipeline)
+            else:
+                future = pool.submit(score_chunk_version, deployment.model_version, idx * chunk_size, df,
+                                     explain, pipeline)
+            pending.append((idx, future))
+            # Bounded : wait for the oldest chunk before reading more input
+            if len(pending) >= workers * BULK_INFLIGHT_PER_WORKER:
+                idx, future = pending.popleft()
+                yield idx, future.result()
+        while pending:
+            idx, future = pending.popleft()
+            yield idx, future.result()
+    finally:
+        # Also runs when the consumer stops early (interrupted job, client gone)
+        if executor is None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            # Shared pool : drop the queued chunks of this job only, the pool keeps serving
+            for _, future in pending:
+                future.cancel()
+
+
+class BulkJobsBusy(RuntimeError):
+    pass
+
+
+# Bulk Pool : the scoring processes of the API (one pool per API process, shared by every upload)
+# Started on the first upload, so API workers that never score a file never load a second registry.
+# At most max_jobs uploads are scored at once : a busy slot means 429, never more processes.
+class BulkPool:
+
+    def __init__(self, workers=BULK_API_WORKERS, max_jobs=BULK_API_MAX_JOBS):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self._pool = None
+        self._jobs = 0
+        self._lock = threading.Lock()
+
+
+    # "spawn" : workers never inherit the server threads or the loaded models
+    def executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+
+    # Job slot : returns its release function (safe to call more than once)
+    # Raises BulkJobsBusy when max_jobs uploads are already being scored
+    def acquire(self):
+        with self._lock:
+            if self._jobs >= self.max_jobs:
+                raise BulkJobsBusy(f"{self._jobs} bulk job(s) already running, retry later")
+            self._jobs += 1
+        released = []
+
+        def release():
+            with self._lock:
+                if not released:
+                    released.append(True)
+                    self._jobs -= 1
+        return release
+
+
+    # A worker died : start a new pool on the next job
+    def reset(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+    def stats(self):
+        return {"workers": self.workers, "max_jobs": self.max_jobs, "jobs": self._jobs,
+                "started": self._pool is not None}
+
+
+    def shutdown(self):
+        self.reset()
+
+
+# Global bulk pool instance (API only, the CLI starts its own pool per job)
+bulk_pool = BulkPool()
+
+
+# Text output of one chunk : NDJSON lines / CSV rows (header only when asked)
+def encode_rows(rows, fmt, explain=False, header=False, pipeline=DECISION_PIPELINE) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(row) + "\n" for row in rows)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=output_columns(explain, pipeline), lineterminator="\n")
+        if header:
+            writer.writeheader()
+        for row in rows:
+            # Factor lists -> one cell "a | b | c"
+            writer.writerow({k: " | ".join(v) if isinstance(v, list) else v for k, v in row.items()})
+        return buffer.getvalue()
+    raise ValueError(f"Unknown text output format : {fmt}")
+
+
+# Parquet schema of the output rows (explicit : all-null columns of a chunk keep their type)
+def parquet_schema(explain=False, pipeline=DECISION_PIPELINE):
+    pa = require_pyarrow()
+    types = {
+        "row": pa.int64(), "status": pa.string(), "error": pa.string(),
+        "Probability_of_Default": pa.float64(), "Anomaly_Score": pa.float64(), "Anomaly_Flag": pa.int64(),
+        "Risk_Label": pa.string(), "Hybrid_Score": pa.float64(), "Recommendation": pa.string(),
+        "Rule_Score": pa.int64(), "model_version": pa.string(),
+        "Tier": pa.string(), "Outcome": pa.string(), "Policy": pa.string(),
+    }
+    types.update({c: pa.list_(pa.string()) for c in EXPLANATION_COLUMNS})
+    return pa.schema([(c, types[c]) for c in output_columns(explain, pipeline)])
+
+
+def parquet_table(rows, explain=False, pipeline=DECISION_PIPELINE):
+    return require_pyarrow().Table.from_pylist(rows, schema=parquet_schema(explain, pipeline))
+
+
+# Response media type of every output format (POST /credit/decision/bulk)
+MEDIA_TYPES = {
+    "ndjson":  "application/x-ndjson",
+    "csv":     "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+# Upload body -> temporary file (read in chunks, never fully in memory)
+async def spool_upload(stream, in_fmt="csv") -> str:
+    f = tempfile.NamedTemporaryFile(suffix=f".{in_fmt}", delete=False)
+    try:
+        with f:
+            async for block in stream:
+                f.write(block)
+    except BaseException:
+        os.remove(f.name)
+        raise
+    return f.name
+
+
+# Output of a whole uploaded file, chunk by chunk (bytes), removes the upload when done
+# Chunks are scored on the shared bulk_pool ; release : job slot taken by the route, freed when done
+# Parquet is written to a temporary file first (row group per chunk) then streamed
+def stream_scores(path, in_fmt="csv", out_fmt="ndjson", explain=False,
+                  chunk_size=BULK_CHUNK_SIZE, pipeline=DECISION_PIPELINE, release=None):
+    try:
+        chunks = score_chunks(read_chunks(path, chunk_size, in_fmt), chunk_size, explain, bulk_pool.workers,
+                              pipeline=pipeline, executor=bulk_pool.executor())
+        if out_fmt != "parquet":
+            for idx, rows in chunks:
+                yield encode_rows(rows, out_fmt, explain, header=(idx == 0), pipeline=pipeline).encode("utf-8")
+            return
+
+        pq = require_pyarrow().parquet
+        with tempfile.NamedTemporaryFile(suffix=".parquet") as out:
+            with pq.ParquetWriter(out.name, parquet_schema(explain, pipeline)) as writer:
+                for _, rows in chunks:
+                    writer.write_table(parquet_table(rows, explain, pipeline))
+            with open(out.name, "rb") as f:
+                while block := f.read(1 << 20):
+                    yield block
+    except BrokenProcessPool:
+        bulk_pool.reset()
+        raise
+    finally:
+        os.remove(path)
+        if release is not None:
+            release()
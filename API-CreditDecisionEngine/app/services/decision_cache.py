@@ -0,0 +1,92 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import DECISION_CACHE_MAX_ITEMS, DECISION_CACHE_TTL_SECONDS
+
+# Decision Cache :
+# Same PAN -> same bank statement -> same 7-field CreditRequest -> same decision.
+# So decisions are cached by a hash of the validated feature vector + the model bundle fingerprint.
+# LRU eviction above max_items, TTL eviction for old entries.
+# Shared by the decision route and the /explain/* routes (app/services/decision_service.py).
+
+# Feature order of the cache key (same fields as CreditRequest)
+KEY_FEATURES = [
+    "avgMonthlyIncome", "incomeCV", "expenseRatio", "emiRatio",
+    "avgMonthlyBalance", "bounceCount", "accountAgeMonths",
+]
+
+
+# Canonical Key : sha256(model version + exact float value of every feature)
+# model_version : fingerprint of the bundle that scores the request (a hot reload changes every key)
+# float.hex() is exact, so 5000 and 5000.0 give the same key
+def decision_key(input_data, model_version):
+    vector = "|".join(float(input_data[f]).hex() for f in KEY_FEATURES)
+    return hashlib.sha256(f"{model_version}|{vector}".encode()).hexdigest()
+
+
+class DecisionCache:
+
+    def __init__(self, max_items=DECISION_CACHE_MAX_ITEMS, ttl_seconds=DECISION_CACHE_TTL_SECONDS):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (created_at, value), least recently used first
+        self._items = OrderedDict()
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+    # Returns the cached value or None (miss / expired)
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            created_at, value = item
+            if time.monotonic() - created_at >= self.ttl_seconds:
+                del self._items[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Global decision cache instance
+decision_cache = DecisionCache()
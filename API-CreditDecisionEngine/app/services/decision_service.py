@@ -1,12 +1,172 @@
-#Import Credit Decision Engine as a => "engine"
-from app.engines.credit_decision_engine import engine
+#Import Model Manager as a => "model_manager" (active model version : registry + engine, hot reload)
+from app.services.model_manager import model_manager
+#Import Explanation Store as a => "explanation_store" (deferred explanations)
+from app.services.explanation_store import explanation_store
+#Import Decision Cache as a => "decision_cache" (shared with the /explain/* routes)
+from app.services.decision_cache import decision_cache, decision_key
+
+#Micro-Batcher : coalesces concurrent single decisions into one engine call
+from app.services.micro_batcher import MicroBatcher
+from app.core.config import MICROBATCH_ENABLED, DECISION_PIPELINE
+from starlette.concurrency import run_in_threadpool
+#Timing spans (GET /metrics + Server-Timing header)
+from app.core.metrics import span
 
 #Service Layer : clean separation between API routes and ML engine
 
+
+# Cache Entry of one applicant :
+#   "scores"  -> engine.score_batch output (1 row)
+#   "shap"    -> SHAP values per layer (None until the first explained request)
+#   "factors" -> Top factors per layer (None until the first explained request)
+# A repeat applicant costs a dictionary lookup instead of 5 model calls and 5 SHAP runs
+# deployment : model version to use (None -> the active one, see app/services/model_manager.py)
+# pipeline   : "full" / "tiered" (None -> DECISION_PIPELINE), part of the cache key
+def get_decision_entry(input_data: dict, explain: bool = True, deployment=None, pipeline=None) -> dict:
+    return get_decision_entries([input_data], [explain], deployment, pipeline)[0]
+
+
+# Cache Entries of N applicants (used by the micro-batcher)
+# Every cache miss is scored in ONE engine call and explained in ONE SHAP call per layer
+# explain[i] = False -> entry i may have no SHAP values
+def get_decision_entries(inputs: list, explain: list, deployment=None, pipeline=None) -> list:
+    deployment = deployment or model_manager.current()
+    engine = deployment.engine
+    pipeline = pipeline or DECISION_PIPELINE
+    # Tiered entries may miss layers : never served to a full pipeline request (and the other way round)
+    version = deployment.fingerprint if pipeline == "full" else f"{deployment.fingerprint}:{pipeline}"
+    keys = [decision_key(x, version) for x in inputs]
+    entries = {}   # key -> cached entry
+    todo = {}      # key -> explanations needed, for entries to compute (same key once)
+    with span("decision_cache"):
+        for key, want in zip(keys, explain):
+            if key not in entries and key not in todo:
+                entry = decision_cache.get(key)
+                if entry is None:
+                    todo[key] = False
+                else:
+                    entries[key] = entry
+            # Cached without SHAP values but explanations asked -> recompute with SHAP
+            if want and (key in todo or entries[key]["shap"] is None):
+                todo[key] = True
+
+    if todo:
+        rows = {key: x for key, x in zip(keys, inputs) if key in todo}
+        todo_keys = list(todo)
+        scores = engine.score_batch([rows[key] for key in todo_keys], pipeline)
+
+        # SHAP only for the rows that asked for explanations
+        explained = [i for i, key in enumerate(todo_keys) if todo[key]]
+        shap_values, factors = None, None
+        if explained:
+            shap_values = engine.shap_batch(_take(scores, explained))
+            factors = engine.top_factors(shap_values)
+
+        for i, key in enumerate(todo_keys):
+            entry = {"scores": _take(scores, [i]), "shap": None, "factors": None}
+            if todo[key]:
+                j = explained.index(i)
+                entry["shap"] = _take(shap_values, [j])
+                entry["factors"] = [factors[j]]
+            decision_cache.put(key, entry)
+            entries[key] = entry
+
+    return [entries[key] for key in keys]
+
+
+# Rows idx of every array / DataFrame of a scores or SHAP Dictionary
+def _take(batch: dict, idx: list) -> dict:
+    return {k: v.iloc[idx] if hasattr(v, "iloc") else v[idx] for k, v in batch.items()}
+
+
 # This function is called by the API router
 # It calls the credit decision engine
 # It returns the decision
+# explain :
+#   "full"     -> scores + SHAP explanations (default)
+#   "deferred" -> scores + decision_id now, explanations computed in the background
+#   "none"     -> scores only, no explanations
+def generate_decision(input_data: dict, explain: str = "full") -> dict:
+    return generate_decisions([input_data], [explain])[0]
+
+
+# Decisions of N independent requests (each with its own explain mode)
+# Called by the micro-batcher with every request that arrived in the same window
+def generate_decisions(inputs: list, explain: list) -> list:
+    #One model version for the whole call (a hot reload never splits a request)
+    deployment = model_manager.current()
+    engine = deployment.engine
+    #Get (cached) scores + explanations from the Credit Decision Engine
+    entries = get_decision_entries(inputs, [mode == "full" for mode in explain], deployment)
+
+    results = []
+    with span("build_responses"):
+        for input_data, mode, entry in zip(inputs, explain, entries):
+            factors = entry["factors"] if mode == "full" else None
+            result = engine.build_responses(entry["scores"], factors)[0]
+            if mode == "deferred":
+                # Score now, explain later on the background pool (fills the cache entry too)
+                # Same model version as the scores, even if a reload swaps it meanwhile
+                result.decision_id = explanation_store.submit(
+                    lambda x=input_data: get_decision_entry(x, deployment=deployment)["factors"][0],
+                    model_version=deployment.model_version,
+                )
+            results.append(result)
+    return results
+
+
+# Async entry point of the decision route
+# Concurrent requests are coalesced into one generate_decisions call (app/services/micro_batcher.py)
+async def generate_decision_async(input_data: dict, explain: str = "full"):
+    if not MICROBATCH_ENABLED:
+        return await run_in_threadpool(generate_decision, input_data, explain)
+    return await decision_batcher.submit((input_data, explain))
+
+
+# This function is called by the API router for the batch endpoint
+# It calls the credit decision engine once for all N applicants
+# It returns N decisions in the same order as the input
+# pipeline : "full" / "tiered" (None -> DECISION_PIPELINE)
+def generate_decision_batch(input_data: list, pipeline: str = None) -> list:
+    #Call Credit Decision Engine method get_decision_batch (active model version)
+    return model_manager.current().engine.get_decision_batch(input_data, pipeline=pipeline)
+
+
+# This function is called by the what-if router
+# It scores every point of the grid in ONE engine call (no cache, no explanations)
+# axes : [(feature, values), ...] (1 or 2 axes), boundaries : label outputs whose crossings are reported
+def generate_whatif(base: dict, axes: list, boundaries: list):
+    return model_manager.current().engine.what_if(base, axes, boundaries)
+
+
+# This function is called by the API router for deferred explanations
+# It returns None if the decision ID is unknown or expired
+def get_decision_explanations(decision_id: str):
+    item = explanation_store.get(decision_id)
+    if item is None:
+        return None
+    explanations = item["explanations"] or {}
+    return {
+        "decision_id": decision_id,
+        "status": item["status"],
+        "PD_top_factors": explanations.get("PD"),
+        "Anomaly_top_factors": explanations.get("Anomaly"),
+        "RiskLabel_Drivers": explanations.get("RiskLabel"),
+        "HybridScore_factors": explanations.get("HybridScore"),
+        "RL_Rationales": explanations.get("RL_Recommendation"),
+        "model_version": item["model_version"],
+    }
+
+
+# Global micro-batcher of the decision route
+# Items are (input_data, explain) tuples, results come back in the same order
+decision_batcher = MicroBatcher(
+    lambda items: generate_decisions([x for x, _ in items], [mode for _, mode in items])
+)
+
 
-def generate_decision(input_data: dict) -> dict:
-    #Call Credit Decision Engine method get_decision
-    return engine.get_decision(input_data)
+# This function is called by the monitoring router
+def get_cache_stats() -> dict:
+    stats = decision_cache.stats()
+    stats["model_version"] = model_manager.active_version()
+    return stats
@@ -0,0 +1,432 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+
+from app.core.config import (
+    EXPLAIN_INDEX_DIR,
+    EXPLAIN_INDEX_WORKERS,
+    EXPLAIN_INDEX_CHUNK_SIZE,
+    EXPLAIN_INDEX_AUTO_BUILD,
+)
+from app.core.metrics import span
+from app.engines.credit_decision_engine import BUSINESS_MAPPING, RISK_LABELS, ACTIONS
+from app.engines.tier_policy import LAYERS
+from app.schemas.credit import GlobalFactor, GlobalSegment, GlobalImportanceResponse
+from app.services.model_manager import model_manager, load_deployment
+
+# Explanation Index :
+# SHAP values of every background row (registry.bg_data = features_only.csv, ~30k rows) through
+# every explainer, computed ONCE per model version and stored on disk, so portfolio views
+# (global importance, mean |SHAP| per risk label, factor distributions per segment) are read from
+# the index instead of running the explainers on every query.
+#
+#   bg_data rows --> chunks of EXPLAIN_INDEX_CHUNK_SIZE rows --> process pool (spawn, all cores)
+#                    (engine.score_matrix + engine.shap_batch : one vectorized call per layer per chunk)
+#                --> columns : layer outputs + one float32 SHAP column per (layer, feature)
+#                --> EXPLAIN_INDEX_DIR/explain_index_v<INDEX_FORMAT>_<fingerprint>.joblib
+#
+# Columnar : "shap.<layer>" is a (features, rows) array, every feature is one contiguous column, and
+# the label columns are int8. The file is uncompressed and read as a memory map (~4 MB for 30k rows),
+# so the API worker processes share it. A query is a mask over the label columns + means / ranks of
+# a few columns (milliseconds).
+# RiskLabel SHAP values are those of the predicted class of every row (same as the decision routes).
+#
+# Build : python -m app.explain_index build, or in the background when EXPLAIN_INDEX_AUTO_BUILD
+# (a lock file next to the index : one build per model version, even across the app/serve.py workers)
+
+# Bump when the index layout changes (old index files are then ignored)
+INDEX_FORMAT = 1
+
+# Build status
+IDLE = "IDLE"
+BUILDING = "BUILDING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+# Label columns : filter / segment name -> (column, names of the codes)
+SEGMENTS = {
+    "risk_label":     ("risk_idx", RISK_LABELS),
+    "recommendation": ("action_idx", ACTIONS),
+    "anomaly_flag":   ("anomaly_flag", ["0", "1"]),
+}
+
+# SHAP quantiles of distribution=true
+QUANTILES = {"p5": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95}
+
+
+# building = True : the index is being built (answer again later)
+class IndexNotReady(RuntimeError):
+
+    def __init__(self, message, building=False):
+        super().__init__(message)
+        self.building = building
+
+
+class IndexBuildInProgress(RuntimeError):
+    pass
+
+
+# 1. Build
+
+# Layer outputs + SHAP values of the background rows [start, stop) of the active model version
+# engine = None -> the deployment of this pool worker
+def explain_chunk(start, stop, engine=None):
+    engine = engine or model_manager.current().engine
+    registry = engine.registry
+    rows = registry.bg_data.iloc[start:stop][registry.feature_plan.inputs].to_dict("records")
+    scores = engine.score_matrix(registry.feature_plan.matrix(rows), "full")
+    shap_values = engine.shap_batch(scores)
+    columns = {
+        "risk_idx":     scores["risk_idx"].astype(np.int8),
+        "action_idx":   scores["action_idx"].astype(np.int8),
+        "anomaly_flag": scores["anomaly_flag"].astype(np.int8),
+        "pd":           scores["pd"].astype(np.float32),
+        "if_score":     scores["if_score"].astype(np.float32),
+        "hybrid_score": scores["hybrid_score"].astype(np.float32),
+    }
+    for layer in LAYERS:
+        columns[f"shap.{layer}"] = np.asarray(shap_values[layer], dtype=np.float32).T
+    return columns
+
+
+# Pool worker start : load the model version of the build once (snapshot memory maps)
+# Lower priority : the API processes keep the CPU while an index is built next to them
+def _init_worker(version):
+    os.nice(10)
+    model_manager.activate(load_deployment(version, warm_up=False))
+
+
+# Index of one deployment : {"meta": {...}, "columns": {name: array}}
+# workers = 1 -> chunks are explained in this process
+# progress(rows done, rows) is called after every chunk
+def build_index(deployment, workers=EXPLAIN_INDEX_WORKERS, chunk_size=EXPLAIN_INDEX_CHUNK_SIZE, progress=None):
+    start = time.perf_counter()
+    n = len(deployment.registry.bg_data)
+    bounds = [(i, min(i + chunk_size, n)) for i in range(0, n, chunk_size)]
+
+    if workers <= 1:
+        chunks = (explain_chunk(a, b, deployment.engine) for a, b in bounds)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(bounds)), mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(deployment.model_version,))
+        chunks = pool.map(explain_chunk, [a for a, _ in bounds], [b for _, b in bounds])
+
+    columns = {}
+    try:
+        for (a, b), chunk in zip(bounds, chunks):
+            for name, values in chunk.items():
+                if name not in columns:
+                    columns[name] = np.empty(values.shape[:-1] + (n,), dtype=values.dtype)
+                columns[name][..., a:b] = values
+            if progress is not None:
+                progress(b, n)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    meta = {
+        "format": INDEX_FORMAT,
+        "model_version": deployment.model_version,
+        "fingerprint": deployment.fingerprint,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "rows": n,
+        "build_seconds": round(time.perf_counter() - start, 2),
+        "layers": {layer: list(names) for layer, names in deployment.engine.layer_features().items()},
+    }
+    return {"meta": meta, "columns": columns}
+
+
+# 2. Query
+
+# Factors of one layer over the rows of S : (features, rows) SHAP columns
+def _factors(S, features, top_k, distribution):
+    S = np.asarray(S, dtype=np.float64)
+    magnitude = np.abs(S)
+    mean_abs, mean = magnitude.mean(axis=1), S.mean(axis=1)
+    # Share of the rows where the feature is one of the top_k factors (same ranking as the decision routes)
+    k = min(top_k, len(features))
+    top = np.argsort(-magnitude, axis=0, kind="stable")[:k]
+    share = np.bincount(top.ravel(), minlength=len(features)) / S.shape[1]
+    quantiles = np.quantile(S, list(QUANTILES.values()), axis=1) if distribution else None
+    return [
+        GlobalFactor.model_construct(
+            feature=features[j],
+            name=BUSINESS_MAPPING.get(features[j], features[j]),
+            mean_abs_shap=round(float(mean_abs[j]), 6),
+            mean_shap=round(float(mean[j]), 6),
+            top_k_share=round(float(share[j]), 4),
+            quantiles={q: round(float(v), 6) for q, v in zip(QUANTILES, quantiles[:, j])} if distribution else None,
+        )
+        for j in np.argsort(-mean_abs, kind="stable")
+    ]
+
+
+# Global importance of one layer over the index rows matching the filters
+# filters    : {"risk_label": [names], "recommendation": [names], "anomaly_flag": [0 / 1]} (None / empty : any)
+# segment_by : None -> one segment with every matching row, else one segment per label value present
+def query_index(index, layer, filters=None, segment_by=None, top_k=3, distribution=False):
+    columns, meta = index["columns"], index["meta"]
+    features = meta["layers"][layer]
+    mask = np.ones(meta["rows"], dtype=bool)
+    for name, values in (filters or {}).items():
+        if values:
+            column, names = SEGMENTS[name]
+            mask &= np.isin(columns[column], [names.index(str(v)) for v in values])
+
+    if segment_by is None:
+        groups = [(None, mask)]
+    else:
+        column, names = SEGMENTS[segment_by]
+        codes = np.asarray(columns[column])
+        groups = [(label, mask & (codes == code)) for code, label in enumerate(names)]
+
+    S = columns[f"shap.{layer}"]
+    segments = []
+    for label, rows in groups:
+        count = int(rows.sum())
+        if count == 0 and label is not None:
+            continue
+        segments.append(GlobalSegment.model_construct(
+            segment=label,
+            rows=count,
+            factors=_factors(S[:, rows], features, top_k, distribution) if count else [],
+        ))
+    return GlobalImportanceResponse.model_construct(
+        layer=layer,
+        rows_indexed=meta["rows"],
+        rows_matched=int(mask.sum()),
+        segment_by=segment_by,
+        segments=segments,
+        model_version=meta["model_version"],
+    )
+
+
+# 3. Index files + background builds of the serving versions
+
+class ExplanationIndex:
+
+    def __init__(self, index_dir=EXPLAIN_INDEX_DIR, workers=EXPLAIN_INDEX_WORKERS,
+                 chunk_size=EXPLAIN_INDEX_CHUNK_SIZE, auto_build=EXPLAIN_INDEX_AUTO_BUILD):
+        self.index_dir = index_dir
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.auto_build = auto_build
+        self._lock = threading.Lock()
+        # fingerprint -> loaded index (memory maps), only the versions served since startup
+        self._indexes = {}
+        self._build = {"status": IDLE, "model_version": None, "rows_done": 0, "rows": None,
+                       "error": None, "seconds": None}
+        self._building = None
+
+
+    def path(self, fingerprint):
+        return self.index_dir / f"explain_index_v{INDEX_FORMAT}_{fingerprint}.joblib"
+
+
+    # Index of a deployment (None : not built yet), read once then kept as memory maps
+    def load(self, deployment):
+        index = self._indexes.get(deployment.fingerprint)
+        if index is not None:
+            return index
+        path = self.path(deployment.fingerprint)
+        if not path.exists():
+            return None
+        with self._lock:
+            if deployment.fingerprint not in self._indexes:
+                self._indexes[deployment.fingerprint] = joblib.load(path, mmap_mode="r")
+                print(f"Explanation index loaded : {path.name}")
+            return self._indexes[deployment.fingerprint]
+
+
+    # Index of the serving version, or IndexNotReady (with the build status)
+    # EXPLAIN_INDEX_AUTO_BUILD : a missing index starts its build (e.g. first query after a hot reload)
+    def get(self, deployment=None):
+        deployment = deployment or model_manager.current()
+        index = self.load(deployment)
+        if index is not None:
+            return index
+        if self.auto_build:
+            try:
+                self.build(deployment)
+            except IndexBuildInProgress:
+                pass
+        build = self.status(deployment)["build"]
+        if build["status"] == BUILDING:
+            done = f" ({build['rows_done']} / {build['rows']} rows)" if build["rows"] else ""
+            raise IndexNotReady(f"Explanation index of model version {deployment.model_version} is being built{done}",
+                                building=True)
+        raise IndexNotReady(f"No explanation index for model version {deployment.model_version} : "
+                            f"python -m app.explain_index build (or POST /api/explain/global/build)")
+
+
+    # Start the build of a deployment's index on a background thread (wait = True : blocks until done)
+    # An existing index is kept unless force, progress(rows done, rows) is called after every chunk
+    # IndexBuildInProgress : a build already runs in this process, or in another one (lock file)
+    def build(self, deployment=None, wait=False, force=False, progress=None):
+        deployment = deployment or model_manager.current()
+        if force or not self.path(deployment.fingerprint).exists():
+            with self._lock:
+                if self._building is not None:
+                    raise IndexBuildInProgress(f"Explanation index of model version {self._build['model_version']} is being built")
+                lock = self._acquire_file_lock(deployment.fingerprint)
+                self._building = deployment.fingerprint
+                self._build = {"status": BUILDING, "model_version": deployment.model_version, "rows_done": 0,
+                               "rows": len(deployment.registry.bg_data), "error": None, "seconds": None}
+            thread = threading.Thread(target=self._run_build, args=(deployment, lock, progress),
+                                      name="explain-index", daemon=True)
+            thread.start()
+            if wait:
+                thread.join()
+        return self.status(deployment)
+
+
+    def _run_build(self, deployment, lock, progress=None):
+        start = time.perf_counter()
+
+        def report(done, rows):
+            self._build["rows_done"] = done
+            if progress is not None:
+                progress(done, rows)
+
+        try:
+            index = build_index(deployment, self.workers, self.chunk_size, progress=report)
+            self._save(deployment.fingerprint, index)
+            self._indexes.pop(deployment.fingerprint, None)
+            self._build.update(status=DONE, seconds=round(time.perf_counter() - start, 2))
+            print(f"Explanation index of model version {deployment.model_version} built "
+                  f"in {self._build['seconds']}s ({index['meta']['rows']} rows)")
+        except Exception as e:
+            self._build.update(status=FAILED, error=str(e), seconds=round(time.perf_counter() - start, 2))
+            print(f"Explanation index of model version {deployment.model_version} failed ({e})")
+        finally:
+            _release_file_lock(lock)
+            with self._lock:
+                self._building = None
+
+
+    # Written to a temporary file first (uncompressed : joblib can only memory-map uncompressed arrays)
+    def _save(self, fingerprint, index):
+        path = self.path(fingerprint)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            joblib.dump(index, tmp, compress=0)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+    # Lock file "<index>.lock" holding the pid of the building process
+    # The pid is written to a temporary file first, then hard-linked into place (os.link fails if the lock
+    # exists) : the lock never exists without its pid, so an empty lock is never mistaken for a stale one.
+    # A lock left by a process that died is taken over
+    def _acquire_file_lock(self, fingerprint):
+        lock = self.path(fingerprint).with_suffix(".lock")
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        tmp = lock.with_name(f"{lock.name}.tmp{os.getpid()}")
+        tmp.write_text(str(os.getpid()))
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp, lock)
+                    return lock
+                except FileExistsError:
+                    if _pid_alive(lock):
+                        raise IndexBuildInProgress("Explanation index is being built by another process")
+                    _take_stale_lock(lock)
+            raise IndexBuildInProgress("Explanation index is being built by another process")
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+    # Index of a deployment (meta, None : not built) + status of its last build in this process
+    def status(self, deployment=None):
+        deployment = deployment or model_manager.current()
+        index = self.load(deployment)
+        build = dict(self._build)
+        if build["model_version"] != deployment.model_version:
+            build = {"status": IDLE, "model_version": deployment.model_version, "rows_done": 0, "rows": None,
+                     "error": None, "seconds": None}
+        if build["status"] != BUILDING and _pid_alive(self.path(deployment.fingerprint).with_suffix(".lock")):
+            # Built by another process (CLI or another app/serve.py worker) : no progress known here
+            build.update(status=BUILDING, rows_done=0, rows=None)
+        return {
+            "model_version": deployment.model_version,
+            "index": dict(index["meta"]) if index is not None else None,
+            "build": build,
+        }
+
+
+    # Called by the FastAPI startup event : load the index of the serving version, build it when missing
+    def start(self):
+        if not self.auto_build:
+            return
+        threading.Thread(target=self._start, name="explain-index-start", daemon=True).start()
+
+    def _start(self):
+        try:
+            self.get()
+        except (IndexNotReady, IndexBuildInProgress):
+            pass
+
+
+# Remove a stale lock : renamed away first (only one process wins the rename), then checked again,
+# since another process may have replaced the stale lock by its own live one in the meantime
+def _take_stale_lock(lock):
+    stale = lock.with_name(f"{lock.name}.stale{os.getpid()}")
+    try:
+        os.rename(lock, stale)
+    except FileNotFoundError:
+        return
+    try:
+        if _pid_alive(stale):
+            os.link(stale, lock)
+    except FileExistsError:
+        pass
+    finally:
+        stale.unlink(missing_ok=True)
+
+
+# Remove the lock of this process only (never the lock of a builder that took over a stale one)
+def _release_file_lock(lock):
+    try:
+        if lock.read_text().strip() == str(os.getpid()):
+            lock.unlink()
+    except OSError:
+        pass
+
+
+# Lock held by a live builder
+# Stale : unreadable / empty / garbage pid or no such process.
+# A process of another user (PermissionError) is alive : its lock is never taken.
+def _pid_alive(lock):
+    try:
+        pid = int(lock.read_text().strip() or 0)
+    except (ValueError, OSError):
+        return False
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Global explanation index instance
+explanation_index = ExplanationIndex()
+
+
+# Answer of GET /explain/global/{layer} over the index of the serving version
+def global_importance(layer, filters=None, segment_by=None, top_k=3, distribution=False):
+    index = explanation_index.get()
+    with span("explain_index_query"):
+        return query_index(index, layer, filters, segment_by, top_k, distribution)
@@ -0,0 +1,94 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import (
+    EXPLAIN_WORKERS,
+    EXPLAIN_MAX_PENDING,
+    EXPLAIN_STORE_MAX_ITEMS,
+    EXPLAIN_STORE_TTL_SECONDS,
+)
+
+# Explanation Store :
+# Score now, explain later.
+# The decision route returns the scores + a decision ID immediately,
+# and the SHAP explanations are computed here on a bounded background pool.
+# GET /credit/decision/{id}/explanations reads them back from this store.
+
+# Status of one stored decision
+PENDING = "PENDING"
+READY = "READY"
+FAILED = "FAILED"
+NOT_QUEUED = "NOT_QUEUED"  # Pool full when the decision was made : explanations are never computed
+
+
+class ExplanationStore:
+
+    def __init__(self, workers=EXPLAIN_WORKERS, max_pending=EXPLAIN_MAX_PENDING,
+                 max_items=EXPLAIN_STORE_MAX_ITEMS, ttl_seconds=EXPLAIN_STORE_TTL_SECONDS):
+        self.max_pending = max_pending
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="explain")
+        self._lock = threading.Lock()
+        # decision_id -> {"status", "explanations", "model_version", "created_at"} (oldest first)
+        self._items = OrderedDict()
+        self._pending = 0
+
+
+    # Submit a job that returns the explanations Dictionary
+    # model_version : version that scored the decision (reported with its explanations)
+    # Returns the new decision ID
+    # If too many jobs are queued, the job is dropped and the decision is stored as NOT_QUEUED
+    # (never run inline : the caller is the micro-batcher's inference thread)
+    def submit(self, job, model_version):
+        decision_id = uuid.uuid4().hex
+        with self._lock:
+            self._evict()
+            queued = self._pending < self.max_pending
+            if queued:
+                self._pending += 1
+            self._items[decision_id] = {"status": PENDING if queued else NOT_QUEUED, "explanations": None, "model_version": model_version,
+                                        "created_at": time.monotonic()}
+
+        if queued:
+            self._pool.submit(self._run, decision_id, job)
+        return decision_id
+
+
+    # Read one decision : None if unknown or evicted
+    def get(self, decision_id):
+        with self._lock:
+            self._evict()
+            item = self._items.get(decision_id)
+            return dict(item) if item is not None else None
+
+
+    def _run(self, decision_id, job):
+        try:
+            explanations, status = job(), READY
+        except Exception:
+            explanations, status = None, FAILED
+        with self._lock:
+            self._pending -= 1
+            item = self._items.get(decision_id)
+            if item is not None:
+                item["status"] = status
+                item["explanations"] = explanations
+
+
+    # Drop expired decisions (TTL) and the oldest ones above max_items
+    # Must be called with the lock held
+    def _evict(self):
+        now = time.monotonic()
+        while self._items:
+            _, oldest = next(iter(self._items.items()))
+            if now - oldest["created_at"] < self.ttl_seconds and len(self._items) < self.max_items:
+                break
+            self._items.popitem(last=False)
+
+
+# Global explanation store instance
+explanation_store = ExplanationStore()
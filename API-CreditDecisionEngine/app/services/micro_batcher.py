@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.core.metrics import collect_timings, add_timings, record
+from app.core.config import (
+    MICROBATCH_MAX_BATCH,
+    MICROBATCH_MAX_WAIT_MS,
+    MICROBATCH_MAX_QUEUE,
+    MICROBATCH_WORKERS,
+)
+
+# Micro-Batcher :
+# Concurrent single-row requests wait a few milliseconds in a queue
+# and are sent to the engine together as ONE vectorized call.
+#
+#   request 1 --\
+#   request 2 ----> queue --> [batch of <= max_batch rows] --> inference executor --> results fanned out
+#   request 3 --/        (waits <= max_wait after the first row)
+#
+# While a batch runs, new requests pile up in the queue and form the next batch,
+# so the batch size grows with the load (and stays 1 with no concurrency).
+# Queue full -> BatcherOverloaded (the route answers 503) instead of unbounded latency.
+# Stage timings of a batch (app/core/metrics.py) are handed back to every request of the batch,
+# together with the time each request waited in the queue ("queue_wait").
+
+
+class BatcherOverloaded(Exception):
+    pass
+
+
+class MicroBatcher:
+
+    # handler : function(list of items) -> list of results (same order), runs on the inference executor
+    def __init__(self, handler, max_batch=MICROBATCH_MAX_BATCH, max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+                 max_queue=MICROBATCH_MAX_QUEUE, workers=MICROBATCH_WORKERS):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        # Queue + dispatcher tasks belong to one event loop (created on first submit)
+        self._loop = None
+        self._queue = None
+        self._arrived = None
+        self._dispatchers = []
+
+        # Metrics
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.max_batch_seen = 0
+        self._batch_sizes = deque(maxlen=1000)
+        self._queue_waits = deque(maxlen=1000)
+
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._arrived = asyncio.Event()
+            self._dispatchers = [loop.create_task(self._dispatch()) for _ in range(self.workers)]
+
+
+    # Submit one item and wait for its result
+    async def submit(self, item):
+        self._start()
+        future = self._loop.create_future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise BatcherOverloaded(f"Inference queue full ({self.max_queue} requests)")
+        self._arrived.set()
+        result, timings, waited = await future
+        record("queue_wait", waited)
+        add_timings(timings)
+        return result
+
+
+    # Dispatcher : collect one batch, run it on the executor, fan the results out
+    async def _dispatch(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0][2] + self.max_wait
+            while True:
+                # Take what is already waiting
+                while len(batch) < self.max_batch and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                remaining = deadline - time.perf_counter()
+                if len(batch) >= self.max_batch or remaining <= 0:
+                    break
+                # Sleep until the next arrival or the end of the window
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+            now = time.perf_counter()
+            waits = [now - enqueued for _, _, enqueued in batch]
+            self._record(len(batch), waits)
+
+            items = [item for item, _, _ in batch]
+            try:
+                results, timings = await self._loop.run_in_executor(self._executor, self._run, items)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future, _), result, waited in zip(batch, results, waits):
+                # A caller that went away (cancelled) just drops its result
+                if not future.done():
+                    future.set_result((result, timings, waited))
+
+
+    # Runs on the inference executor : results + stage timings of the whole batch
+    def _run(self, items):
+        with collect_timings() as timings:
+            results = self.handler(items)
+        return results, timings
+
+
+    def _record(self, size, waits):
+        self.batches += 1
+        self.rows += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self._batch_sizes.append(size)
+        self._queue_waits.extend(waits)
+
+
+    # Metrics : batch size + queue wait (last 1000 batches / requests)
+    def stats(self):
+        waits = np.array(self._queue_waits) * 1000
+        sizes = np.array(self._batch_sizes)
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue": self.max_queue,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "batch_size_mean": round(float(sizes.mean()), 2) if len(sizes) else 0.0,
+            "batch_size_max": self.max_batch_seen,
+            "queue_wait_ms_p50": round(float(np.percentile(waits, 50)), 3) if len(waits) else 0.0,
+            "queue_wait_ms_p99": round(float(np.percentile(waits, 99)), 3) if len(waits) else 0.0,
+        }
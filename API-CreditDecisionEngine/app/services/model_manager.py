@@ -0,0 +1,164 @@
+import signal
+import threading
+import time
+
+from app.core.metrics import metrics
+from app.core.model_bundle import open_bundle, set_current_version, current_version, list_versions, LEGACY_VERSION
+from app.core.model_registry import ModelRegistry
+from app.engines.credit_decision_engine import CreditDecisionEngine
+
+# Model Manager : which model version serves the traffic, and hot reload of a new one
+#
+#   deployment = registry (models of one bundle) + engine (explainers over that registry)
+#
+# Every service call takes the active deployment ONCE (model_manager.current()) and uses it
+# until it returns, so the scores, explanations and cache key of a request always come from
+# the same model version.
+#
+# Hot reload (POST /api/models/reload, SIGHUP) :
+#   1. background thread : read + verify the bundle, load the registry, build every explainer,
+#      run the warm-up request (the old deployment keeps serving meanwhile)
+#   2. swap : one reference assignment, new requests get the new deployment
+#   3. requests in flight finish on the old deployment, which is freed when the last one returns
+# Cache keys contain the bundle fingerprint : old entries are never served for the new version,
+# they only age out of the LRU.
+
+# Reload status
+IDLE = "IDLE"        # no reload since startup
+LOADING = "LOADING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+
+class ReloadInProgress(RuntimeError):
+    pass
+
+
+class Deployment:
+
+    def __init__(self, registry, engine):
+        self.registry = registry
+        self.engine = engine
+        self.model_version = registry.model_version
+        self.fingerprint = registry.fingerprint
+        self.loaded_at = time.time()
+
+
+# Load + warm one model version (None : the version of bundles/CURRENT)
+def load_deployment(version=None, warm_up=True):
+    registry = ModelRegistry(open_bundle(version))
+    engine = CreditDecisionEngine(registry)
+    if warm_up:
+        engine.warm_up()
+    return Deployment(registry, engine)
+
+
+class ModelManager:
+
+    def __init__(self):
+        self._deployment = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._reload = {"status": IDLE, "version": None, "error": None, "seconds": None}
+        # Set by app/serve.py in forked workers : the master reloads and replaces the workers
+        self.reload_hook = None
+
+
+    # Active deployment (the first call loads the CURRENT version, without warm-up)
+    def current(self) -> Deployment:
+        deployment = self._deployment
+        if deployment is None:
+            with self._lock:
+                if self._deployment is None:
+                    self._deployment = load_deployment(warm_up=False)
+                deployment = self._deployment
+        return deployment
+
+
+    # Serve an already built deployment (swap)
+    def activate(self, deployment):
+        with self._lock:
+            old, self._deployment = self._deployment, deployment
+        if old is not None:
+            print(f"Model version {old.model_version} -> {deployment.model_version}")
+
+
+    # Model version being served (None before the first load)
+    def active_version(self):
+        deployment = self._deployment
+        return deployment.model_version if deployment is not None else None
+
+
+    # Hot reload of a model version (None : re-read bundles/CURRENT)
+    # wait = False -> returns at once, the reload runs on a background thread
+    # A given version also becomes bundles/CURRENT once it serves (a restart keeps it)
+    def reload(self, version=None, wait=False):
+        # The manifest is checked now : an unknown version fails the call, not the background job
+        bundle = open_bundle(version)
+        if self.reload_hook is not None:
+            if version is not None:
+                set_current_version(version)
+            self.reload_hook()
+            return {"status": "SIGNALLED", "version": bundle.version, "error": None, "seconds": None}
+
+        if not self._reload_lock.acquire(blocking=False):
+            raise ReloadInProgress(f"Model version {self._reload['version']} is still loading")
+        self._reload = {"status": LOADING, "version": bundle.version, "error": None, "seconds": None}
+        thread = threading.Thread(target=self._run_reload, args=(version, bundle.version),
+                                  name="model-reload", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return dict(self._reload)
+
+
+    def _run_reload(self, version, name):
+        start = time.perf_counter()
+        try:
+            deployment = load_deployment(version)
+            self.activate(deployment)
+            if version is not None:
+                set_current_version(version)
+            self._reload = {"status": DONE, "version": name, "error": None,
+                            "seconds": round(time.perf_counter() - start, 4)}
+            metrics.inc("credit_model_reloads_total", status="ok")
+        except Exception as e:
+            self._reload = {"status": FAILED, "version": name, "error": str(e),
+                            "seconds": round(time.perf_counter() - start, 4)}
+            metrics.inc("credit_model_reloads_total", status="failed")
+            print(f"Model reload of {name} failed ({e})")
+        finally:
+            self._reload_lock.release()
+
+
+    def status(self) -> dict:
+        deployment = self._deployment
+        active = None
+        if deployment is not None:
+            active = {
+                **deployment.registry.bundle.summary(),
+                "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(deployment.loaded_at)),
+            }
+        return {
+            "active": active,
+            "current": current_version() or LEGACY_VERSION,
+            "available": list_versions(),
+            "reload": dict(self._reload),
+        }
+
+
+# Global model manager instance
+model_manager = ModelManager()
+
+
+# SIGHUP -> reload bundles/CURRENT (called on startup, signals can only be set from the main thread)
+def install_reload_signal():
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    def on_sighup(signum, frame):
+        try:
+            model_manager.reload()
+        except Exception as e:
+            print(f"Model reload not started ({e})")
+    signal.signal(signal.SIGHUP, on_sighup)
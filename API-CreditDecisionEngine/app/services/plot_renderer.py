@@ -0,0 +1,141 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import PLOT_WORKERS, PLOT_CACHE_MAX_ITEMS, PLOT_CACHE_TTL_SECONDS
+from app.core.metrics import span
+from app.engines.credit_decision_engine import BUSINESS_MAPPING
+from app.engines.plots import PLOT_TYPES, render_png, ping
+from app.services.decision_cache import DecisionCache, decision_key
+from app.services.decision_service import get_decision_entry
+from app.services.model_manager import model_manager
+
+# Plot Renderer :
+# 1. SHAP values come from the shared decision cache (no model / SHAP recompute)
+# 2. PNGs are rendered in a bounded process pool (app/engines/plots.py),
+#    so matplotlib never runs on the event loop or on two threads at once
+# 3. Rendered PNG bytes are cached by (input hash, plot type)
+# 4. Concurrent requests for the same PNG share one render
+
+
+# Plot type -> (SHAP layer, explainer attribute, model input, model features)
+PLOT_LAYERS = {
+    "pd":      ("PD",          "pd_explainer",     "X_pd",  "pd_features"),
+    "anomaly": ("Anomaly",     "if_explainer",     "X_if",  "if_features"),
+    "hybrid":  ("HybridScore", "hybrid_explainer", "X_hyb", "hybrid_features"),
+    "risk":    ("RiskLabel",   "risk_explainer",   "X_risk", "risk_features"),
+}
+
+
+# Payload of one plot : plain arrays + names (cheap to send to a worker process)
+# deployment : model version of the request (same one as its PNG cache key)
+def plot_payload(input_data: dict, plot: str, deployment) -> dict:
+    layer, explainer, x_key, features = PLOT_LAYERS[plot]
+    registry, engine = deployment.registry, deployment.engine
+
+    # Step 1 : Get cached Scores + SHAP values (full pipeline : every layer is explained)
+    entry = get_decision_entry(input_data, deployment=deployment, pipeline="full")
+    scores = entry["scores"]
+
+    # Step 2 : Base value (Risk Label -> expected value of the predicted class)
+    idx = int(scores["risk_idx"][0]) if plot == "risk" else 0
+    base_value = float(np.ravel(getattr(engine, explainer).expected_value)[idx])
+
+    # Step 3 : Model input row + Business feature names
+    return {
+        "values": np.asarray(entry["shap"][layer][0], dtype=np.float64),
+        "base_value": base_value,
+        "data": np.asarray(scores[x_key], dtype=np.float64)[0],
+        "feature_names": [BUSINESS_MAPPING.get(f, f) for f in getattr(registry, features)],
+    }
+
+
+class PlotRenderer:
+
+    def __init__(self, workers=PLOT_WORKERS, max_items=PLOT_CACHE_MAX_ITEMS,
+                 ttl_seconds=PLOT_CACHE_TTL_SECONDS):
+        self.workers = workers
+        self.cache = DecisionCache(max_items=max_items, ttl_seconds=ttl_seconds)
+        self._pool = None
+        # (input hash, plot type) -> asyncio Task of the render in progress
+        self._inflight = {}
+
+
+    # Worker processes are started on the first render
+    # "spawn" : workers never inherit the server threads or the loaded models
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+
+    # Start every worker at app startup (does not wait for them)
+    # so the first /explain/* request does not pay the matplotlib + shap import
+    def start(self):
+        pool = self._executor()
+        for _ in range(self.workers):
+            pool.submit(ping)
+
+
+    # Returns the PNG bytes of one plot for one applicant
+    # Output : (PNG bytes, model version)
+    async def render(self, input_data: dict, plot: str):
+        if plot not in PLOT_TYPES:
+            raise ValueError(f"Unknown plot type : {plot}")
+        deployment = model_manager.current()
+        key = (decision_key(input_data, deployment.fingerprint), plot)
+
+        png = self.cache.get(key)
+        if png is not None:
+            return png, deployment.model_version
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render(input_data, plot, key, deployment))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield : one cancelled request must not cancel the render of the others
+        return await asyncio.shield(task), deployment.model_version
+
+
+    async def _render(self, input_data, plot, key, deployment):
+        # Step 1 : SHAP values (cached decision entry) on the thread pool
+        with span("plot_payload"):
+            payload = await run_in_threadpool(plot_payload, input_data, plot, deployment)
+
+        # Step 2 : Render in a worker process
+        loop = asyncio.get_running_loop()
+        try:
+            with span("plot_render"):
+                png = await loop.run_in_executor(self._executor(), render_png, plot, payload)
+        except BrokenProcessPool:
+            # A worker died : start a new pool on the next render
+            self._pool = None
+            raise
+
+        # Step 3 : Cache the PNG bytes
+        self.cache.put(key, png)
+        return png
+
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats["workers"] = self.workers
+        stats["rendering"] = len(self._inflight)
+        return stats
+
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global plot renderer instance
+plot_renderer = PlotRenderer()
@@ -0,0 +1,72 @@
+import threading
+
+from app.core.config import WARMUP_ON_STARTUP
+from app.services.model_manager import model_manager
+
+# Startup Service :
+# Liveness  (/health) -> the process is up (answers as soon as the app is imported)
+# Readiness (/ready)  -> the warm-up request went through every layer
+# The warm-up runs on a background thread so /health answers while the models are loaded
+# and the explainers are built.
+
+# Readiness status
+STARTING = "STARTING"
+READY = "READY"
+FAILED = "FAILED"
+
+_state = {"status": STARTING, "error": None}
+
+
+# Run the warm-up (blocking) and flip readiness
+# The first model_manager.current() call loads the registry of the active model version
+def warm_up():
+    try:
+        seconds = model_manager.current().engine.warm_up()
+        _state["status"] = READY
+        print(f"Warm-up done in {seconds:.2f}s")
+    except Exception as e:
+        _state["status"] = FAILED
+        _state["error"] = str(e)
+        print(f"Warm-up failed ({e})")
+    print(f"Startup report : {get_startup_report()}")
+
+
+# Called by the FastAPI startup event
+# Workers forked by app/serve.py are already warm (warm-up ran once in the master)
+def start_warm_up():
+    if is_ready():
+        return
+    if not WARMUP_ON_STARTUP:
+        _state["status"] = READY
+        return
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+def is_ready() -> bool:
+    return _state["status"] == READY
+
+
+def get_readiness() -> dict:
+    return {"status": _state["status"], "error": _state["error"], "model_version": model_manager.active_version()}
+
+
+# Startup timing report of the active model version : seconds per artifact / step
+#   registry   -> manifest, joblib artifacts (checksum checked), snapshot, prepared background
+#   explainers -> build time of every SHAP explainer (on first use when lazy)
+#   warm_up    -> synthetic request through every layer (includes lazy explainer builds)
+# After a hot reload : timings of the reloaded version (loaded in the background)
+def get_startup_report() -> dict:
+    if model_manager.active_version() is None:
+        return {"status": _state["status"], "model_version": None}
+    deployment = model_manager.current()
+    registry, engine = deployment.registry, deployment.engine
+    explainers = {k: v for k, v in engine.startup_timings.items() if k != "warm_up"}
+    return {
+        "status": _state["status"],
+        "model_version": registry.model_version,
+        "registry": dict(registry.startup_timings),
+        "registry_total": round(sum(registry.startup_timings.values()), 4),
+        "explainers": explainers,
+        "explainers_total": round(sum(explainers.values()), 4),
+        "warm_up": engine.startup_timings.get("warm_up"),
+    }
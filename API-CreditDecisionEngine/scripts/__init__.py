@@ -0,0 +1 @@
+# Scripts package (offline tools, not used by the API)
@@ -0,0 +1,141 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.core.background import STRATEGIES
+from app.core.model_registry import ModelRegistry
+from app.engines.explainers import PDLinearExplainer
+from app.engines.tree_explainer import NativeTreeExplainer
+
+# SHAP Background Report :
+# For every layer with a background (PD, HybridScore) and every strategy / size,
+# compare the SHAP values against the FULL background and measure the cost.
+#
+# Columns :
+#   build_s    -> summarize + build the explainer (seconds)
+#   peak_mb    -> peak Python memory while building (tracemalloc)
+#   tables_mb  -> memory kept by the explainer
+#   req_ms     -> median latency of one single-row shap_values call
+#   mae / max  -> mean / max absolute SHAP error vs the full background
+#   top3_exact -> rows whose ordered top-3 factors equal the full-background top-3
+#   top3_overlap -> mean share of the full-background top-3 factors kept
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m scripts.background_report --rows 300 --sizes 25 50 100 200 --output report.md
+
+# Registry of the active model bundle (bundles/CURRENT)
+registry = ModelRegistry()
+
+
+# Layer -> (model input of the background rows, explainer builder)
+def _layers():
+    X_pd = registry.pd_scaler.transform(registry.bg_data[registry.pd_features])
+    X_hyb = registry.bg_data[registry.hybrid_features].values
+    return {
+        "PD": (
+            X_pd,
+            lambda rows, w: PDLinearExplainer(
+                registry.pd_coef, np.average(rows, axis=0, weights=w), registry.pd_intercept
+            ),
+        ),
+        "HybridScore": (
+            X_hyb,
+            lambda rows, w: NativeTreeExplainer(
+                registry.hybrid_trees, background=rows, background_weights=w
+            ),
+        ),
+    }
+
+
+# Memory kept by an explainer : every NumPy array it holds
+def _nbytes(explainer):
+    total = 0
+    for value in vars(explainer).values():
+        if isinstance(value, np.ndarray):
+            total += value.nbytes
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    total += sum(v.nbytes for v in item.values() if isinstance(v, np.ndarray))
+    return total
+
+
+def _build(layer, X, builder, strategy, size):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows, weights = registry.layer_background(layer, X, strategy=strategy, size=size)
+    explainer = builder(rows, weights)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return explainer, seconds, peak
+
+
+def _top3(values):
+    return np.argsort(-np.abs(values), axis=1, kind="stable")[:, :3]
+
+
+def _latency_ms(explainer, X, calls=50):
+    times = []
+    for i in range(calls):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        explainer.shap_values(row)
+        times.append(time.perf_counter() - start)
+    return 1000 * float(np.median(times))
+
+
+def run(rows=300, sizes=(25, 50, 100, 200), strategies=STRATEGIES, seed=1):
+    lines = [
+        "| layer | strategy | size | build_s | peak_mb | tables_mb | req_ms | mae | max | top3_exact | top3_overlap |",
+        "|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    picked = np.random.default_rng(seed).choice(len(registry.bg_data), size=rows, replace=False)
+
+    for layer, (X, builder) in _layers().items():
+        X_eval = X[picked]
+
+        # Step 1 : Reference = full background
+        reference, seconds, peak = _build(layer, X, builder, "full", None)
+        phi_ref = np.asarray(reference.shap_values(X_eval))
+        top_ref = _top3(phi_ref)
+        settings = [("full", len(X), reference, seconds, peak)]
+
+        # Step 2 : Every summary strategy / size
+        for strategy in strategies:
+            if strategy == "full":
+                continue
+            for size in sizes:
+                explainer, seconds, peak = _build(layer, X, builder, strategy, size)
+                settings.append((strategy, size, explainer, seconds, peak))
+
+        # Step 3 : Accuracy + cost of every setting
+        for strategy, size, explainer, seconds, peak in settings:
+            phi = np.asarray(explainer.shap_values(X_eval))
+            top = _top3(phi)
+            err = np.abs(phi - phi_ref)
+            overlap = np.mean([len(set(a) & set(b)) / 3 for a, b in zip(top, top_ref)])
+            lines.append(
+                f"| {layer} | {strategy} | {size} | {seconds:.2f} | {peak / 2**20:.1f} "
+                f"| {_nbytes(explainer) / 2**20:.1f} | {_latency_ms(explainer, X_eval):.3f} "
+                f"| {err.mean():.4g} | {err.max():.4g} "
+                f"| {np.mean((top == top_ref).all(axis=1)):.3f} | {overlap:.3f} |"
+            )
+            print(lines[-1], flush=True)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SHAP background summarization report")
+    parser.add_argument("--rows", type=int, default=300, help="explained rows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100, 200])
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument("--output", help="write the markdown table to this file")
+    args = parser.parse_args()
+
+    table = run(rows=args.rows, sizes=args.sizes, strategies=args.strategies)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(table + "\n")
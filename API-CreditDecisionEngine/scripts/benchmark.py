@@ -0,0 +1,284 @@
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Benchmark Suite :
+# Replays rows of "ML/3. Data/1. Raw_Features/features_only.csv" through the engine and reports,
+# for every benchmark, single-row latency (p50 / p95 / p99) and batch throughput (rows / second).
+#
+# Benchmarks :
+#   startup.*            -> registry load + explainer builds (seconds)
+#   predict.<layer>      -> model call of one layer      (PD, Anomaly, RiskLabel, HybridScore, RL)
+#   shap.<layer>         -> SHAP explanation of one layer
+#   scoring.<backend>    -> engine.score_matrix, every layer without explanations : "sklearn" (one call per
+#                           layer) vs "onnx" (one ONNX graph, SCORING_BACKEND), "onnx.threads_<n>" with --onnx-threads
+#   decision.end_to_end  -> engine.get_decision (scores + explanations, no cache)
+#   decision.tiered      -> the same with the tiered pipeline (TIER_POLICY_TABLE), see "tiered" in the results
+#                           for the share of rows every policy stops and the throughput gain over end_to_end
+#   render.<plot>        -> PNG rendering of the /explain/* routes (pd, anomaly, hybrid, risk)
+#   peak_rss_mb          -> peak resident memory of the benchmark process
+#
+# Results are JSON. --compare flags every metric that got worse than the baseline by more than --threshold
+# (latency / startup / memory higher, throughput lower) and exits with code 1.
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m scripts.benchmark --output baseline.json
+#   python -m scripts.benchmark --compare baseline.json --threshold 0.10
+#   python -m scripts.benchmark --onnx-threads 1 2 4      (intra-op threads of the ONNX graph)
+
+LAYERS = ["PD", "Anomaly", "RiskLabel", "HybridScore", "RL"]
+
+# Metric name -> True if higher is better
+HIGHER_IS_BETTER = {"throughput_rows_s": True}
+
+# Latency changes below this many milliseconds are timer noise, never a regression
+MIN_DELTA_MS = 0.05
+
+
+def _percentiles(samples):
+    ms = np.array(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+    }
+
+
+# single(i) -> one call on row i ; batch() -> one call on all batch rows
+def _bench(single, n_single, batch=None, n_batch=None, repeats=3):
+    single(0)   # warm-up call (lazy builds, caches)
+    samples = []
+    for i in range(n_single):
+        start = time.perf_counter()
+        single(i)
+        samples.append(time.perf_counter() - start)
+    result = _percentiles(samples)
+
+    if batch is not None:
+        batch()
+        best = min(_timed(batch) for _ in range(repeats))
+        result["throughput_rows_s"] = round(n_batch / best, 1)
+    else:
+        result["throughput_rows_s"] = round(1.0 / float(np.mean(samples)), 1)
+    return result
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run(rows=200, batch_size=1000, render_rows=10, seed=0, onnx_threads=()):
+    results = {"meta": {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "rows": rows,
+        "batch_size": batch_size,
+        "render_rows": render_rows,
+        "seed": seed,
+    }}
+
+    # Step 1 : Startup (registry of the active model bundle, first load in this process)
+    from app.core.model_registry import ModelRegistry
+    from app.engines.credit_decision_engine import CreditDecisionEngine
+    start = time.perf_counter()
+    registry = ModelRegistry()
+    registry_s = time.perf_counter() - start
+
+    engine = CreditDecisionEngine(registry)
+    start = time.perf_counter()
+    engine.warm_up()
+    warm_up_s = time.perf_counter() - start
+    results["startup"] = {
+        "registry_s": round(registry_s, 4),
+        "explainers_warm_up_s": round(warm_up_s, 4),
+    }
+
+    # Step 2 : Replay rows of the feature data
+    data = pd.read_csv(registry.bundle.path("bg_data"))[registry.hybrid_features]
+    data = data.sample(n=max(rows, batch_size), random_state=seed, replace=len(data) < max(rows, batch_size))
+    records = data.to_dict("records")
+    single_scores = [engine.score_batch([r], "full") for r in records[:rows]]
+    batch_scores = engine.score_batch(records[:batch_size], "full")
+
+    # Layer input of one scored row / of the whole batch
+    inputs = {
+        "PD":          "X_pd",
+        "Anomaly":     "X_if",
+        "RiskLabel":   "X_risk",
+        "HybridScore": "X_hyb",
+        "RL":          "X_rl",
+    }
+    predict = {
+        "PD":          lambda X: registry.pd_model.predict_proba(X),
+        "Anomaly":     lambda X: registry.iso_model.decision_function(X),
+        "RiskLabel":   lambda X: registry.risk_model.predict(X),
+        "HybridScore": lambda X: registry.hybrid_model.predict(X),
+        "RL":          lambda X: registry.q_lookup(registry.q_states(X)),
+    }
+    explain = {
+        "PD":          lambda X: engine._pd_shap_values(X),
+        "Anomaly":     lambda X: engine.if_explainer.shap_values(X),
+        "RiskLabel":   lambda X: engine.risk_explainer.shap_values(X),
+        "HybridScore": lambda X: engine.hybrid_explainer.shap_values(X),
+        "RL":          lambda X: engine.rl_explainer.shap_values(X, silent=True),
+    }
+
+    bench = {}
+    for layer in LAYERS:
+        key = inputs[layer]
+        for name, fn in [("predict", predict[layer]), ("shap", explain[layer])]:
+            bench[f"{name}.{layer}"] = _bench(
+                lambda i, fn=fn: fn(single_scores[i][key]), rows,
+                lambda fn=fn: fn(batch_scores[key]), batch_size,
+            )
+            print(f"{name}.{layer}", bench[f"{name}.{layer}"], flush=True)
+
+    # Step 2b : Scoring backends over the same rows (every layer, no explanations)
+    # The registry keeps its own backend for the decision benchmarks below
+    bench.update(_bench_scoring(registry, engine, records, rows, batch_size, onnx_threads))
+
+    # Step 3 : End to end (scores + explanations, no decision cache)
+    bench["decision.end_to_end"] = _bench(
+        lambda i: engine.get_decision(records[i], pipeline="full"), rows,
+        lambda: engine.get_decision_batch(records[:batch_size], pipeline="full"), batch_size,
+    )
+    print("decision.end_to_end", bench["decision.end_to_end"], flush=True)
+
+    # Step 3b : Tiered pipeline over the same rows (same feature data distribution)
+    bench["decision.tiered"] = _bench(
+        lambda i: engine.get_decision(records[i], pipeline="tiered"), rows,
+        lambda: engine.get_decision_batch(records[:batch_size], pipeline="tiered"), batch_size,
+    )
+    print("decision.tiered", bench["decision.tiered"], flush=True)
+
+    # Share of the batch rows stopped by every REJECT / REVIEW policy, and sent to the full tier
+    from app.core.config import TIER_POLICY_TABLE
+    exits = engine.score_batch(records[:batch_size], "tiered")["tier_exit"]
+    policy = engine.tier_policy
+    full, tiered = bench["decision.end_to_end"], bench["decision.tiered"]
+    results["tiered"] = {
+        "policy_table": TIER_POLICY_TABLE,
+        "full_tier_share": round(float(np.mean(exits < 0)), 4),
+        "stopped_share": {
+            name: round(float(np.mean(exits == j)), 4)
+            for j, (name, action) in enumerate(zip(policy.names, policy.actions)) if action != "CONTINUE"
+        },
+        "throughput_gain": round(tiered["throughput_rows_s"] / full["throughput_rows_s"], 2),
+        "p50_speedup": round(full["p50_ms"] / tiered["p50_ms"], 2),
+    }
+    print("tiered", results["tiered"], flush=True)
+
+    # Step 4 : /explain/* renderers (in this process, same function as the render workers)
+    from app.engines.plots import PLOT_TYPES, render_png
+    from app.services.plot_renderer import plot_payload
+    from app.services.model_manager import Deployment
+    deployment = Deployment(registry, engine)
+    for plot in PLOT_TYPES:
+        payloads = [plot_payload(records[i], plot, deployment) for i in range(render_rows)]
+        bench[f"render.{plot}"] = _bench(lambda i, plot=plot, p=payloads: render_png(plot, p[i]), render_rows)
+        print(f"render.{plot}", bench[f"render.{plot}"], flush=True)
+
+    results["benchmarks"] = bench
+    # ru_maxrss : kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    results["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20, 1)
+    return results
+
+
+# scoring.sklearn vs scoring.onnx : engine.score_matrix with and without the scoring graph
+# (onnx entries are skipped when onnx / onnxruntime are not installed)
+def _bench_scoring(registry, engine, records, rows, batch_size, onnx_threads=()):
+    from app.core.onnx_graph import ScoringGraph, open_scoring_graph, graph_path
+    plan = registry.feature_plan
+    X_single = [plan.matrix([r]) for r in records[:rows]]
+    X_batch = plan.matrix(records[:batch_size])
+
+    backends = {"sklearn": None}
+    try:
+        backends["onnx"] = registry.scoring_graph or open_scoring_graph(registry)
+        for threads in onnx_threads:
+            backends[f"onnx.threads_{threads}"] = ScoringGraph(graph_path(registry), threads)
+    except ImportError as e:
+        print(f"scoring.onnx skipped ({e})", flush=True)
+
+    bench = {}
+    serving = registry.scoring_graph
+    try:
+        for name, graph in backends.items():
+            registry.scoring_graph = graph
+            bench[f"scoring.{name}"] = _bench(
+                lambda i: engine.score_matrix(X_single[i].copy(), "full"), rows,
+                lambda: engine.score_matrix(X_batch.copy(), "full"), batch_size,
+            )
+            print(f"scoring.{name}", bench[f"scoring.{name}"], flush=True)
+    finally:
+        registry.scoring_graph = serving
+    return bench
+
+
+# Flat {metric path: value} of a results Dictionary
+def _flatten(results):
+    flat = {f"startup.{k}": v for k, v in results["startup"].items()}
+    for name, metrics in results["benchmarks"].items():
+        for metric, value in metrics.items():
+            flat[f"{name}.{metric}"] = value
+    flat["peak_rss_mb"] = results["peak_rss_mb"]
+    return flat
+
+
+# Regressions : metrics worse than the baseline by more than threshold (relative)
+def compare(results, baseline, threshold=0.10):
+    new, old = _flatten(results), _flatten(baseline)
+    rows, regressions = [], []
+    for name in sorted(new.keys() & old.keys()):
+        before, after = old[name], new[name]
+        if not before:
+            continue
+        change = (after - before) / before
+        higher_better = HIGHER_IS_BETTER.get(name.rsplit(".", 1)[-1], False)
+        worse = -change if higher_better else change
+        if name.endswith("_ms") and abs(after - before) < MIN_DELTA_MS:
+            worse = 0.0
+        status = "REGRESSION" if worse > threshold else ("improved" if worse < -threshold else "ok")
+        rows.append((name, before, after, change, status))
+        if status == "REGRESSION":
+            regressions.append(name)
+    return rows, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-layer benchmark of the credit decision engine")
+    parser.add_argument("--rows", type=int, default=200, help="single-row calls per benchmark")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows of the throughput batch")
+    parser.add_argument("--render-rows", type=int, default=10, help="PNGs rendered per plot type")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change flagged as regression")
+    parser.add_argument("--onnx-threads", type=int, nargs="*", default=[], help="also time the ONNX graph with these intra-op threads")
+    args = parser.parse_args()
+
+    results = run(rows=args.rows, batch_size=args.batch_size, render_rows=args.render_rows, onnx_threads=args.onnx_threads)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.threshold)
+        print(f"\n{'metric':<50} {'baseline':>12} {'current':>12} {'change':>8}  status")
+        for name, before, after, change, status in rows:
+            print(f"{name:<50} {before:>12.4f} {after:>12.4f} {change:>+8.1%}  {status}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regression")
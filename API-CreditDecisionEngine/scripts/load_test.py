@@ -0,0 +1,467 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from app.core.config import MODEL_PATHS
+from scripts.worker_memory import serve, children, memory
+
+# Load Test :
+# Replays rows of "ML/3. Data/1. Raw_Features/features_only.csv" against a locally started API
+# the way the Spring backend calls it (MlApiService.getCreditDecision) :
+#   POST /api/credit/decision, one BankStatementAnalysis per request, compact Jackson JSON body,
+#   RestTemplate headers, one keep-alive connection per calling thread
+#
+# Modes :
+#   closed -> fixed concurrency : N callers, each sends its next request when the previous one answered
+#             (a backend with N request threads)
+#   open   -> fixed arrival rate : requests are sent on a schedule whatever the answers
+#             (latency counts from the scheduled send time, so a saturated server is not hidden)
+#
+# For every worker count, the load is swept (concurrency levels / arrival rates) and every step reports
+# throughput, latency p50 / p90 / p99 / max, error rate, server CPU (cores used by master + workers)
+# and server memory (RSS / PSS of master + workers, end of the step). The step where throughput
+# stops growing is reported as the saturation point.
+#
+# Sanity check : server_p50_ms is the p50 of the "total" of the Server-Timing header (time spent in the API).
+# A step whose client p50 is far above it while the server is not CPU bound is flagged :
+# the latency is lost between the server and the client (TCP stall, busy load generator), not in the service.
+#
+# Output :
+#   --output results.json -> everything (meta + steps), input of --compare
+#   --curve  curve.tsv     -> one line per step, fixed columns : diff it between commits
+#   --compare baseline.json flags steps whose throughput / p99 got worse by more than --threshold
+#
+# Runs offline on one Linux box (server stats from /proc). The load generator shares the CPUs
+# with the server : "client_cpu" shows how much of them it used.
+# The decision cache holds DECISION_CACHE_MAX_ITEMS rows : replaying fewer distinct rows than that
+# measures cache hits, not the models (--rows).
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m scripts.load_test --workers 1 2 --concurrency 1 2 4 8 16 32 --curve curve.tsv
+#   python -m scripts.load_test --mode open --rates 10 20 40 80 --duration 20
+#   python -m scripts.load_test --url http://127.0.0.1:8000 --server-pid <pid>   (already running API)
+
+FEATURES = [
+    "avgMonthlyIncome", "incomeCV", "expenseRatio", "emiRatio",
+    "avgMonthlyBalance", "bounceCount", "accountAgeMonths",
+]
+
+# Headers RestTemplate sends for postForObject(url, HttpEntity<BankStatementAnalysis>, MlResponse.class)
+BACKEND_HEADERS = {
+    "Accept": "application/json, application/*+json",
+    "Content-Type": "application/json",
+    "User-Agent": "Java/17",
+    "Connection": "keep-alive",
+}
+
+CURVE_COLUMNS = [
+    "workers", "mode", "load", "requests", "throughput_rps", "p50_ms", "p90_ms", "p99_ms", "max_ms",
+    "error_rate", "server_p50_ms", "server_cpu_cores", "server_rss_mb", "server_pss_mb", "client_cpu",
+]
+
+# Throughput below (1 + this) x the previous step : the server is saturated
+SATURATION_GAIN = 0.05
+
+# Client p50 above the Server-Timing p50 by more than this (ms) and this ratio, with the server using
+# less than SERVER_BUSY_CORES x its worker count : latency the server does not account for
+UNACCOUNTED_MIN_MS = 5.0
+UNACCOUNTED_RATIO = 2.0
+SERVER_BUSY_CORES = 0.8
+
+
+# Request bodies : one compact JSON object per row, field order of BankStatementAnalysis,
+# numbers written as in the CSV (Jackson writes BigDecimal / int values the same way)
+def load_bodies(path=MODEL_PATHS["bg_data"], rows=None, seed=0):
+    with open(path, newline="") as f:
+        records = list(csv.DictReader(f))
+    random.Random(seed).shuffle(records)
+    if rows:
+        records = records[:rows]
+    return [
+        ("{" + ",".join(f'"{name}":{r[name]}' for name in FEATURES) + "}").encode()
+        for r in records
+    ]
+
+
+class Connection:
+
+    # Minimal HTTP/1.1 keep-alive client (asyncio streams, no third-party dependency)
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+
+    async def post(self, path, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = [f"POST {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        head += [f"{k}: {v}" for k, v in BACKEND_HEADERS.items()]
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        try:
+            return await self._read_response()
+        except BaseException:
+            self.close()
+            raise
+
+
+    # (status code, Server-Timing "total" in ms or None) of the response (the body is read and dropped)
+    async def _read_response(self):
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        length, chunked, keep_alive, server_ms = 0, False, True, None
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding" and "chunked" in value:
+                chunked = True
+            elif name == "connection" and value == "close":
+                keep_alive = False
+            elif name == "server-timing":
+                server_ms = _timing_total(value)
+        if chunked:
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length:
+            await self.reader.readexactly(length)
+        if not keep_alive:
+            self.close()
+        return status, server_ms
+
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+# "total;dur=3.402" entry of a Server-Timing header value (milliseconds)
+def _timing_total(value):
+    for part in value.split(","):
+        name, _, params = part.strip().partition(";")
+        if name == "total" and params.startswith("dur="):
+            return float(params[4:])
+    return None
+
+
+# CPU seconds (user + system) used so far by every process in pids
+def _cpu_seconds(pids):
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = 0.0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # Fields 14 / 15 of /proc/<pid>/stat (utime, stime), counted after the ")" of the name
+        total += (int(fields[11]) + int(fields[12])) / ticks
+    return total
+
+
+def client_cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class ServerStats:
+
+    # master : pid of the server master process (None -> no server stats)
+    def __init__(self, master):
+        self.master = master
+
+    def pids(self):
+        return [self.master] + children(self.master) if self.master else []
+
+    def cpu(self):
+        return _cpu_seconds(self.pids())
+
+    def memory(self):
+        rows = []
+        for pid in self.pids():
+            try:
+                rows.append(memory(pid))
+            except OSError:
+                pass
+        return {k: round(sum(m[k] for m in rows), 1) for k in ("rss_mb", "pss_mb")}
+
+
+# Samples : (start, latency seconds, status or None for a connection error / timeout, Server-Timing total ms)
+# Only requests started inside the measured window count
+def summarize(samples, window_start, duration):
+    kept = [(lat, status, server) for start, lat, status, server in samples if window_start <= start < window_start + duration]
+    ok = np.array([lat for lat, status, _ in kept if status == 200]) * 1000
+    server = np.array([ms for _, status, ms in kept if status == 200 and ms is not None])
+    errors = len(kept) - len(ok)
+    result = {
+        "requests": len(kept),
+        "throughput_rps": round(len(ok) / duration, 2),
+        "error_rate": round(errors / len(kept), 4) if kept else 0.0,
+        "errors": {},
+    }
+    for _, status, _ in kept:
+        if status != 200:
+            key = str(status) if status is not None else "connection"
+            result["errors"][key] = result["errors"].get(key, 0) + 1
+    for name, q in [("p50_ms", 50), ("p90_ms", 90), ("p99_ms", 99), ("max_ms", 100)]:
+        result[name] = round(float(np.percentile(ok, q)), 2) if len(ok) else None
+    result["server_p50_ms"] = round(float(np.percentile(server, 50)), 2) if len(server) else None
+    return result
+
+
+# Warning when the client p50 is mostly time the server neither spent in the API nor waited on a busy CPU
+def unaccounted_latency(step, workers):
+    client, server, cores = step["p50_ms"], step["server_p50_ms"], step["server_cpu_cores"]
+    if client is None or server is None:
+        return None
+    gap = client - server
+    if gap < UNACCOUNTED_MIN_MS or client < UNACCOUNTED_RATIO * server:
+        return None
+    if cores is not None and cores >= SERVER_BUSY_CORES * min(workers, os.cpu_count() or 1):
+        return None
+    return (f"client p50 {client} ms vs server p50 {server} ms with server cpu {cores} : "
+            f"{gap:.1f} ms per request spent outside the API (TCP stall, saturated load generator ?)")
+
+
+# Closed loop : `concurrency` callers, each with its own keep-alive connection
+async def closed_loop(host, port, path, bodies, concurrency, duration, warmup, timeout):
+    samples = []
+    counter = iter(range(1 << 62))
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    stop = start + warmup + duration
+
+    async def caller():
+        conn = Connection(host, port)
+        while loop.time() < stop:
+            body = bodies[next(counter) % len(bodies)]
+            t0 = loop.time()
+            try:
+                status, server_ms = await asyncio.wait_for(conn.post(path, body), timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                status, server_ms = None, None
+            samples.append((t0 - start, loop.time() - t0, status, server_ms))
+        conn.close()
+
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return samples
+
+
+# Open loop : one request every 1 / rate seconds (or exponential gaps), whatever the answers
+# Connections come from a pool of at most max_connections (a request waits for a free one,
+# and that wait counts in its latency)
+async def open_loop(host, port, path, bodies, rate, duration, warmup, timeout,
+                    max_connections=256, poisson=False, seed=0):
+    samples = []
+    loop = asyncio.get_running_loop()
+    idle, opened = [], [0]
+    free = asyncio.Semaphore(max_connections)
+    rng = random.Random(seed)
+
+    async def send(scheduled, body):
+        async with free:
+            if idle:
+                conn = idle.pop()
+            else:
+                conn = Connection(host, port)
+                opened[0] += 1
+            try:
+                status, server_ms = await asyncio.wait_for(conn.post(path, body),
+                                                           max(0.0, scheduled + timeout - loop.time()))
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                status, server_ms = None, None
+            idle.append(conn)
+        samples.append((scheduled - start, loop.time() - scheduled, status, server_ms))
+
+    start = loop.time()
+    tasks, t, i = [], 0.0, 0
+    while t < warmup + duration:
+        delay = start + t - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(send(start + t, bodies[i % len(bodies)])))
+        i += 1
+        t += rng.expovariate(rate) if poisson else 1.0 / rate
+    await asyncio.gather(*tasks)
+    for conn in idle:
+        conn.close()
+    return samples
+
+
+# One step of the sweep (one concurrency level / arrival rate)
+def run_step(url, path, bodies, mode, load, duration, warmup, timeout, stats, poisson=False):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    cpu_before, client_before = stats.cpu(), client_cpu_seconds()
+    if mode == "closed":
+        coro = closed_loop(host, port, path, bodies, int(load), duration, warmup, timeout)
+    else:
+        coro = open_loop(host, port, path, bodies, load, duration, warmup, timeout, poisson=poisson)
+    wall = time.perf_counter()
+    samples = asyncio.run(coro)
+    wall = time.perf_counter() - wall
+
+    result = {"load": load, **summarize(samples, warmup, duration)}
+    # CPU over the whole step (warm-up included) : cores used on average
+    result["server_cpu_cores"] = round((stats.cpu() - cpu_before) / wall, 3) if stats.master else None
+    result["client_cpu"] = round((client_cpu_seconds() - client_before) / wall, 3)
+    server_memory = stats.memory() if stats.master else {"rss_mb": None, "pss_mb": None}
+    result["server_rss_mb"], result["server_pss_mb"] = server_memory["rss_mb"], server_memory["pss_mb"]
+    return result
+
+
+# First step whose throughput grew by less than SATURATION_GAIN over the previous one
+def saturation(steps):
+    for prev, step in zip(steps, steps[1:]):
+        if step["throughput_rps"] < prev["throughput_rps"] * (1 + SATURATION_GAIN):
+            return {"load": prev["load"], "throughput_rps": prev["throughput_rps"], "p99_ms": prev["p99_ms"]}
+    return None
+
+
+def sweep(workers, mode, loads, bodies, args):
+    # Server : started here (one per worker count) or already running (--url)
+    server = nullcontext((args.url, None)) if args.url else serve(args.server, workers)
+    with server as (url, master):
+        stats = ServerStats(master.pid if master is not None else args.server_pid)
+        steps = []
+        for load in loads:
+            step = run_step(url, args.path, bodies, mode, load, args.duration, args.warmup, args.timeout,
+                            stats, poisson=args.poisson)
+            step["warning"] = unaccounted_latency(step, workers)
+            steps.append(step)
+            print(f"workers={workers} {mode} load={load} : {step['throughput_rps']} req/s, "
+                  f"p50 {step['p50_ms']} ms (server {step['server_p50_ms']} ms), p99 {step['p99_ms']} ms, "
+                  f"errors {step['error_rate']:.2%}, "
+                  f"server cpu {step['server_cpu_cores']}, client cpu {step['client_cpu']}", flush=True)
+            if step["warning"]:
+                print(f"  WARNING {step['warning']}", file=sys.stderr, flush=True)
+    return {"workers": workers, "mode": mode, "steps": steps, "saturation": saturation(steps)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(args):
+    loads = args.concurrency if args.mode == "closed" else args.rates
+    bodies = load_bodies(rows=args.rows, seed=args.seed)
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "mode": args.mode,
+            "path": args.path,
+            "server": "external" if args.url else args.server,
+            "rows": len(bodies),
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "arrivals": "poisson" if args.poisson else "fixed",
+        },
+        "runs": [sweep(w, args.mode, loads, bodies, args) for w in args.workers],
+    }
+    return results
+
+
+# Saturation curve : one tab-separated line per step, same columns every time (diff-friendly)
+def curve_lines(results):
+    lines = ["\t".join(CURVE_COLUMNS)]
+    for run_ in results["runs"]:
+        for step in run_["steps"]:
+            row = {"workers": run_["workers"], "mode": run_["mode"], **step}
+            lines.append("\t".join("" if row[c] is None else str(row[c]) for c in CURVE_COLUMNS))
+    return lines
+
+
+# Steps of both results (same workers / mode / load) whose throughput or p99 got worse than threshold
+def compare(results, baseline, threshold=0.10):
+    def index(res):
+        return {(r["workers"], r["mode"], s["load"]): s for r in res["runs"] for s in r["steps"]}
+    new, old = index(results), index(baseline)
+    rows, regressions = [], []
+    for key in sorted(new.keys() & old.keys()):
+        for metric, higher_better in [("throughput_rps", True), ("p99_ms", False)]:
+            before, after = old[key][metric], new[key][metric]
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_better else change
+            status = "REGRESSION" if worse > threshold else ("improved" if worse < -threshold else "ok")
+            rows.append((key, metric, before, after, change, status))
+            if status == "REGRESSION":
+                regressions.append((key, metric))
+    return rows, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of /api/credit/decision with backend-shaped requests")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                        help="closed : fixed concurrency, open : fixed arrival rate")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="API worker counts (one sweep each)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="closed loop levels")
+    parser.add_argument("--rates", type=float, nargs="+", default=[5, 10, 20, 40, 80], help="open loop requests / s")
+    parser.add_argument("--poisson", action="store_true", help="open loop : exponential gaps instead of a fixed rate")
+    parser.add_argument("--duration", type=float, default=15, help="measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before every step")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds before a request counts as an error")
+    parser.add_argument("--rows", type=int, help="distinct feature rows replayed (default : every row)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--path", default="/api/credit/decision")
+    parser.add_argument("--server", choices=["preload", "uvicorn"], default="preload",
+                        help="how the API is started (python -m app.serve / uvicorn --workers)")
+    parser.add_argument("--url", help="use an already running API instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="master pid of the --url server (CPU / memory stats)")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--curve", help="write the saturation curve (TSV) to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change flagged as regression")
+    args = parser.parse_args()
+
+    results = run(args)
+    for run_ in results["runs"]:
+        print(f"workers={run_['workers']} saturation : {run_['saturation']}")
+    lines = curve_lines(results)
+    print("\n".join(lines))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.curve:
+        with open(args.curve, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.threshold)
+        print(f"\n{'step':<28} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}  status")
+        for (workers, mode, load), metric, before, after, change, status in rows:
+            step = f"workers={workers} {mode} {load}"
+            print(f"{step:<28} {metric:<16} {before:>10.2f} {after:>10.2f} {change:>+8.1%}  {status}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regression")
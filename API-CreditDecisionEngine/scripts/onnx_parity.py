@@ -0,0 +1,83 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.model_bundle import open_bundle
+from app.core.model_registry import ModelRegistry
+from app.core.onnx_graph import ScoringGraph, open_scoring_graph
+from app.engines.credit_decision_engine import CreditDecisionEngine
+
+# ONNX Parity Check :
+# Scores every row of "ML/3. Data/1. Raw_Features/features_only.csv" (bg_data of the bundle, ~30k rows)
+# through the sklearn path of the engine and through the ONNX scoring graph (app/core/onnx_graph.py),
+# then compares every output :
+#   labels -> anomaly_flag, risk_idx, action_idx : identical on every row
+#   scores -> pd, if_score, hybrid_score         : max absolute difference within TOLERANCE,
+#                                                  and identical after the response rounding
+# Exits with code 1 on any mismatch : run it after every retrain / graph change.
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m scripts.onnx_parity
+#   python -m scripts.onnx_parity --version v2 --graph snapshots/scoring_v1_<fingerprint>.onnx
+
+LABELS = ["anomaly_flag", "risk_idx", "action_idx"]
+
+# Score -> (max absolute difference, decimals of the JSON response)
+TOLERANCE = {
+    "pd":           (1e-9, 4),
+    "if_score":     (1e-9, 4),
+    "hybrid_score": (1e-6, 1),
+}
+
+
+def run(version=None, graph_path=None):
+    registry = ModelRegistry(open_bundle(version))
+    graph = ScoringGraph(graph_path) if graph_path else (registry.scoring_graph or open_scoring_graph(registry))
+    # Reference : the sklearn path of the engine (no scoring graph)
+    registry.scoring_graph = None
+    engine = CreditDecisionEngine(registry)
+
+    data = pd.read_csv(registry.bundle.path("bg_data"))[registry.feature_plan.inputs]
+    X = registry.feature_plan.matrix(data.to_dict("records"))
+
+    start = time.perf_counter()
+    expected = engine.score_matrix(X.copy(), "full")
+    sklearn_s = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = graph.run(X)
+    onnx_s = time.perf_counter() - start
+
+    report = {"rows": len(X), "sklearn_s": round(sklearn_s, 4), "onnx_s": round(onnx_s, 4), "outputs": {}}
+    failed = []
+    for name in LABELS:
+        mismatches = int(np.sum(actual[name] != expected[name]))
+        report["outputs"][name] = {"mismatches": mismatches}
+        if mismatches:
+            failed.append(name)
+    for name, (tolerance, decimals) in TOLERANCE.items():
+        diff = float(np.max(np.abs(actual[name] - expected[name])))
+        rounded = int(np.sum(np.round(actual[name], decimals) != np.round(expected[name], decimals)))
+        report["outputs"][name] = {"max_abs_diff": diff, "rounded_mismatches": rounded}
+        if diff > tolerance or rounded:
+            failed.append(name)
+    return report, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ONNX scoring graph vs sklearn path over every row of features_only.csv")
+    parser.add_argument("--version", help="model version (default : bundles/CURRENT)")
+    parser.add_argument("--graph", help="graph file to check (default : the compiled graph of the version)")
+    args = parser.parse_args()
+
+    report, failed = run(args.version, args.graph)
+    print(f"\n{report['rows']} rows : sklearn {report['sklearn_s']} s, onnx {report['onnx_s']} s (one batch)")
+    for name, result in report["outputs"].items():
+        status = "MISMATCH" if name in failed else "ok"
+        print(f"{name:<14} {result}  {status}")
+    if failed:
+        print(f"\n{len(failed)} output(s) differ : {', '.join(failed)}")
+        sys.exit(1)
+    print("\nEvery output matches")
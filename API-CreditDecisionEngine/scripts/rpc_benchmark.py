@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+from app.rpc.messages import require_grpc
+from scripts.load_test import Connection, ServerStats, load_bodies, summarize, client_cpu_seconds, git_commit
+from scripts.worker_memory import serve, free_port
+
+# Transport Benchmark : the same decisions over HTTP / JSON and over gRPC (app/rpc/)
+# One server process serves both (python -m app.rpc.server), so every transport hits the same
+# engine, cache and micro-batcher. Closed loop : N callers, each sends its next decision when
+# the previous one answered.
+#
+# Transports :
+#   http        -> POST /api/credit/decision, JSON, one keep-alive HTTP/1.1 connection per caller (RestTemplate)
+#   grpc_tcp    -> Decide over 127.0.0.1, one HTTP/2 channel shared by the callers
+#   grpc_unix   -> Decide over the Unix-domain socket
+#   grpc_stream -> DecideStream over the Unix-domain socket, one long-lived stream per caller
+#
+# Reported per transport and concurrency : throughput, latency p50 / p99, errors and CPU per decision
+# (server and client, milliseconds) : the transport overhead shows in the CPU columns first.
+# Rows are never replayed across runs (until the file wraps), so no transport is measured on cache hits.
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m scripts.rpc_benchmark --concurrency 1 4 16 --duration 10 --explain none
+#   python -m scripts.rpc_benchmark --url http://127.0.0.1:8000 --rpc-port 50051 \
+#       --unix-socket /tmp/finsight-credit.sock --server-pid <pid>        (already running server)
+
+TRANSPORTS = ["http", "grpc_tcp", "grpc_unix", "grpc_stream"]
+
+EXPLAIN_CODES = {"full": 0, "deferred": 1, "none": 2}
+
+
+# Closed loop over one transport
+# open_caller() -> (send, close) : send() answers 200 or an error status, close() ends the caller
+async def closed_loop(open_caller, concurrency, duration, warmup, timeout):
+    samples = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    stop = start + warmup + duration
+
+    async def caller():
+        send, close = await open_caller()
+        while loop.time() < stop:
+            t0 = loop.time()
+            try:
+                status = await asyncio.wait_for(send(), timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                status = None
+            samples.append((t0 - start, loop.time() - t0, status))
+        await close()
+
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return samples
+
+
+async def run_transport(transport, targets, bodies, requests, counter, args, concurrency):
+    grpc, pb, pb_grpc = require_grpc()
+    explain = args.explain
+
+    if transport == "http":
+        parts = urlsplit(targets["http"])
+        path = f"{args.path}?explain={explain}"
+
+        async def open_caller():
+            conn = Connection(parts.hostname, parts.port)
+
+            async def close():
+                conn.close()
+            return (lambda: conn.post(path, bodies[next(counter) % len(bodies)])), close
+
+        return await closed_loop(open_caller, concurrency, args.duration, args.warmup, args.timeout)
+
+    channel = grpc.aio.insecure_channel(targets["grpc_tcp"] if transport == "grpc_tcp" else targets["grpc_unix"])
+    stub = pb_grpc.CreditDecisionServiceStub(channel)
+    try:
+        if transport == "grpc_stream":
+            async def open_caller():
+                call = stub.DecideStream()
+
+                async def send():
+                    await call.write(requests[next(counter) % len(requests)])
+                    return 200 if await call.read() is not grpc.aio.EOF else None
+
+                async def close():
+                    await call.done_writing()
+                return send, close
+        else:
+            async def open_caller():
+                async def send():
+                    try:
+                        await stub.Decide(requests[next(counter) % len(requests)])
+                    except grpc.aio.AioRpcError as e:
+                        return e.code().name
+                    return 200
+
+                async def close():
+                    pass
+                return send, close
+
+        return await closed_loop(open_caller, concurrency, args.duration, args.warmup, args.timeout)
+    finally:
+        await channel.close()
+
+
+def run_step(transport, targets, bodies, requests, counter, args, concurrency, stats):
+    cpu_before, client_before = stats.cpu(), client_cpu_seconds()
+    samples = asyncio.run(run_transport(transport, targets, bodies, requests, counter, args, concurrency))
+    server_cpu, client_cpu = stats.cpu() - cpu_before, client_cpu_seconds() - client_before
+
+    result = {"transport": transport, "concurrency": concurrency, **summarize(samples, args.warmup, args.duration)}
+    # CPU per decision over the whole step (warm-up included)
+    answered = sum(1 for _, _, status in samples if status == 200) or 1
+    result["server_cpu_ms"] = round(server_cpu / answered * 1000, 3) if stats.master else None
+    result["client_cpu_ms"] = round(client_cpu / answered * 1000, 3)
+    return result
+
+
+def run(args):
+    grpc, pb, _ = require_grpc()
+    bodies = load_bodies(rows=args.rows, seed=args.seed)
+    code = EXPLAIN_CODES[args.explain]
+    requests = [pb.DecisionRequest(applicant=pb.CreditRequest(**json.loads(b)), explain=code) for b in bodies]
+    counter = itertools.count()
+
+    unix_socket = args.unix_socket or os.path.join(tempfile.mkdtemp(), "credit.sock")
+    rpc_port = args.rpc_port or free_port()
+    if args.url:
+        server = nullcontext((args.url, None))
+    else:
+        server = serve("rpc", 1, extra_args=["--rpc-port", rpc_port, "--unix-socket", unix_socket])
+
+    steps = []
+    with server as (url, master):
+        targets = {"http": url, "grpc_tcp": f"127.0.0.1:{rpc_port}", "grpc_unix": f"unix:{unix_socket}"}
+        stats = ServerStats(master.pid if master is not None else args.server_pid)
+        for transport in args.transports:
+            for concurrency in args.concurrency:
+                step = run_step(transport, targets, bodies, requests, counter, args, concurrency, stats)
+                steps.append(step)
+                print(f"{transport} x{concurrency} : {step['throughput_rps']} req/s, p50 {step['p50_ms']} ms, "
+                      f"p99 {step['p99_ms']} ms, errors {step['error_rate']:.2%}, "
+                      f"cpu / decision server {step['server_cpu_ms']} ms, client {step['client_cpu_ms']} ms", flush=True)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "explain": args.explain,
+            "rows": len(bodies),
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+        },
+        "steps": steps,
+    }
+
+
+def report(results):
+    lines = [
+        "| transport | concurrency | req/s | p50 ms | p99 ms | errors | server cpu ms / decision | client cpu ms / decision |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for s in results["steps"]:
+        lines.append(
+            f"| {s['transport']} | {s['concurrency']} | {s['throughput_rps']} | {s['p50_ms']} | {s['p99_ms']} | "
+            f"{s['error_rate']:.2%} | {s['server_cpu_ms']} | {s['client_cpu_ms']} |"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Decision latency / throughput : HTTP JSON vs gRPC (TCP, Unix socket, stream)")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=TRANSPORTS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--explain", choices=list(EXPLAIN_CODES), default="full")
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=2, help="unmeasured seconds before every step")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds before a request counts as an error")
+    parser.add_argument("--rows", type=int, help="distinct feature rows (default : every row)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--path", default="/api/credit/decision")
+    parser.add_argument("--url", help="use an already running server (HTTP base url) instead of starting one")
+    parser.add_argument("--rpc-port", type=int, help="gRPC TCP port of the --url server")
+    parser.add_argument("--unix-socket", help="gRPC Unix socket of the --url server")
+    parser.add_argument("--server-pid", type=int, help="pid of the --url server (CPU stats)")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    if args.url and not (args.rpc_port and args.unix_socket):
+        sys.exit("--url needs --rpc-port and --unix-socket")
+    start = time.perf_counter()
+    results = run(args)
+    print()
+    print(report(results))
+    print(f"\n{time.perf_counter() - start:.0f}s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,97 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import ML_DIR
+from app.engines.rule_engine import RuleScoreEngine, RULE_TABLES, MIN_SCORE, MAX_SCORE
+
+# Rule Score Report :
+# Checks the vectorized rule engine (app/engines/rule_engine.py) against
+# "ML/3. Data/5*. Hybrid_Data/feature_with_rule_score.csv".
+#
+# RuleBasedCreditScore in that file is NOT the bare rule score : the notebook adds two
+# Gaussian noises to it (tier noise, then feature-aware noise) and truncates with int().
+# So the check has 2 parts :
+#   1. exact   -> vectorized engine == row-by-row port of the notebook calculator (every row)
+#   2. noise   -> CSV - engine score has mean ~ 0 and the std the notebook noise predicts,
+#                 per noise group  :  sqrt( tier_sigma^2 + feature_sigma^2 )
+#                 (rows near the 300 / 900 clamp are left out : the clamp cuts the noise)
+# Plus the throughput of the vectorized engine (rows / second, one core).
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m scripts.rule_score_report --table training
+
+DATA_PATH = ML_DIR / "3. Data/5*. Hybrid_Data/feature_with_rule_score.csv"
+
+
+# Row-by-row reference : same rows / comparisons as the notebook's RuleBasedCreditScoreService
+def reference_score(table, row):
+    score = 500
+    for _, feature, op, thresholds, points in table:
+        value = row[feature]
+        for t, p in zip(thresholds, points):
+            if (op == ">=" and value >= t) or (op == "<=" and value <= t) or (op == "<" and value < t):
+                score += p
+                break
+        else:
+            score += points[-1]
+    return min(max(score, MIN_SCORE), MAX_SCORE)
+
+
+# Noise std the notebook applies to one row (add_industry_noise + feature_aware_noise)
+def expected_sigma(score, emi_ratio, bounce_count):
+    tier = np.where(score >= 750, 10, np.where(score >= 600, 25, 15))
+    feature = 20 + np.where(emi_ratio > 0.45, 10, 0) + np.where(bounce_count >= 2, 15, 0)
+    return np.sqrt(tier ** 2 + feature ** 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule engine vs feature_with_rule_score.csv")
+    parser.add_argument("--table", default="training", choices=list(RULE_TABLES))
+    parser.add_argument("--throughput-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = pd.read_csv(DATA_PATH)
+    engine = RuleScoreEngine(RULE_TABLES[args.table])
+    result = engine.evaluate(df)
+    score = result["score"]
+
+    # Step 1 : Exact check against the row-by-row reference
+    reference = np.array([reference_score(RULE_TABLES[args.table], row) for row in df.to_dict("records")])
+    mismatches = int((reference != score).sum())
+    print(f"table={args.table}  rows={len(df)}  exact mismatches vs row-by-row reference : {mismatches}")
+
+    # Step 2 : Noise check against the CSV scores
+    residual = df["RuleBasedCreditScore"].to_numpy() - score
+    sigma = expected_sigma(score, df["emiRatio"].to_numpy(), df["bounceCount"].to_numpy())
+    inside = (score - 4 * sigma > MIN_SCORE) & (score + 4 * sigma < MAX_SCORE)
+    print(f"\n{'noise group (sigma)':<22} {'rows':>7} {'mean':>7} {'std':>7} {'expected':>9}")
+    ok = mismatches == 0
+    for s in np.unique(sigma[inside]):
+        group = inside & (sigma == s)
+        mean, std = residual[group].mean(), residual[group].std()
+        print(f"{s:<22.1f} {group.sum():>7} {mean:>7.2f} {std:>7.2f} {s:>9.2f}")
+        # int() truncation biases the mean by about -1 ; std within 15 % of the noise model
+        if group.sum() >= 100 and (abs(mean) > 3 or abs(std / s - 1) > 0.15):
+            ok = False
+    z = np.abs(residual[inside]) / sigma[inside]
+    print(f"\nrows within 4 sigma : {(z < 4).mean():.4%}   MAE (all rows) : {np.abs(residual).mean():.2f}")
+
+    # Step 3 : Throughput (one vectorized call)
+    big = df.sample(n=args.throughput_rows, replace=True, random_state=0).reset_index(drop=True)
+    columns = {f: big[f].to_numpy(dtype=np.float64) for f in engine.features}
+    engine.evaluate(columns)
+    start = time.perf_counter()
+    engine.evaluate(columns)
+    elapsed = time.perf_counter() - start
+    print(f"throughput : {args.throughput_rows / elapsed:,.0f} rows/s ({args.throughput_rows} rows in {elapsed * 1000:.1f} ms)")
+
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+# Per-Worker Memory Report (Linux) :
+# Starts the API with N workers in two serving modes and reads the memory of every worker.
+#
+#   uvicorn -> python -m uvicorn app.main:app --workers N  (every worker loads everything itself)
+#   preload -> python -m app.serve --workers N             (master loads once, then forks)
+#
+# Columns (from /proc/<pid>/smaps_rollup) :
+#   rss_mb     -> resident memory, shared pages counted in full in EVERY process
+#   pss_mb     -> resident memory with shared pages split between the processes sharing them
+#   private_mb -> pages only this process uses (what one more worker really costs)
+# Sum of pss_mb over the processes = real memory used by the whole server.
+#
+# Usage (from API-CreditDecisionEngine/) :
+#   python -m scripts.worker_memory --workers 4
+
+SAMPLE = {
+    "avgMonthlyIncome": 50000, "incomeCV": 0.2, "expenseRatio": 0.5, "emiRatio": 0.2,
+    "avgMonthlyBalance": 20000, "bounceCount": 1, "accountAgeMonths": 36,
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as r:
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+# Child processes of pid (the workers of a server), without the multiprocessing resource tracker
+def children(pid):
+    out = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 = parent pid (the name field may contain spaces, split after ")")
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if ppid == pid and "resource_tracker" not in cmdline:
+            out.append(int(entry))
+    return sorted(out)
+
+
+def memory(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss_mb": values.get("Rss", 0.0),
+        "pss_mb": values.get("Pss", 0.0),
+        "private_mb": values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0),
+    }
+
+
+# Start the API on a free local port, wait until every worker answers /ready, stop it on exit
+# Yields (base url, master process) ; also used by scripts/load_test.py and scripts/rpc_benchmark.py
+# mode "rpc" : one process serving HTTP + gRPC (python -m app.rpc.server, workers ignored)
+# extra_args : appended to the server command line
+@contextmanager
+def serve(mode, workers, timeout=600, extra_args=()):
+    port = free_port()
+    if mode == "uvicorn":
+        cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning"]
+    elif mode == "rpc":
+        cmd = [sys.executable, "-m", "app.rpc.server", "--port", str(port), "--log-level", "warning"]
+        workers = 1
+    else:
+        cmd = [sys.executable, "-m", "app.serve", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning"]
+    cmd += [str(arg) for arg in extra_args]
+    master = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # Wait until every worker answers /ready (several hits in a row)
+        base = f"http://127.0.0.1:{port}"
+        deadline, ok = time.time() + timeout, 0
+        while ok < 5 * workers:
+            if time.time() > deadline:
+                raise TimeoutError(f"{mode} server not ready after {timeout}s")
+            if master.poll() is not None:
+                raise RuntimeError(f"{mode} server exited with code {master.returncode}")
+            ok = ok + 1 if _get(base + "/ready") == 200 else 0
+            time.sleep(0.05 if ok else 0.5)
+        yield base, master
+    finally:
+        master.send_signal(signal.SIGTERM)
+        try:
+            master.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            master.kill()
+
+
+def measure(mode, workers, requests=20, timeout=600):
+    with serve(mode, workers, timeout) as (base, master):
+        # Step 1 : Some traffic so every worker has served requests
+        for i in range(requests):
+            _get(base + "/api/credit/decision", dict(SAMPLE, bounceCount=i))
+
+        # Step 2 : Memory of the master and of every worker
+        rows = [("master", master.pid, memory(master.pid))]
+        rows += [("worker", pid, memory(pid)) for pid in children(master.pid)]
+        return rows
+
+
+def report(workers, modes=("uvicorn", "preload")):
+    lines = [
+        "| mode | process | rss_mb | pss_mb | private_mb |",
+        "|---|---|---|---|---|",
+    ]
+    for mode in modes:
+        rows = measure(mode, workers)
+        for role, pid, mem in rows:
+            lines.append(f"| {mode} | {role} {pid} | {mem['rss_mb']:.0f} | {mem['pss_mb']:.0f} | {mem['private_mb']:.0f} |")
+        total = {k: sum(m[k] for _, _, m in rows) for k in ("rss_mb", "pss_mb", "private_mb")}
+        lines.append(f"| {mode} | **total** | {total['rss_mb']:.0f} | **{total['pss_mb']:.0f}** | {total['private_mb']:.0f} |")
+        print("\n".join(lines[-len(rows) - 1:]), flush=True)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-worker memory : uvicorn --workers vs preload + fork")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", default=["uvicorn", "preload"], choices=["uvicorn", "preload"])
+    parser.add_argument("--output", help="write the markdown table to this file")
+    args = parser.parse_args()
+
+    table = report(args.workers, args.modes)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(table + "\n")
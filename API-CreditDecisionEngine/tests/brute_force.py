@@ -0,0 +1,25 @@
+import itertools
+import math
+
+import numpy as np
+
+# Reference implementations for the tests : slow, written from the definitions only
+
+
+# Brute-force Shapley values : every coalition, straight from the definition
+#   phi_i = sum over S (without i) of |S|! (M - |S| - 1)! / M! * (v(S + i) - v(S))
+# value : function of a (M,) bool mask -> (outputs,) coalition value
+# Output : (M, outputs)
+def brute_force_shapley(value, M):
+    masks = list(itertools.product([False, True], repeat=M))
+    v = {mask: np.atleast_1d(np.asarray(value(np.array(mask)), dtype=np.float64)) for mask in masks}
+    phi = np.zeros((M,) + next(iter(v.values())).shape)
+    for mask in masks:
+        size = sum(mask)
+        for i in range(M):
+            if mask[i]:
+                continue
+            with_i = mask[:i] + (True,) + mask[i + 1:]
+            weight = math.factorial(size) * math.factorial(M - size - 1) / math.factorial(M)
+            phi[i] += weight * (v[with_i] - v[mask])
+    return phi
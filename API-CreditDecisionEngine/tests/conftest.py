@@ -0,0 +1,21 @@
+import pytest
+
+from app.services.model_manager import model_manager
+
+# Shared fixtures : the model version of bundles/CURRENT, loaded once per test session
+# (same registry + engine as the API, startup snapshot reused when present)
+
+
+@pytest.fixture(scope="session")
+def deployment():
+    return model_manager.current()
+
+
+@pytest.fixture(scope="session")
+def registry(deployment):
+    return deployment.registry
+
+
+@pytest.fixture(scope="session")
+def engine(deployment):
+    return deployment.engine
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from app import bulk_score
+
+# Bulk scoring CLI resume (app/bulk_score.py) :
+# an interrupted job continues after its last checkpointed chunk and writes the same file
+# as an uninterrupted run ; a changed input or model version starts over.
+# workers = 1 : chunks are scored in the test process (no spawn pool)
+
+CHUNK_SIZE = 10
+
+
+class Interrupted(RuntimeError):
+    pass
+
+
+@pytest.fixture
+def portfolio(tmp_path, registry):
+    # Applicants of the served version's background data (bundles/ is not in the repository)
+    path = tmp_path / "portfolio.csv"
+    pd.read_csv(registry.bundle.path("bg_data"), nrows=35).to_csv(path, index=False)
+    return path
+
+
+def _args(portfolio, output, fmt):
+    return argparse.Namespace(input=str(portfolio), output=str(output), format=fmt, input_format=None,
+                              chunk_size=CHUNK_SIZE, workers=1, explain=False, pipeline="full", restart=False)
+
+
+# Run that stops after n_chunks written chunks, like a killed process
+def _interrupted_run(monkeypatch, args, n_chunks):
+    score_chunks = bulk_score.score_chunks
+
+    def stop_after(*a, **kw):
+        for i, item in enumerate(score_chunks(*a, **kw)):
+            if i == n_chunks:
+                raise Interrupted()
+            yield item
+
+    with monkeypatch.context() as m:
+        m.setattr(bulk_score, "score_chunks", stop_after)
+        with pytest.raises(Interrupted):
+            bulk_score.run(args)
+
+
+@pytest.fixture(params=["csv", "ndjson"])
+def job(request, tmp_path, portfolio):
+    fmt = request.param
+    reference = tmp_path / f"reference.{fmt}"
+    bulk_score.run(_args(portfolio, reference, fmt))
+    return _args(portfolio, tmp_path / f"scores.{fmt}", fmt), reference.read_bytes()
+
+
+def test_resume_writes_the_same_output(monkeypatch, capsys, job):
+    args, expected = job
+    _interrupted_run(monkeypatch, args, 2)
+    checkpoint = json.loads(open(bulk_score._checkpoint_path(args.output)).read())
+    assert checkpoint["chunks_done"] == 2 and checkpoint["rows_done"] == 2 * CHUNK_SIZE
+
+    capsys.readouterr()
+    assert bulk_score.run(args) == 0
+    assert "Resuming after chunk 2 (20 rows done)" in capsys.readouterr().err
+    assert open(args.output, "rb").read() == expected
+    assert not os.path.exists(bulk_score._checkpoint_path(args.output))
+
+
+def test_resume_after_partial_chunk_write(monkeypatch, job):
+    args, expected = job
+    _interrupted_run(monkeypatch, args, 1)
+    # Killed while writing chunk 1 : bytes after the checkpoint are cut off on resume
+    with open(args.output, "a") as f:
+        f.write("half a row,")
+    bulk_score.run(args)
+    assert open(args.output, "rb").read() == expected
+
+
+def _touch_input(args):
+    mtime = os.path.getmtime(args.input) + 60
+    os.utime(args.input, (mtime, mtime))
+
+
+def _other_model(args):
+    path = bulk_score._checkpoint_path(args.output)
+    checkpoint = json.loads(open(path).read())
+    checkpoint["job"]["model_version"], checkpoint["job"]["fingerprint"] = "v0", "0" * 16
+    with open(path, "w") as f:
+        json.dump(checkpoint, f)
+
+
+def _restart_flag(args):
+    args.restart = True
+
+
+@pytest.mark.parametrize("change", [_touch_input, _other_model, _restart_flag])
+def test_changed_job_starts_over(monkeypatch, capsys, job, change):
+    args, expected = job
+    _interrupted_run(monkeypatch, args, 2)
+    change(args)
+
+    capsys.readouterr()
+    bulk_score.run(args)
+    assert "Resuming" not in capsys.readouterr().err
+    assert open(args.output, "rb").read() == expected
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.model_bundle import ModelBundle
+from app.services import decision_service
+from app.services.decision_cache import DecisionCache, decision_key
+from app.services.model_manager import model_manager
+
+# Decision cache keys : validated feature vector + bundle fingerprint (+ pipeline)
+# A reload to other artifacts changes the fingerprint, so no entry of the old model is ever served
+
+APPLICANT = {
+    "avgMonthlyIncome": 52000, "incomeCV": 0.18, "expenseRatio": 0.55, "emiRatio": 0.22,
+    "avgMonthlyBalance": 31000, "bounceCount": 0, "accountAgeMonths": 48,
+}
+
+
+def test_decision_key_is_canonical():
+    as_floats = {k: float(v) for k, v in APPLICANT.items()}
+    assert decision_key(APPLICANT, "abc") == decision_key(as_floats, "abc")
+    assert decision_key(APPLICANT, "abc") != decision_key(APPLICANT, "abd")
+    assert decision_key(APPLICANT, "abc") != decision_key({**APPLICANT, "incomeCV": 0.1800001}, "abc")
+
+
+def test_bundle_fingerprint_follows_artifacts_not_version_name():
+    artifacts = {"pd_model": {"path": None, "sha256": "0" * 64}, "q_table": {"path": None, "sha256": "1" * 64}}
+    features = {"pd": ["emiRatio"], "rl": ["PD", "anomaly_score", "HybridCreditScore"]}
+    same = ModelBundle("v1", artifacts, features).fingerprint
+    assert ModelBundle("v2", artifacts, features).fingerprint == same
+
+    retrained = {**artifacts, "pd_model": {"path": None, "sha256": "2" * 64}}
+    assert ModelBundle("v2", retrained, features).fingerprint != same
+    assert ModelBundle("v2", artifacts, {**features, "pd": ["emiRatio", "bounceCount"]}).fingerprint != same
+
+
+# Engine stand-in : counts the rows it scores, "PD" tells which model scored them
+class CountingEngine:
+
+    def __init__(self, pd):
+        self.pd = pd
+        self.rows = 0
+
+    def score_batch(self, inputs, pipeline):
+        self.rows += len(inputs)
+        return {"PD": np.full(len(inputs), self.pd)}
+
+
+def _deployment(fingerprint, pd):
+    return SimpleNamespace(fingerprint=fingerprint, model_version=fingerprint, engine=CountingEngine(pd))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = DecisionCache(max_items=100, ttl_seconds=3600)
+    monkeypatch.setattr(decision_service, "decision_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def active(monkeypatch):
+    # model_manager.activate swaps the served deployment, restored after the test
+    monkeypatch.setattr(model_manager, "_deployment", None)
+    return model_manager.activate
+
+
+def test_reload_invalidates_cached_decisions(cache, active):
+    old, new = _deployment("aaaa", 0.1), _deployment("bbbb", 0.9)
+    active(old)
+    first = decision_service.get_decision_entries([APPLICANT], [False])[0]
+    again = decision_service.get_decision_entries([APPLICANT], [False])[0]
+    assert again is first and old.engine.rows == 1
+
+    active(new)
+    entry = decision_service.get_decision_entries([APPLICANT], [False])[0]
+    assert new.engine.rows == 1
+    assert entry["scores"]["PD"][0] == 0.9
+
+    # Back to the old artifacts : its entries are still valid (same fingerprint, same scores)
+    active(old)
+    assert decision_service.get_decision_entries([APPLICANT], [False])[0] is first
+    assert old.engine.rows == 1
+
+
+def test_pipeline_is_part_of_the_key(cache, active):
+    deployment = _deployment("aaaa", 0.1)
+    active(deployment)
+    decision_service.get_decision_entries([APPLICANT], [False], pipeline="full")
+    decision_service.get_decision_entries([APPLICANT], [False], pipeline="tiered")
+    decision_service.get_decision_entries([APPLICANT, APPLICANT], [False, False], pipeline="tiered")
+    assert deployment.engine.rows == 2
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,39 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.encoding import decision_response, MSGPACK
+from app.schemas.credit import OPTIONAL_SECTIONS
+
+# Decision payloads : optional sections (RuleScore, Tier, decision_id) only appear when set,
+# so the default configuration answers with the baseline keys
+
+BASELINE_KEYS = ["PD", "Anomaly", "RiskLabel", "HybridScore", "RL_Recommendation", "model_version"]
+
+
+@pytest.fixture(scope="module")
+def decisions(registry, engine):
+    rows = registry.bg_data[list(registry.feature_plan.inputs)].iloc[:2].to_dict("records")
+    results = engine.get_decision_batch(rows)
+    results[1] = results[1].model_copy(update={"decision_id": "abc"})
+    return results
+
+
+def _request(accept=""):
+    return SimpleNamespace(headers={"accept": accept})
+
+
+def test_json_leaves_out_unset_sections(decisions):
+    assert list(json.loads(decision_response(_request(), decisions[0]).body)) == BASELINE_KEYS
+    both = json.loads(decision_response(_request(), decisions, many=True).body)
+    assert list(both[0]) == BASELINE_KEYS
+    assert both[1]["decision_id"] == "abc"
+    assert not (set(OPTIONAL_SECTIONS) - {"decision_id"}) & set(both[1])
+
+
+def test_msgpack_leaves_out_unset_sections(decisions):
+    msgpack = pytest.importorskip("msgpack")
+    data = msgpack.unpackb(decision_response(_request(MSGPACK), decisions, many=True).body)
+    assert list(data[0]) == BASELINE_KEYS
+    assert data[1]["decision_id"] == "abc"
@@ -0,0 +1,29 @@
+import threading
+
+from app.services.explanation_store import ExplanationStore, PENDING, READY, NOT_QUEUED
+
+# Deferred explanations : a full pool never runs a job on the submitting thread
+# (that thread is the micro-batcher's inference thread)
+
+
+def test_full_pool_stores_not_queued():
+    store = ExplanationStore(workers=1, max_pending=1)
+    release = threading.Event()
+    callers = []
+
+    def job():
+        callers.append(threading.current_thread())
+        release.wait(5)
+        return {"PD": []}
+
+    queued = store.submit(job, "v1")
+    dropped = store.submit(job, "v1")
+    assert store.get(queued)["status"] == PENDING
+    item = store.get(dropped)
+    assert (item["status"], item["explanations"], item["model_version"]) == (NOT_QUEUED, None, "v1")
+
+    release.set()
+    store._pool.shutdown(wait=True)
+    assert store.get(queued)["status"] == READY
+    assert store.get(dropped)["status"] == NOT_QUEUED
+    assert callers and threading.current_thread() not in callers
@@ -0,0 +1,44 @@
+import numpy as np
+
+# Feature plan (app/core/feature_plan.py) vs the DataFrame path it replaces, exact equality :
+#   scaled -> scaler.transform(DataFrame[features]), take -> DataFrame[features]
+# Rows of the prepared background data (PD + anomalyFlag columns included)
+
+
+def _frames(registry, n=500):
+    plan = registry.feature_plan
+    rows = registry.bg_data[plan.columns].iloc[:n]
+    X = plan.matrix(rows[plan.inputs].to_dict("records"))
+    X[:, len(plan.inputs):] = rows[list(plan.columns[len(plan.inputs):])].to_numpy(dtype=np.float64)
+    return plan, rows, X
+
+
+def test_scaled_matches_scaler_transform(registry):
+    plan, rows, X = _frames(registry)
+    for layer, scaler, features in [("pd", registry.pd_scaler, registry.pd_features),
+                                    ("if", registry.if_scaler, registry.if_features)]:
+        expected = scaler.transform(rows[features])
+        np.testing.assert_array_equal(plan.scaled(X, layer), expected)
+
+
+def test_take_matches_dataframe_columns(registry):
+    plan, rows, X = _frames(registry)
+    for layer, features in [("risk", registry.risk_features), ("hybrid", registry.hybrid_features)]:
+        expected = rows[features].to_numpy(dtype=np.float64)
+        np.testing.assert_array_equal(plan.take(X, layer), expected)
+
+
+def test_model_outputs_are_bit_for_bit_identical(registry):
+    plan, rows, X = _frames(registry)
+    np.testing.assert_array_equal(
+        registry.pd_model.predict_proba(plan.scaled(X, "pd")),
+        registry.pd_model.predict_proba(registry.pd_scaler.transform(rows[registry.pd_features])),
+    )
+    np.testing.assert_array_equal(
+        registry.iso_model.decision_function(plan.scaled(X, "if")),
+        registry.iso_model.decision_function(registry.if_scaler.transform(rows[registry.if_features])),
+    )
+    np.testing.assert_array_equal(
+        registry.hybrid_model.predict(plan.take(X, "hybrid")),
+        registry.hybrid_model.predict(rows[registry.hybrid_features]),
+    )
@@ -0,0 +1,33 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes import global_explain
+from app.services.explanation_index import explanation_index, IndexBuildInProgress, BUILDING, IDLE
+
+# POST /api/explain/global/build : off unless EXPLAIN_INDEX_BUILD_ENABLED is set,
+# 202 with the status while this version's index is being built by another process
+
+
+def _build_in_progress(*args, **kwargs):
+    raise IndexBuildInProgress("Explanation index is being built by another process")
+
+
+def test_build_route_is_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(explanation_index, "build", _build_in_progress)
+    with pytest.raises(HTTPException) as e:
+        global_explain.global_explain_build(force=True)
+    assert e.value.status_code == 403
+
+
+@pytest.mark.parametrize("build_status, code", [(BUILDING, 202), (IDLE, 409)])
+def test_build_held_by_another_builder(monkeypatch, build_status, code):
+    monkeypatch.setattr(global_explain, "EXPLAIN_INDEX_BUILD_ENABLED", True)
+    monkeypatch.setattr(explanation_index, "build", _build_in_progress)
+    monkeypatch.setattr(explanation_index, "status", lambda: {"model_version": "v2", "index": None,
+                                                              "build": {"status": build_status}})
+    try:
+        response = global_explain.global_explain_build(force=False)
+    except HTTPException as e:
+        assert e.status_code == code
+        return
+    assert response.status_code == code
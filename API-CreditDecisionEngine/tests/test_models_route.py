@@ -0,0 +1,17 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes import models
+from app.services.model_manager import model_manager
+
+# POST /api/models/reload has no authentication : off unless MODEL_RELOAD_ENABLED is set
+
+
+def test_reload_route_is_disabled_by_default(monkeypatch):
+    def reload(*args, **kwargs):
+        raise AssertionError("reload must not start")
+
+    monkeypatch.setattr(model_manager, "reload", reload)
+    with pytest.raises(HTTPException) as e:
+        models.models_reload(version="v1", wait=False)
+    assert e.value.status_code == 403
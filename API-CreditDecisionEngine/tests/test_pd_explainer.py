@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from app.engines.explainers import PDLinearExplainer
+from brute_force import brute_force_shapley
+
+# PD Layer : closed-form linear SHAP (app/engines/explainers.py, PDLinearExplainer) vs brute force
+# v(S) = weighted mean over the PD background of the log-odds with x on S
+
+
+def test_pd_linear_matches_brute_force(registry):
+    rows, weights = registry.pd_background
+    weights = weights / weights.sum()
+    explainer = PDLinearExplainer(registry.pd_coef, registry.pd_bg_mean, registry.pd_intercept)
+    log_odds = registry.pd_model.decision_function
+
+    X = registry.pd_scaler.transform(registry.bg_data[registry.pd_features].iloc[:5])
+    phi = explainer.shap_values(X)
+    assert explainer.expected_value == pytest.approx(weights @ log_odds(rows))
+    for x, phi_x in zip(X, phi):
+        expected = brute_force_shapley(lambda mask: weights @ log_odds(np.where(mask, x, rows)), len(x))
+        np.testing.assert_allclose(phi_x, expected[:, 0], atol=1e-9)
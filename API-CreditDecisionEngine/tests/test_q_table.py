@@ -0,0 +1,42 @@
+import itertools
+
+import numpy as np
+import pytest
+
+# Dense Q-table (registry.q_values, registry.q_lookup) vs the trained dict Q-table
+# Reference : q_table.get(state, np.zeros(4)) on np.digitize states, as in the training notebook
+
+
+def _dict_lookup(registry, state):
+    return registry.q_table.get(tuple(int(i) for i in state), np.zeros(4))
+
+
+def test_dense_q_table_matches_dict_on_every_state(registry):
+    grid = [range(len(registry.q_bins[k]) + 1) for k in ("pd", "anom", "cs")]
+    states = np.array(list(itertools.product(*grid)))
+    assert registry.q_values.shape == tuple(len(g) for g in grid) + (4,)
+
+    expected = np.array([_dict_lookup(registry, s) for s in states])
+    np.testing.assert_array_equal(registry.q_lookup(states), expected)
+
+
+def test_q_states_and_greedy_action_match_dict(registry):
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(0, 1, 2000), rng.uniform(0, 1, 2000), rng.uniform(250, 950, 2000)])
+    # Bin edges themselves (np.digitize is right-open : x == edge goes to the upper bin)
+    edges = np.column_stack([registry.q_bins["pd"][:3], registry.q_bins["anom"][:3], registry.q_bins["cs"][:3]])
+    X = np.vstack([X, edges])
+
+    states = registry.q_states(X)
+    expected_states = np.column_stack([np.digitize(X[:, i], registry.q_bins[k]) for i, k in enumerate(("pd", "anom", "cs"))])
+    np.testing.assert_array_equal(states, expected_states)
+
+    expected = np.array([np.argmax(_dict_lookup(registry, s)) for s in states])
+    np.testing.assert_array_equal(np.argmax(registry.q_lookup(states), axis=1), expected)
+
+
+def test_compile_rejects_states_outside_the_grid(registry):
+    q_table = dict(registry.q_table)
+    q_table[(len(registry.q_bins["pd"]) + 1, 0, 0)] = np.zeros(4)
+    with pytest.raises(ValueError, match="outside the q_bins grid"):
+        registry._compile_q_table(q_table, registry.q_bins)
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from brute_force import brute_force_shapley
+
+# RL Layer : exact Shapley over the Q-table (app/engines/explainers.py, QPolicyExactExplainer) vs brute force
+# Policy value from the trained dict Q-table (unseen state -> zeros),
+# v(S) = mean over the engine's background states of f(state_x on S, background state elsewhere)
+
+
+def test_rl_exact_matches_brute_force(registry, engine):
+    explainer = engine.rl_explainer
+    bg_states = explainer.bg_states
+
+    def policy_value(states):
+        return np.array([registry.q_table.get(tuple(int(i) for i in s), np.zeros(4)).max() for s in states])
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(0, 1, 20), rng.uniform(0, 1, 20), rng.uniform(300, 900, 20)])
+    phi = explainer.shap_values(X)
+    assert explainer.expected_value == pytest.approx(policy_value(bg_states).mean())
+    for state, phi_x in zip(registry.q_states(X), phi):
+        expected = brute_force_shapley(lambda mask: policy_value(np.where(mask, state, bg_states)).mean(), 3)
+        np.testing.assert_allclose(phi_x, expected[:, 0], atol=1e-12)
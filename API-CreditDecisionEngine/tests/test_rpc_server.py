@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from app.core.config import MAX_BATCH_ROWS
+from app.core.metrics import metrics
+
+grpc = pytest.importorskip("grpc")
+from app.rpc.server import CreditDecisionServicer  # noqa: E402
+
+# gRPC DecideBatch above MAX_BATCH_ROWS : INVALID_ARGUMENT, a client error (not in credit_request_errors_total)
+
+
+class Context:
+
+    async def abort(self, code, details):
+        self.code = code
+        raise grpc.aio.AbortError()
+
+    def set_trailing_metadata(self, metadata):
+        pass
+
+
+class BatchRequest:
+    applicants = [None] * (MAX_BATCH_ROWS + 1)
+    pipeline = 0
+
+
+def _count(name, **labels):
+    line = name + "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+    for row in metrics.render().splitlines():
+        if row.startswith(line + " "):
+            return float(row.split()[-1])
+    return 0.0
+
+
+def test_oversized_batch_is_invalid_argument():
+    before = _count("credit_request_errors_total", endpoint="rpc_decide_batch")
+    invalid = _count("credit_requests_total", endpoint="rpc_decide_batch", status="INVALID_ARGUMENT")
+    context = Context()
+    with pytest.raises(grpc.aio.AbortError):
+        asyncio.run(CreditDecisionServicer(grpc, None).DecideBatch(BatchRequest(), context))
+
+    assert context.code == grpc.StatusCode.INVALID_ARGUMENT
+    assert _count("credit_requests_total", endpoint="rpc_decide_batch", status="INVALID_ARGUMENT") == invalid + 1
+    assert _count("credit_request_errors_total", endpoint="rpc_decide_batch") == before
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.engines.rule_engine import RuleScoreEngine, RULE_TABLES, MIN_SCORE, MAX_SCORE
+from scripts.rule_score_report import DATA_PATH, reference_score, expected_sigma
+
+# Vectorized rule engine vs feature_with_rule_score.csv (same checks as scripts/rule_score_report.py)
+#   exact : engine score == row-by-row port of the notebook calculator
+#   noise : CSV score - engine score follows the notebook noise model, per noise group
+
+pytestmark = pytest.mark.skipif(not DATA_PATH.exists(), reason=f"{DATA_PATH} not found")
+
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.read_csv(DATA_PATH)
+
+
+@pytest.mark.parametrize("table", list(RULE_TABLES))
+def test_engine_matches_row_by_row_reference(df, table):
+    engine = RuleScoreEngine(RULE_TABLES[table])
+    score = engine.evaluate(df)["score"]
+    reference = np.array([reference_score(RULE_TABLES[table], row) for row in df.to_dict("records")])
+    np.testing.assert_array_equal(score, reference)
+
+    # Same result from plain column arrays (the bulk / batch path)
+    columns = {f: df[f].to_numpy(dtype=np.float64) for f in engine.features}
+    np.testing.assert_array_equal(engine.evaluate(columns)["score"], score)
+
+
+def test_csv_scores_match_noise_model(df):
+    score = RuleScoreEngine(RULE_TABLES["training"]).evaluate(df)["score"]
+    residual = df["RuleBasedCreditScore"].to_numpy() - score
+    sigma = expected_sigma(score, df["emiRatio"].to_numpy(), df["bounceCount"].to_numpy())
+    # Rows near the 300 / 900 clamp are left out : the clamp cuts the noise
+    inside = (score - 4 * sigma > MIN_SCORE) & (score + 4 * sigma < MAX_SCORE)
+
+    checked = 0
+    for s in np.unique(sigma[inside]):
+        group = inside & (sigma == s)
+        if group.sum() < 100:
+            continue
+        # int() truncation biases the mean by about -1 ; std within 15 % of the noise model
+        assert abs(residual[group].mean()) <= 3, f"noise group sigma={s:.1f}"
+        assert residual[group].std() == pytest.approx(s, rel=0.15), f"noise group sigma={s:.1f}"
+        checked += 1
+    assert checked > 0
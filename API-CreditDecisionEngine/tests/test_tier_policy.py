@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from app.engines.tier_policy import TierPolicy, LAYERS, SCREEN_LAYERS
+
+# Tier policies (app/engines/tier_policy.py) : outcome and explained layers of every row,
+# and the scatter of the full-tier rows back into N-row arrays (CreditDecisionEngine._score_tiers)
+
+TABLE = [
+    ("reject_pd",     (("PD", ">=", 0.9),),                        "REJECT",   ()),
+    ("review_bounce", (("bounceCount", ">=", 3),),                 "REVIEW",   ("Anomaly",)),
+    ("low_pd",        (("PD", "<=", 0.1),),                        "CONTINUE", ("Anomaly",)),
+    ("low_pd_normal", (("PD", "<=", 0.1), ("anomalyFlag", "==", 0)), "CONTINUE", ("RiskLabel",)),
+]
+
+
+def _layers(*names):
+    return np.array([layer in names for layer in LAYERS])
+
+
+@pytest.fixture
+def policy():
+    return TierPolicy(TABLE)
+
+
+def test_first_matching_exit_wins(policy):
+    signals = {"PD": np.array([0.95, 0.95, 0.5, 0.5]), "bounceCount": np.array([0, 5, 5, 0]),
+               "anomalyFlag": np.zeros(4)}
+    result = policy.evaluate(signals, 4)
+    np.testing.assert_array_equal(result["exit"], [0, 0, 1, -1])
+    assert policy.describe(0) == ("screen", "REJECT", "reject_pd")
+    assert policy.describe(1) == ("screen", "REVIEW", "review_bounce")
+    assert policy.describe(-1) == ("full", None, None)
+
+
+def test_skipped_explainers_are_the_union_of_matching_policies(policy):
+    signals = {"PD": np.array([0.05, 0.05, 0.5]), "bounceCount": np.zeros(3), "anomalyFlag": np.array([0, 1, 0])}
+    result = policy.evaluate(signals, 3)
+    np.testing.assert_array_equal(result["exit"], [-1, -1, -1])
+    np.testing.assert_array_equal(result["explained"][0], ~_layers("Anomaly", "RiskLabel"))
+    np.testing.assert_array_equal(result["explained"][1], ~_layers("Anomaly"))
+    np.testing.assert_array_equal(result["explained"][2], np.ones(len(LAYERS), dtype=bool))
+
+
+def test_nan_never_matches(policy):
+    signals = {"PD": np.array([np.nan, np.nan]), "bounceCount": np.array([np.nan, 3]), "anomalyFlag": np.zeros(2)}
+    result = policy.evaluate(signals, 2)
+    np.testing.assert_array_equal(result["exit"], [-1, 1])
+    assert result["explained"][0].all()
+
+
+def test_exited_rows_get_no_full_tier_explainers(policy):
+    signals = {"PD": np.array([0.95, 0.5]), "bounceCount": np.array([0, 4]), "anomalyFlag": np.zeros(2)}
+    explained = policy.evaluate(signals, 2)["explained"]
+    np.testing.assert_array_equal(explained[0], _layers(*SCREEN_LAYERS))
+    # review_bounce also skips the Anomaly explainer : only PD is left
+    np.testing.assert_array_equal(explained[1], _layers("PD"))
+
+
+@pytest.mark.parametrize("row", [
+    ("bad_action", (("PD", ">=", 0.9),), "APPROVE", ()),
+    ("no_condition", (), "REJECT", ()),
+    ("bad_comparison", (("PD", "!=", 0.9),), "REJECT", ()),
+    ("bad_layer", (("PD", ">=", 0.9),), "CONTINUE", ("Rules",)),
+])
+def test_invalid_tables_are_rejected(row):
+    with pytest.raises(ValueError, match=row[0]):
+        TierPolicy([row])
+
+
+# Full tier on the rows no policy stopped, same values as the full pipeline ; stopped rows : -1 / NaN
+def test_tiered_scores_scatter_back_into_n_rows(monkeypatch, registry, engine):
+    monkeypatch.setattr(engine, "tier_policy", TierPolicy([("bounces", (("bounceCount", ">=", 2),), "REJECT", ())]))
+    rows = registry.bg_data[list(registry.feature_plan.inputs)].iloc[:200].to_dict("records")
+    tiered = engine.score_batch(rows, "tiered")
+    full = engine.score_batch(rows, "full")
+
+    stopped = np.array([row["bounceCount"] >= 2 for row in rows])
+    assert stopped.any() and not stopped.all()
+    np.testing.assert_array_equal(tiered["tier_exit"], np.where(stopped, 0, -1))
+    np.testing.assert_array_equal(tiered["pd"], full["pd"])
+    for key in ("risk_idx", "action_idx"):
+        np.testing.assert_array_equal(tiered[key][~stopped], full[key][~stopped])
+        assert (tiered[key][stopped] == -1).all()
+    np.testing.assert_allclose(tiered["hybrid_score"][~stopped], full["hybrid_score"][~stopped], rtol=0, atol=0)
+    assert np.isnan(tiered["hybrid_score"][stopped]).all()
+    assert np.isnan(tiered["X_rl"][stopped]).all()
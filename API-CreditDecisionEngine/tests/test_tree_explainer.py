@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+import shap
+from sklearn.ensemble import GradientBoostingRegressor, IsolationForest, RandomForestClassifier
+from sklearn.ensemble._iforest import _average_path_length
+
+from app.core.tree_arrays import flatten_tree_ensemble
+from app.engines.tree_explainer import NativeTreeExplainer
+from brute_force import brute_force_shapley
+
+# Tree Layers : native TreeSHAP over flat arrays (app/engines/tree_explainer.py, NativeTreeExplainer) vs brute force
+
+
+# Small models of the same types as the registry (fast to brute force)
+#   path-dependent : v(S) = E[f | x_S], following the cover ratios on features outside S (Isolation Forest, Risk)
+#   interventional : v(S) = weighted mean over the background of f(x_S, z_rest)                (Hybrid Score)
+N_FEATURES = 5
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, N_FEATURES))
+    y = X[:, 0] + 2 * X[:, 1] * (X[:, 2] > 0) - X[:, 3] ** 2
+    return X, y
+
+
+def _models(X, y):
+    return {
+        "iforest": IsolationForest(n_estimators=6, max_samples=64, max_features=0.8, random_state=0).fit(X),
+        "forest": RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(X, np.digitize(y, [-1, 1])),
+        "gbr": GradientBoostingRegressor(n_estimators=12, max_depth=3, random_state=0).fit(X, y),
+    }
+
+
+# Model output in the space the flat arrays explain : (rows, outputs)
+def _output(name, model, X):
+    if name == "iforest":
+        # score_samples = -2^(-E[path length] / c(max_samples)) -> mean path length over the trees
+        return (-np.log2(-model.score_samples(X)) * _average_path_length([model.max_samples_]))[:, None]
+    if name == "forest":
+        return model.predict_proba(X)
+    return model.predict(X)[:, None]
+
+
+# E[f | x_S] of the flat ensemble : features in S follow x, the others split by cover
+def _conditional_expectation(flat, x, mask):
+    def node_value(node):
+        if flat.children_left[node] == -1:
+            return flat.values[node]
+        left, right = flat.children_left[node], flat.children_right[node]
+        feature = flat.features[node]
+        if mask[feature]:
+            return node_value(left if x[feature] <= flat.thresholds[node] else right)
+        return (flat.cover[left] * node_value(left) + flat.cover[right] * node_value(right)) / flat.cover[node]
+    return sum(node_value(root) for root in flat.roots) + flat.base_offset
+
+
+@pytest.mark.parametrize("name, background", [
+    ("iforest", False), ("forest", False), ("gbr", False), ("forest", True), ("gbr", True),
+])
+def test_native_tree_shap_matches_brute_force(data, name, background):
+    X, y = data
+    model = _models(X, y)[name]
+    flat = flatten_tree_ensemble(model)
+    rows = X[:5]
+
+    if background:
+        z = X[100:140]
+        weights = np.random.default_rng(1).uniform(0.5, 2.0, len(z))
+        explainer = NativeTreeExplainer(flat, background=z, background_weights=weights)
+        weights = weights / weights.sum()
+    else:
+        explainer = NativeTreeExplainer(flat)
+
+    phi = explainer.shap_values(rows)
+    phi = phi if phi.ndim == 3 else phi[:, :, None]
+    for x, phi_x in zip(explainer._prepare(rows), phi):
+        if background:
+            value = lambda mask: weights @ _output(name, model, np.where(mask, x, z))
+        else:
+            value = lambda mask: _conditional_expectation(flat, x, mask)
+        np.testing.assert_allclose(phi_x, brute_force_shapley(value, N_FEATURES), atol=1e-9)
+
+    # Efficiency : expected value + SHAP values = model output
+    total = np.atleast_1d(explainer.expected_value) + phi.sum(axis=1)
+    np.testing.assert_allclose(total, _output(name, model, rows), atol=1e-6)
+
+
+# Layers of the served model version vs shap
+#   Anomaly / RiskLabel (path-dependent) : same values as shap.TreeExplainer
+#   HybridScore (interventional, weighted background) : exact Shapley values, which the baseline
+#   shap.Explainer(hybrid_model, X_hybrid_bg) does not give : its values are off by up to a few
+#   score points (and miss additivity on some rows), so HybridScore.factors values differ from the
+#   baseline and their order does on about 0.5 % of rows
+def test_anomaly_and_risk_match_shap_tree_explainer(registry, engine):
+    rows = registry.bg_data.iloc[:200]
+    X_if = registry.if_scaler.transform(rows[registry.if_features])
+    X_risk = rows[registry.risk_features].to_numpy(dtype=np.float64)
+    for explainer, model, X in [(engine.if_explainer, registry.iso_model, X_if),
+                                (engine.risk_explainer, registry.risk_model, X_risk)]:
+        expected = np.asarray(shap.TreeExplainer(model).shap_values(X))
+        np.testing.assert_allclose(explainer.shap_values(X), expected, atol=1e-10)
+
+
+def test_hybrid_is_exact_interventional_shapley(registry, engine):
+    rows, weights = registry.hybrid_background
+    weights = weights / weights.sum()
+    X = registry.bg_data[registry.hybrid_features].iloc[:3].to_numpy(dtype=np.float64)
+    phi = engine.hybrid_explainer.shap_values(X)
+    for x, phi_x in zip(X, phi):
+        value = lambda mask: weights @ registry.hybrid_model.predict(np.where(mask, x, rows))
+        np.testing.assert_allclose(phi_x, brute_force_shapley(value, len(x))[:, 0], atol=1e-9)
+
+
+def test_hybrid_differs_from_shap_explainer_baseline(registry, engine):
+    rows, _ = registry.hybrid_background
+    X = registry.bg_data[registry.hybrid_features].iloc[:200]
+    prediction = registry.hybrid_model.predict(X.to_numpy(dtype=np.float64))
+
+    native = engine.hybrid_explainer.shap_values(X.to_numpy(dtype=np.float64))
+    baseline = shap.Explainer(registry.hybrid_model, pd.DataFrame(rows, columns=registry.hybrid_features))
+    baseline = baseline(X, check_additivity=False).values
+
+    # Native values add up to the prediction
+    np.testing.assert_allclose(engine.hybrid_explainer.expected_value + native.sum(axis=1), prediction, atol=1e-9)
+    # Baseline values move by more than rounding, by a few points at most
+    difference = np.abs(native - baseline).max()
+    assert 0.5 < difference < 5
+    # The top 3 factors agree on (almost) every row
+    top3 = lambda values: np.argsort(-np.abs(values), axis=1)[:, :3]
+    assert (top3(native) == top3(baseline)).all(axis=1).mean() >= 0.95
@@ -0,0 +1,59 @@
+import numpy as np
+
+from app.engines.credit_decision_engine import RISK_LABELS
+from app.engines.whatif import grid_matrix, crossings
+
+# What-if sweep (app/engines/whatif.py + CreditDecisionEngine.what_if) on a hand-built 2-D label grid
+
+A = [1.0, 2.0, 3.0]      # first axis  (rows of the grid)
+B = [10.0, 20.0]         # second axis (columns)
+
+#              B=10  B=20
+LABELS = np.array([[0, 0],    # A=1
+                   [0, 1],    # A=2
+                   [2, 2]])   # A=3
+
+
+def test_grid_matrix_is_in_c_order_with_the_base_row_last():
+    X_base = np.array([[7.0, 0.0, 0.0, 9.0]])
+    X, shape = grid_matrix(X_base, [(1, A), (2, B)])
+    assert shape == (3, 2) and X.shape == (7, 4)
+    np.testing.assert_array_equal(X[:-1, 1:3], [[a, b] for a in A for b in B])
+    np.testing.assert_array_equal(X[:, [0, 3]], np.tile([7.0, 9.0], (7, 1)))
+    np.testing.assert_array_equal(X[-1], X_base[0])
+
+
+def test_crossings_of_a_label_grid():
+    assert crossings(LABELS.ravel(), LABELS.shape) == [
+        (0, (0, 1), (1, 1)),   # along A at B=20 : 0 -> 1
+        (0, (1, 0), (2, 0)),   # along A at B=10 : 0 -> 2
+        (0, (1, 1), (2, 1)),   # along A at B=20 : 1 -> 2
+        (1, (1, 0), (1, 1)),   # along B at A=2  : 0 -> 1
+    ]
+    assert crossings(np.zeros(6, dtype=int), (3, 2)) == []
+
+
+def test_what_if_crossings_report_values(monkeypatch, registry, engine):
+    plan = registry.feature_plan
+    a, b = plan.slot["emiRatio"], plan.slot["bounceCount"]
+    lookup = {(x, y): LABELS[i, j] for i, x in enumerate(A) for j, y in enumerate(B)}
+
+    # Engine stand-in : Risk label from the hand-built grid (base row : LOW)
+    def score_matrix(X, pipeline=None):
+        n = len(X)
+        risk = np.array([lookup.get((x, y), 0) for x, y in zip(X[:, a], X[:, b])])
+        return {"pd": np.zeros(n), "if_score": np.zeros(n), "anomaly_flag": np.zeros(n, dtype=int),
+                "risk_idx": risk, "hybrid_score": np.zeros(n), "action_idx": np.zeros(n, dtype=int)}
+
+    monkeypatch.setattr(engine, "score_matrix", score_matrix)
+    base = {f: 1.0 for f in plan.inputs}
+    result = engine.what_if(base, [("emiRatio", A), ("bounceCount", B)], boundaries=["Risk_Label"])
+
+    assert result.surface["Risk_Label"] == [[RISK_LABELS[c] for c in row] for row in LABELS]
+    found = [(c.feature, c.between, c.before, c.after, c.at) for c in result.crossings]
+    assert found == [
+        ("emiRatio", (1.0, 2.0), "LOW", "MEDIUM", {"bounceCount": 20.0}),
+        ("emiRatio", (2.0, 3.0), "LOW", "HIGH", {"bounceCount": 10.0}),
+        ("emiRatio", (2.0, 3.0), "MEDIUM", "HIGH", {"bounceCount": 20.0}),
+        ("bounceCount", (10.0, 20.0), "LOW", "MEDIUM", {"emiRatio": 2.0}),
+    ]